@@ -0,0 +1 @@
+"""Timing and memory benchmarks of the notebook derivations, see `python -m benchmarks --help`."""
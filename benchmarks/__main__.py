@@ -0,0 +1,64 @@
+"""
+Run the notebook benchmarks and compare them with the stored baseline.
+
+    python -m benchmarks                  # all pipelines, compared with baseline.json
+    python -m benchmarks nearly_gaussian  # selected pipelines
+    python -m benchmarks --save           # record a new baseline
+    python -m benchmarks --no-memory      # timings only, skip the traced memory pass
+
+Exits with status 1 if a stage is slower than --tolerance times its baseline.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+try:
+    import symdl # noqa: F401
+except ImportError: # not installed, run from a checkout
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from .harness import Recorder, compare, load_baseline, save_baseline
+from .pipelines import PIPELINES
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("pipelines", nargs="*", help=f"pipelines to run, default all: {', '.join(PIPELINES)}")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown ratio reported as a regression")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory pass")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.pipelines if name not in PIPELINES]
+    if unknown:
+        parser.error(f"unknown pipeline(s) {', '.join(unknown)}, choose from {', '.join(PIPELINES)}")
+
+    results = {}
+    passes = [Recorder(results)] + ([] if args.no_memory else [Recorder(results, memory=True)])
+    for rec in passes: # timings first, from cold caches and without tracemalloc
+        for name in args.pipelines or PIPELINES:
+            print(f"running {name} ({'memory' if rec.memory else 'time'}) ...", flush=True)
+            PIPELINES[name](rec)
+
+    if args.save:
+        baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+        for pipeline, stages in results.items(): # keeps the peaks of a --no-memory run's baseline
+            for stage, record in stages.items():
+                baseline.setdefault(pipeline, {}).setdefault(stage, {}).update(record)
+        save_baseline(baseline, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+    table, regressions = compare(results, baseline, args.tolerance)
+    print(table)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than {args.tolerance}x baseline:")
+        print("\n".join(f"  {r}" for r in regressions))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
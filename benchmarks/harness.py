@@ -0,0 +1,75 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class Recorder:
+    """
+    Wall time or peak traced memory of the stages of each pipeline.
+
+    tracemalloc slows allocation-heavy stages down several times, so a pipeline is run
+    once untraced for timings and once more with `memory=True` for peaks, both recorders
+    writing into the same `results`. A stage entered several times accumulates its
+    time and keeps the largest peak.
+
+    Example
+    -------
+    >>> results = {}
+    >>> for rec in (Recorder(results), Recorder(results, memory=True)):
+    ...     with rec.stage("nearly_gaussian", "wick_contraction"):
+    ...         Z = wick_contraction(Z)
+    >>> results
+    {'nearly_gaussian': {'wick_contraction': {'time': 0.41, 'peak_mb': 12.3}}}
+    """
+    def __init__(self, results: dict | None = None, memory: bool = False):
+        self.memory = memory
+        self.results: dict[str, dict[str, dict[str, float]]] = {} if results is None else results
+
+    @contextmanager
+    def stage(self, pipeline: str, name: str):
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            record = self.results.setdefault(pipeline, {}).setdefault(name, {})
+            if self.memory:
+                peak = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+                tracemalloc.stop()
+                record["peak_mb"] = max(record.get("peak_mb", 0), peak)
+            else: # stage repeated within a pipeline, e.g. for Ezz and Ez4
+                record["time"] = round(record.get("time", 0) + elapsed, 4)
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(results: dict, baseline: dict, tolerance: float = 1.5, min_time: float = 0.25) -> tuple[str, list[str]]:
+    """
+    Table of every stage against the baseline, and the stages slower than `tolerance` x.
+
+    Stages faster than `min_time` seconds in both runs are not flagged, their timing is noise.
+    """
+    lines = [f"{'pipeline / stage':<48}{'time':>9}{'base':>9}{'ratio':>7}{'peak MB':>10}{'base':>8}"]
+    regressions = []
+    for pipeline, stages in results.items():
+        for name, record in stages.items():
+            base = baseline.get(pipeline, {}).get(name, {})
+            t, bt = record["time"], base.get("time")
+            ratio = t / bt if bt else float("nan")
+            mem, bmem = record.get("peak_mb", float("nan")), base.get("peak_mb", float("nan"))
+            flag = ""
+            if bt is not None and ratio > tolerance and max(t, bt) > min_time:
+                flag = "  SLOWER"
+                regressions.append(f"{pipeline} / {name}")
+            label = f"{pipeline} / {name}"
+            bt_str = f"{bt:>9.3f}" if bt is not None else f"{'-':>9}"
+            lines.append(f"{label:<48}{t:>9.3f}{bt_str}{ratio:>7.2f}{mem:>10.1f}{bmem:>8.1f}{flag}")
+    return "\n".join(lines), regressions
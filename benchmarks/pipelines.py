@@ -0,0 +1,191 @@
+"""The notebook derivations, stage by stage. Each pipeline takes a Recorder."""
+import sympy as sp
+
+import symdl as sml
+from symdl.random.correlator import connected_correlator
+
+def _take_eps_limit(expr, eps):
+    return sp.series(expr, x=eps, x0=0, n=2)
+
+def gaussian_integrals(rec):
+    """ch01/01_Gaussian_Integrals: Wick contraction of Gaussian moments."""
+    p = "gaussian_integrals"
+    mu = sp.symbols("mu1:7", integer=True)
+    z = sml.GaussianIndexedBase("z")
+    K = sp.IndexedBase("K")
+    A, B = sml.wilds("A, B")
+    with rec.stage(p, "wick_contraction"):
+        Ez6 = sml.wick_contraction(sml.ExpVal(sp.Mul(*[z[m] for m in mu])))
+        sml.wick_contraction(sml.ExpVal(z[mu[0]]**4))
+        sml.wick_contraction(sml.ExpVal(z[mu[0]]**2 * z[mu[1]]**2))
+    with rec.stage(p, "wild_subs"):
+        sml.wild_subs(Ez6, {sml.ExpVal(z[A] * z[B]): K[A, B]})
+
+def probability_conn6(rec):
+    """ch01/02_Probability...: connected correlators up to conn6."""
+    p = "probability_conn6"
+    mu = sp.symbols("mu1:7", integer=True)
+    z = sml.GaussianIndexedBase("z")
+    connected_correlator.cache_clear()
+    with rec.stage(p, "connected_correlator"):
+        conn4 = connected_correlator(z, mu[:4], even_parity=True)
+        conn6 = connected_correlator(z, mu[:6], even_parity=True)
+    with rec.stage(p, "wick_contraction"):
+        conn4 = sml.wick_contraction(conn4)
+        conn6 = sml.wick_contraction(conn6)
+    with rec.stage(p, "simplify"):
+        sp.simplify(conn4), sp.simplify(conn6)
+
+def nearly_gaussian(rec):
+    """ch01/03_Nearly_Gaussian_Distributions: Z, Ezz, Ez4 and conn4 of the quartic action."""
+    p = "nearly_gaussian"
+    K = sml.SymmetryIndexedBase("K", symmetries="full")
+    V = sml.SymmetryIndexedBase("V", symmetries="full", idx_is_superscript=True)
+    mu = sp.symbols("mu1:5", integer=True)
+    rho = sp.symbols("rho1:5", integer=True)
+    z = sml.GaussianIndexedBase("z")
+    N = sp.Symbol("N", integer=True)
+    eps = sp.Symbol("epsilon")
+    Z0 = sp.Symbol("\\sqrt{|2\\pi K|}")
+    limits = [(r, 1, N) for r in rho]
+    quartic_action = -eps * sp.Sum(V[rho] * z[rho[0]] * z[rho[1]] * z[rho[2]] * z[rho[3]] / 24, *limits)
+    EK = sml.GaussianExpVal(K)
+    A, B = sml.wilds("A, B")
+    gaussian_rule = {EK(z[A] * z[B]): K[A, B]}
+
+    def derive(expr):
+        with rec.stage(p, "series"):
+            expr = sml.pull_sums_out_front(_take_eps_limit(expr, eps).removeO())
+        with rec.stage(p, "wick_contraction"):
+            expr = sml.wick_contraction(expr)
+        with rec.stage(p, "wild_subs"):
+            expr = sml.wild_subs(expr, gaussian_rule)
+        with rec.stage(p, "sum_utilities"):
+            expr = sml.pull_sums_out_front(sp.expand(expr))
+        with rec.stage(p, "canonicalize_dummy_indices"):
+            expr = sml.canonicalize_dummy_indices(expr)
+        with rec.stage(p, "sum_utilities"):
+            return sml.pull_coef_out_sum(expr)
+
+    Z = derive(Z0 * EK(sp.exp(quartic_action))).simplify()
+    derive(Z0 / Z * EK(z[mu[0]] * z[mu[1]] * sp.exp(quartic_action)))
+    Ez4 = derive(Z0 / Z * EK(z[mu[0]] * z[mu[1]] * z[mu[2]] * z[mu[3]] * sp.exp(quartic_action)))
+
+    def Ez2(a, b):
+        return K[a, b] - eps * sp.Sum(V[rho] * K[a, rho[0]] * K[b, rho[1]] * K[rho[2], rho[3]] / 2, *limits)
+
+    conn4 = Ez4 - Ez2(mu[0], mu[1]) * Ez2(mu[2], mu[3]) - Ez2(mu[0], mu[2]) * Ez2(mu[1], mu[3]) - Ez2(mu[0], mu[3]) * Ez2(mu[1], mu[2])
+    with rec.stage(p, "series"):
+        conn4 = _take_eps_limit(conn4, eps).removeO()
+    with rec.stage(p, "sum_utilities"):
+        conn4 = sml.pull_sums_out_front(sp.expand(conn4))
+    with rec.stage(p, "canonicalize_dummy_indices"):
+        conn4 = sml.canonicalize_dummy_indices(conn4)
+    with rec.stage(p, "sum_utilities"):
+        sml.pull_coef_out_sum(conn4)
+
+def first_layer(rec):
+    """ch04/01_First_Layer: two- and four-point functions of the first layer."""
+    p = "first_layer"
+    i = sml.neuron_indices("i1:5")
+    alpha = sml.sample_indices("alpha1:5")
+    x = sp.IndexedBase("x")
+    n0 = sp.Symbol("n0", integer=True)
+    b = sml.NNIndexedBase("b^(1)", is_gaussian=True)
+    W = sml.NNIndexedBase("W^(1)", is_gaussian=True)
+    C_b, C_w = sp.symbols("C_b^(1) C_W^(1)", positive=True)
+    layer = sml.Layer(W, b, x, n0)
+    z1 = layer.preactivation
+    A, B, C, D = sml.wilds("A, B, C, D")
+    rules = {
+        sml.ExpVal(W[A, B] * b[C]): 0,
+        sml.ExpVal(b[A] * b[B]): C_b * sp.KroneckerDelta(A, B),
+        sml.ExpVal(W[A, B] * W[C, D]): C_w * sp.KroneckerDelta(A, C) * sp.KroneckerDelta(B, D) / n0,
+    }
+    with rec.stage(p, "sum_utilities"):
+        zz = sml.pull_sums_out_front(sp.expand(z1[i[0], alpha[0]] * z1[i[1], alpha[1]]))
+    with rec.stage(p, "wild_subs"):
+        Ezz = sml.wild_subs(sml.ExpVal(zz), rules)
+    with rec.stage(p, "sum_utilities"):
+        sml.sum_kronecker_contract(Ezz).doit()
+
+    z = sml.NNIndexedBase("z^(1)", is_gaussian=True)
+    G = sml.NNIndexedBase("G^(1)")
+    zzzz = sp.Mul(*[z[i[k], alpha[k]] for k in range(4)])
+    with rec.stage(p, "wick_contraction"):
+        E4 = sml.wick_contraction(sml.ExpVal(zzzz))
+    with rec.stage(p, "wild_subs"):
+        sml.wild_subs(E4, {sml.ExpVal(z[A, B] * z[C, D]): sp.KroneckerDelta(A, C) * G[B, D]})
+    connected_correlator.cache_clear()
+    with rec.stage(p, "connected_correlator"):
+        conn4 = connected_correlator(z, tuple(zip(i, alpha)))
+    with rec.stage(p, "wick_contraction"):
+        sml.wick_contraction(conn4)
+
+def second_layer(rec):
+    """ch04/02_Second_Layer: ε-corrected Ezz and conn4 of the quartic action."""
+    p = "second_layer"
+    i = sml.neuron_indices("i1:5")
+    j = sml.neuron_indices("j1:5")
+    alpha = sml.sample_indices("alpha1:5")
+    beta = sml.sample_indices("beta1:5")
+    g = sml.NNIndexedBase("g", symmetries="full")
+    v = sml.NNIndexedBase("v", symmetries=[(0, 1), (2, 3), ([0, 1], [2, 3])], idx_is_superscript=True)
+    z = sml.NNIndexedBase("z", is_gaussian=True)
+    n = sp.Symbol("n", integer=True)
+    N_D = sp.Symbol("N_D", integer=True)
+    eps = sp.Symbol("epsilon")
+    quartic_term = eps * (-sp.Rational(1, 8) * sp.Sum(
+        v[beta[0], beta[1], beta[2], beta[3]]
+        * sp.Sum(z[j[0], beta[0]] * z[j[0], beta[1]] * z[j[1], beta[2]] * z[j[1], beta[3]], (j[0], 1, n), (j[1], 1, n)),
+        *[(b, 1, N_D) for b in beta],
+    ))
+    F = sml.RandomSymbol("F")
+    Eg = sml.GaussianExpVal(g)
+    with rec.stage(p, "series"):
+        EF = sml.pull_sums_out_front(_take_eps_limit(Eg(sp.exp(-quartic_term) * F) / Eg(sp.exp(-quartic_term)), eps))
+    A, B, C, D = sml.wilds("A, B, C, D")
+    gaussian_rule = {Eg(z[A, B] * z[C, D]): sp.KroneckerDelta(A, C) * g[B, D]}
+
+    def zz(i1, a1, i2, a2):
+        return z[i[i1], alpha[a1]] * z[i[i2], alpha[a2]]
+
+    def derive(expr):
+        with rec.stage(p, "wick_contraction"):
+            expr = sml.wick_contraction(expr)
+        with rec.stage(p, "wild_subs"):
+            expr = sml.wild_subs(expr, gaussian_rule)
+        with rec.stage(p, "canonicalize_dummy_indices"):
+            expr = sml.canonicalize_dummy_indices(sp.expand(expr))
+        with rec.stage(p, "sum_utilities"):
+            expr = sml.pull_coef_out_sum(expr)
+            expr = sml.sum_kronecker_contract(expr)
+            expr = sml.remove_irrelevant_sums(expr)
+            return sml.pull_coef_out_sum(expr)
+
+    derive(EF.subs(F, zz(0, 0, 1, 1)))
+    derive(
+        EF.subs(F, zz(0, 0, 1, 1) * zz(2, 2, 3, 3))
+        - EF.subs(F, zz(0, 0, 1, 1)) * EF.subs(F, zz(2, 2, 3, 3))
+        - EF.subs(F, zz(0, 0, 2, 2)) * EF.subs(F, zz(1, 1, 3, 3))
+        - EF.subs(F, zz(0, 0, 3, 3)) * EF.subs(F, zz(1, 1, 2, 2))
+    )
+
+def connected_correlators(rec):
+    """connected_correlator for M = 4 ... 10, cold cache."""
+    p = "connected_correlator"
+    z = sml.GaussianIndexedBase("z")
+    mu = sp.symbols("mu1:11", integer=True)
+    for M in range(4, 11):
+        connected_correlator.cache_clear()
+        with rec.stage(p, f"M={M}"):
+            connected_correlator(z, mu[:M])
+
+PIPELINES = {
+    "gaussian_integrals": gaussian_integrals,
+    "probability_conn6": probability_conn6,
+    "nearly_gaussian": nearly_gaussian,
+    "first_layer": first_layer,
+    "second_layer": second_layer,
+    "connected_correlator": connected_correlators,
+}
@@ -4,6 +4,8 @@ from .tensor import (
     TensorIndexed,
     TensorIndexedBase,
     canonicalize_dummy_indices,
+    collect_canonical_terms,
+    TensorPoly,
 )
 
 from .random import (
@@ -13,10 +15,15 @@ from .random import (
     connected_correlator,
 )
 
+from .perturbation import TruncatedSeries
+
 from .gaussian import (
     GaussianExpVal,
     GaussianIndexedBase,
+    GaussianKernel,
     GaussianSymbol,
+    diagram_contraction,
+    perturbative_expectation,
     wick_contraction,
 )
 
@@ -26,15 +33,20 @@ from .nn import (
     NeuronIdx,
     SampleIdx,
     Layer,
+    Network,
     neuron_indices,
     sample_indices,
 )
 
 from .utils import (
+    normalize_sums,
     pull_coef_out_sum,
     pull_sums_out_front,
     remove_irrelevant_sums,
     sum_kronecker_contract,
     wild_subs,
     wilds,
+    DiskCache,
 )
+
+from .profiling import profile, ProfileReport
@@ -1,3 +1,6 @@
 from .indexed import GaussianIndexedBase, GaussianSymbol
 from .wick import wick_contraction
-from .expectation import GaussianExpVal
\ No newline at end of file
+from .expectation import GaussianExpVal, GaussianKernel
+from .propagator import make_propagator
+from .diagram import diagram_contraction
+from .perturbative import perturbative_expectation
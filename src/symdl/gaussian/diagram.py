@@ -0,0 +1,160 @@
+from typing import Callable
+from collections import Counter
+from itertools import product
+
+import sympy as sp
+
+from ..random import ExpVal
+from ..tensor.graph import TensorFactor, canonical_labeling, tensor_factors
+from ..profiling import profiled
+from .wick import flatten_rvs, multiset_pairings, pair_contraction, wick_contraction
+
+Pattern = list[tuple[tuple[int, int], int]] # [((i, j), m_ij), ...] as in multiset_pairings
+
+def _field_factor(rv: sp.Expr) -> tuple[str, tuple]:
+    if isinstance(rv, sp.Indexed):
+        return str(rv.base), tuple(rv.indices)
+    return str(rv), ()
+
+def _propagator_factor(E: ExpVal, a: sp.Expr, b: sp.Expr) -> TensorFactor:
+    """The edge ⟨a b⟩ of the expectation E as a tensor, symmetric under a ↔ b."""
+    (head_a, idx_a), (head_b, idx_b) = sorted([_field_factor(a), _field_factor(b)], key=lambda t: t[0])
+    n = len(idx_a)
+    if head_a == head_b and n == len(idx_b):
+        swap = tuple(range(n, 2 * n)) + tuple(range(n))
+        symmetry = (tuple(range(2 * n)), swap)
+    else:
+        symmetry = (tuple(range(n + len(idx_b))),)
+    head = f"⟨{head_a} {head_b}⟩" + "".join(f"_{p}" for p in E.args[1:])
+    return TensorFactor(head, idx_a + idx_b, symmetry)
+
+def contract_diagrams(
+    term: sp.Expr,
+    limits: tuple,
+    keep: Callable[[list[tuple[list[sp.Expr], Pattern]]], bool] | None = None,
+) -> sp.Expr | None:
+    """
+    Wick-contract Sum(term, *limits), emitting one term per diagram.
+
+    `term` must be a product of Gaussian ExpVal factors and factors that are either free
+    of the summed indices or tensors (Indexed, KroneckerDelta). Each Wick pattern is turned
+    into a graph whose vertices are the tensors and the external fields and whose edges are
+    the propagators. Patterns are bucketed by the canonical form of that graph under
+    relabeling of the summed indices, and each bucket contributes its representative once,
+    multiplied by its symmetry factor (the number of pairings in the bucket).
+
+    Parameters
+    ----------
+    term : sp.Expr
+        The summand.
+    limits : tuple
+        Sum limits (i, a, b), ...
+    keep : callable, optional
+        keep([(fields, pattern), ...]) -> bool, one entry per Gaussian ExpVal, filters the
+        contraction patterns before bucketing.
+
+    Returns
+    -------
+    sp.Expr | None
+        The contracted sum, or None if `term` is not of the supported form.
+    """
+    dummies = {lim[0]: tuple(lim[1:]) for lim in limits}
+
+    groups = [] # (ExpVal, distinct fields, counts)
+    scalar, tensors, network = [], [], []
+    for f in sp.Mul.make_args(term):
+        fields = _gaussian_fields(f) if isinstance(f, ExpVal) else None
+        if fields is not None:
+            if len(fields) % 2 != 0:
+                return sp.S.Zero # odd moments vanish
+            counts = Counter(fields)
+            groups.append((f, list(counts), list(counts.values())))
+            continue
+        if f.free_symbols.isdisjoint(dummies):
+            scalar.append(f)
+            continue
+        factors = tensor_factors(f)
+        if factors is None:
+            return None
+        tensors.append(f)
+        network.extend(factors)
+
+    if not groups:
+        return None
+
+    numerator = 1
+    for _, _, counts in groups:
+        for n in counts:
+            numerator *= sp.factorial(n)
+
+    buckets: dict[tuple, list] = {} # encoding: [symmetry factor, patterns, relabeling]
+    for patterns in product(*[multiset_pairings(counts) for _, _, counts in groups]):
+        if keep is not None and not keep([(g[1], p) for g, p in zip(groups, patterns)]):
+            continue
+        weight = numerator
+        edges = []
+        for (E, distinct, _), pattern in zip(groups, patterns):
+            for (i, j), m in pattern:
+                weight /= (2**m * sp.factorial(m)) if i == j else sp.factorial(m)
+                edges.extend([_propagator_factor(E, distinct[i], distinct[j])] * m)
+        encoding, relabel = canonical_labeling(network + edges, dummies)
+        if encoding in buckets:
+            buckets[encoding][0] += weight
+        else:
+            buckets[encoding] = [weight, patterns, relabel]
+
+    result = []
+    for weight, patterns, relabel in buckets.values():
+        contracted = sp.Mul(*[
+            pair_contraction(type(E), E.args[1:], distinct[i], distinct[j])**m
+            for (E, distinct, _), pattern in zip(groups, patterns)
+            for (i, j), m in pattern
+        ])
+        summand = (sp.Mul(*tensors) * contracted).xreplace(relabel)
+        result.append(weight * sp.Mul(*scalar) * (sp.Sum(summand, *limits) if limits else summand))
+    return sp.Add(*result)
+
+def _gaussian_fields(E: ExpVal) -> list | None:
+    inner = E.args[0]
+    if isinstance(inner, sp.Mul):
+        fields = flatten_rvs(inner.args)
+    elif isinstance(inner, sp.Pow) and inner.exp.is_Integer and inner.exp > 0:
+        fields = flatten_rvs([inner])
+    else:
+        return None
+    if all(getattr(f, 'is_gaussian', False) for f in fields):
+        return fields
+    return None
+
+def _contract_sum(expr: sp.Sum) -> sp.Expr:
+    result = []
+    for term in sp.Add.make_args(expr.function.expand(deep=False)):
+        contracted = contract_diagrams(term, expr.limits)
+        if contracted is None:
+            contracted = sp.Sum(wick_contraction(term), *expr.limits)
+        result.append(contracted)
+    return sp.Add(*result)
+
+@profiled
+def diagram_contraction(expr: sp.Expr) -> sp.Expr:
+    """
+    Apply Wick contraction, merging terms that are equal up to renaming of summed indices.
+
+    Every Sum(...) whose summand holds a Gaussian ExpVal is expanded diagram by diagram
+    (see `contract_diagrams`): instead of one term per pairing, which
+    `canonicalize_dummy_indices` would later have to merge, it emits one term per graph
+    isomorphism class with its symmetry factor. Call `pull_sums_out_front` first so that
+    all summed indices of a term live in one Sum. Remaining ExpVal nodes go through
+    `wick_contraction`.
+
+    Example
+    -------
+    >>> EK = GaussianExpVal(K, propagator=K)
+    >>> diagram_contraction(sp.Sum(V[r1, r2, r3, r4] * EK(z[r1]*z[r2]*z[r3]*z[r4]), *limits))
+    3*Sum(K[r1, r2]*K[r3, r4]*V[r1, r2, r3, r4], ...)
+    """
+    expr = expr.replace(
+        lambda e: isinstance(e, sp.Sum) and e.function.has(ExpVal),
+        _contract_sum
+    )
+    return wick_contraction(expr)
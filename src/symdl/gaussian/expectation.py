@@ -2,14 +2,68 @@ import sympy as sp
 
 from ..random import ExpVal
 from ..random.expectation import LinearExpectationMixin
+from ..perturbation import TruncatedSeries
+from .propagator import Propagator, RuleKey, make_propagator
+
+class GaussianKernel(sp.AtomicExpr):
+    """
+    Kernel K of ⟨⋅⟩_K together with its propagator rule.
+
+    The rule is part of the node (its `==` and hash), so ⟨z z⟩_K with and without a
+    rule, or with different rules, are different expressions. It prints as K.
+
+    Parameters
+    ----------
+    K : sp.Symbol or sp.IndexedBase
+        The kernel.
+    propagator : callable | sp.IndexedBase | Sequence | sp.Expr
+        Rule for ⟨a b⟩_K, see `make_propagator`.
+    """
+    is_commutative = True
+
+    def __new__(cls, K, propagator):
+        obj = super().__new__(cls)
+        # as given, a list is kept as a tuple so that the node stays hashable
+        rule = tuple(propagator) if isinstance(propagator, list) else propagator
+        obj._set_metadata({"K": sp.sympify(K), "propagator_rule": rule})
+        return obj
+
+    def _hashable_content(self):
+        return (self.K, RuleKey(self.propagator_rule))
+
+    def metadata(self) -> dict:
+        return {"K": self.K, "propagator_rule": self.propagator_rule}
+
+    def _set_metadata(self, metadata: dict):
+        self.K = metadata["K"]
+        self.propagator_rule = metadata["propagator_rule"]
+        self.propagator = make_propagator(self.propagator_rule)
+
+    def __reduce_ex__(self, protocol):
+        return type(self), (self.K, self.propagator_rule)
+
+    @property
+    def free_symbols(self) -> set:
+        return self.K.free_symbols
+
+    def _latex(self, printer):
+        return printer._print(self.K)
+
+    def _sympystr(self, printer):
+        return printer.doprint(self.K)
 
 class GaussianEval(ExpVal):
-    nargs = (2,)  # (expr, K)
+    nargs = (2,)  # (expr, K), K possibly a GaussianKernel
 
     @classmethod
     def eval(cls, expr, K):
         return cls.linear_eval(expr, cls, K)
 
+    @classmethod
+    def propagator_rule(cls, K) -> Propagator | None:
+        """Propagator carried by the kernel K, used by Wick contraction."""
+        return getattr(K, "propagator", None)
+
     def _latex(self, printer):
         expr, K = self.args
         return r"\left\langle " + printer._print(expr) + r"\right\rangle_{" + printer._print(K) + r"}"
@@ -26,6 +80,11 @@ class GaussianExpVal:
     ----------
     K : sp.Symbol or sp.IndexBase
         The kernel (inverse covariance) matrix for the Gaussian.
+    propagator : callable | sp.IndexedBase | Sequence | None, optional
+        Rule for the two-point contraction ⟨a b⟩_K, see `make_propagator`.
+        If given, `wick_contraction` writes the kernels directly instead of ⟨a b⟩_K nodes.
+        The rule travels with the expressions as a `GaussianKernel`, so it only applies
+        to expectations built by this operator.
 
     Returns
     -------
@@ -41,10 +100,16 @@ class GaussianExpVal:
     >>> EK = GaussianExpVal(K)
     >>> EK(z[mu] * z[nu])
     ⟨ z_μ z_ν ⟩_K
+    >>> EK = GaussianExpVal(K, propagator=K)
+    >>> wick_contraction(EK(z[mu] * z[nu]))
+    K[mu, nu]
     """
-    def __init__(self, K: sp.Symbol|sp.IndexedBase):
+    def __init__(self, K: sp.Symbol|sp.IndexedBase, propagator=None):
         self.K = K
+        self.kernel = K if propagator is None else GaussianKernel(K, propagator)
 
     def __call__(self, expr) -> sp.Expr:
-        return GaussianEval(expr, self.K)
+        if isinstance(expr, TruncatedSeries):
+            return expr.expectation(GaussianEval, self.kernel)
+        return GaussianEval(expr, self.kernel)
 
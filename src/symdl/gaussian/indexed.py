@@ -1,9 +1,32 @@
 from sympy import Symbol
 from ..tensor import TensorIndexedBase
+from .propagator import RuleKey, make_propagator
 
 class GaussianIndexedBase(TensorIndexedBase):
-    def __new__(cls, label, **kwargs):
-        return super().__new__(cls, label, is_random=True, is_gaussian=True, **kwargs)
+    _metadata_attrs = TensorIndexedBase._metadata_attrs + ("propagator_rule",)
+
+    def __new__(cls, label, *, propagator=None, **kwargs):
+        """
+        Parameters
+        ----------
+        propagator : callable | sp.IndexedBase | Sequence | None, optional
+            Rule for ⟨z[a] z[b]⟩ between two components of this field, see `make_propagator`.
+            Used by Wick contraction when the expectation itself has no rule.
+        """
+        obj = super().__new__(cls, label, is_random=True, is_gaussian=True, **kwargs)
+        # as given, picklable unless a lambda; a list is kept as a tuple so that the base stays hashable
+        rule = tuple(propagator) if isinstance(propagator, list) else propagator
+        obj.propagator_rule = rule
+        obj.propagator = make_propagator(rule)
+        return obj
+
+    def _hashable_content(self):
+        # fields with different rules contract differently, like GaussianKernel
+        return (*super()._hashable_content(), RuleKey(getattr(self, "propagator_rule", None)))
+
+    def _set_metadata(self, metadata: dict):
+        super()._set_metadata(metadata)
+        self.propagator = make_propagator(self.propagator_rule)
 
 class GaussianSymbol(Symbol):
     def __new__(cls, name, **kwargs):
@@ -0,0 +1,127 @@
+from math import factorial, prod
+from collections import Counter
+from itertools import combinations_with_replacement
+
+import sympy as sp
+
+from ..tensor.poly import expand_terms
+from ..profiling import profiled
+from .diagram import Pattern, contract_diagrams
+from .expectation import GaussianExpVal
+from .wick import wick_contraction
+
+def _fresh_copy(factors: list, limits: list, copy: int) -> tuple[list, list]:
+    # the copy-th insertion of a vertex sums over its own dummies: rho1 -> rho1_2, ...
+    if copy == 1:
+        return factors, limits
+    rename = {
+        lim[0]: type(lim[0])(f"{lim[0].name}_{copy}", **lim[0].assumptions0)
+        for lim in limits
+    }
+    return (
+        [f.xreplace(rename) for f in factors],
+        [(rename[lim[0]], *lim[1:]) for lim in limits],
+    )
+
+def _linked(owner: dict[sp.Symbol, int]):
+    # keep(...) for contract_diagrams: every connected piece touches an external field
+    def keep(groups: list[tuple[list[sp.Expr], Pattern]]) -> bool:
+        parent: dict = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                x = parent[x]
+            return x
+
+        nodes = set()
+        for fields, pattern in groups:
+            node = [
+                next((owner[s] for s in f.free_symbols if s in owner), ("external", k))
+                for k, f in enumerate(fields)
+            ]
+            nodes.update(node)
+            for (i, j), _ in pattern:
+                a, b = find(node[i]), find(node[j])
+                if a != b:
+                    parent[a] = b
+        external = {find(x) for x in nodes if isinstance(x, tuple)}
+        return all(find(x) in external for x in nodes)
+    return keep
+
+@profiled
+def perturbative_expectation(
+    F: sp.Expr,
+    action: sp.Expr,
+    K: sp.Basic,
+    order: int,
+    propagator=None,
+) -> sp.Expr:
+    """
+    Normalized expectation ⟨F e^{-action}⟩_K / ⟨e^{-action}⟩_K to `order` insertions of the action.
+
+    By the linked-cluster theorem the denominator cancels exactly the vacuum bubbles, so
+    only the Wick contractions in which every piece is connected to a field of F are
+    generated: for each multiset of action terms (vertices), ∏ 1/m_v! ⟨F ∏ (-V)⟩ is
+    contracted diagram by diagram (see `contract_diagrams`) with diagrams containing a
+    vacuum component dropped. Each insertion of a vertex gets its own summed indices
+    (rho1, rho1_2, rho1_3, ...).
+
+    Parameters
+    ----------
+    F : sp.Expr
+        The observable, a polynomial in Gaussian random variables.
+    action : sp.Expr
+        The interaction, e.g. eps * Sum(V[r1, r2, r3, r4] * z[r1]*z[r2]*z[r3]*z[r4] / 24, ...).
+        Terms may be Sums, nested or not, of products of Gaussian variables.
+    K : sp.Basic
+        The kernel of the Gaussian expectation, as in `GaussianExpVal(K)`, or a
+        `GaussianKernel` that already carries its propagator rule.
+    order : int
+        Largest number of vertices; with action ∝ eps this is the order in eps.
+    propagator : callable | sp.IndexedBase | Sequence | sp.Expr | None, optional
+        Rule for ⟨a b⟩_K used for the contractions, as in `GaussianExpVal(K, propagator=...)`;
+        see `make_propagator`. Without a rule, the kernel's or the fields' own rule is used.
+
+    Returns
+    -------
+    sp.Expr
+        The connected contributions, one Sum per diagram.
+
+    Example
+    -------
+    >>> perturbative_expectation(z[mu1] * z[mu2], eps * Sum(V[*rho] * z[rho1]*...*z[rho4] / 24, ...), K, 1, propagator=K)
+    K[mu1, mu2] - eps*Sum(K[mu1, rho1]*K[mu2, rho2]*K[rho3, rho4]*V[rho1, rho2, rho3, rho4], ...)/2
+    """
+    EK = GaussianExpVal(K, propagator=propagator)
+    vertices = expand_terms(-action) # (coeff, factors, limits) of each vertex
+    if order > 0 and any(not limits for _, _, limits in vertices):
+        raise ValueError("Every term of the action must sum over its own indices")
+    observables = expand_terms(F)
+
+    result = []
+    for k in range(order + 1):
+        for combo in combinations_with_replacement(range(len(vertices)), k):
+            symmetry = prod(factorial(m) for m in Counter(combo).values())
+            for coeff, factors, limits in observables:
+                coeff = coeff / symmetry
+                factors, limits = list(factors), list(limits)
+                owner: dict[sp.Symbol, int] = {}
+                copies = Counter()
+                for n, v in enumerate(combo):
+                    copies[v] += 1
+                    c_v, f_v, l_v = vertices[v]
+                    f_v, l_v = _fresh_copy(f_v, l_v, copies[v])
+                    owner.update({lim[0]: n for lim in l_v})
+                    coeff *= c_v
+                    factors += f_v
+                    limits += l_v
+
+                term = EK(sp.Mul(*factors))
+                if not limits:
+                    result.append(coeff * wick_contraction(term))
+                    continue
+                contracted = contract_diagrams(term, tuple(limits), keep=_linked(owner))
+                if contracted is None:
+                    raise ValueError(f"Unsupported vertex or observable in {term}")
+                result.append(coeff * contracted)
+    return sp.Add(*result)
@@ -0,0 +1,79 @@
+from typing import Callable, Sequence
+
+import sympy as sp
+
+Propagator = Callable[[sp.Expr, sp.Expr], sp.Expr]
+
+def field_indices(rv: sp.Expr) -> tuple:
+    """Indices of a random variable, () for plain symbols."""
+    return tuple(rv.indices) if isinstance(rv, sp.Indexed) else ()
+
+class RuleKey:
+    """
+    A propagator rule as an entry of `_hashable_content`: equal and hashed as the rule,
+    ordered by repr, since Basic.compare orders entries with < and > and rules (None,
+    callables, tuples of IndexedBase) do not support them.
+    """
+    __slots__ = ("rule",)
+
+    def __init__(self, rule):
+        self.rule = rule
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RuleKey) and self.rule == other.rule
+
+    def __hash__(self) -> int:
+        return hash(self.rule)
+
+    def __lt__(self, other) -> bool:
+        return repr(self.rule) < repr(other.rule)
+
+    def __gt__(self, other) -> bool:
+        return repr(self.rule) > repr(other.rule)
+
+def make_propagator(rule) -> Propagator | None:
+    """
+    Normalize a propagator rule into a callable ⟨a b⟩ = rule(a, b).
+
+    Parameters
+    ----------
+    rule : callable | sp.IndexedBase | Sequence | sp.Expr | None
+        - callable: `rule(a, b)` receives the two contracted random variables
+        - `sp.IndexedBase` K: ⟨z[μ] z[ν]⟩ = K[μ, ν], all indices of a followed by all indices of b
+        - sequence of per-index kernels, each a callable or `sp.IndexedBase`:
+          e.g. `(sp.KroneckerDelta, G)` gives ⟨z[i, α] z[j, β]⟩ = δ(i, j) G[α, β]
+        - `sp.Expr`: constant variance, e.g. a `sp.Symbol` for scalar fields
+        - None: no rule
+
+    Returns
+    -------
+    Callable | None
+    """
+    if rule is None:
+        return None
+
+    if isinstance(rule, sp.IndexedBase):
+        return lambda a, b: rule[(*field_indices(a), *field_indices(b))]
+
+    if isinstance(rule, Sequence) and not isinstance(rule, str):
+        kernels = list(rule)
+
+        def per_index(a, b):
+            ia, ib = field_indices(a), field_indices(b)
+            if not len(ia) == len(ib) == len(kernels):
+                raise ValueError(
+                    f"Propagator has {len(kernels)} index kernels, got {a} and {b}"
+                )
+            return sp.Mul(*[
+                k[x, y] if isinstance(k, sp.IndexedBase) else k(x, y)
+                for k, x, y in zip(kernels, ia, ib)
+            ])
+        return per_index
+
+    if isinstance(rule, sp.Expr):
+        return lambda a, b: rule
+
+    if callable(rule):
+        return rule
+
+    raise TypeError(f"Unsupported propagator rule: {rule!r}")
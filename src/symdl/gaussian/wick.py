@@ -1,51 +1,146 @@
-from typing import Iterable
+from typing import Iterable, Iterator
+from collections import Counter
+from math import factorial, prod
 
 import sympy as sp
 from ..random import ExpVal
+from ..tensor.poly import TensorPoly
+from ..perturbation import TruncatedSeries
+from ..profiling import profiled
 
 def wick(expr: ExpVal):
     """
     Apply Wick's theorem to ExpVal of a product of random variables.
     Args:
-        expr: an ExpVal(Mul(...)) with all terms being RVs
+        expr: an ExpVal(Mul(...)) or ExpVal(Pow(...)) with all terms being RVs
 
     Returns:
         If any RV is non-Gaussian, leave it
-        
-        else, return sum of pairwise contractions (ExpVal(a*b) * ExpVal(c*d) + ...) or 0 if odd order
+
+        else, return sum of pairwise contractions (ExpVal(a*b) * ExpVal(c*d) + ...) or 0 if odd order.
+        Repeated RVs are treated as a multiset, so each distinct contraction pattern is emitted
+        once with its combinatorial multiplicity, e.g. ⟨z⁴⟩ → 3⟨z²⟩².
     """
     if not isinstance(expr, ExpVal):
         raise TypeError("wick() expects an ExpVal(...)")
 
-    inner = expr.args[0] # RVs 
+    inner = expr.args[0] # RVs
 
-    if not isinstance(inner, sp.Mul): # parse pruduct rv1 * rv2 * ... only
+    if isinstance(inner, sp.Mul): # parse pruduct rv1 * rv2 * ...
+        terms = flatten_rvs(inner.args) # [rv1, rv2, ...]
+    elif isinstance(inner, sp.Pow) and inner.exp.is_Integer and inner.exp > 0: # or a single power rv ** n
+        terms = flatten_rvs([inner])
+    else:
         return expr
 
-    terms = flatten_rvs(inner.args) # [rv1, rv2, ...]
-
     if not all(getattr(t, 'is_gaussian', False) for t in terms): # make sure all RVs are Gaussian
         return expr
 
     if len(terms) % 2 != 0:
         return 0  # odd moments vanish
 
-    def pairings(xs):
-        if not xs:
-            yield []
-        else:
-            x0 = xs[0]
-            for i in range(1, len(xs)):
-                for rest in pairings(xs[1:i] + xs[i+1:]):
-                    yield [(x0, xs[i])] + rest
-
     # Determine expectation class (ExpVal, GaussianEval, etc.)
     Ecls = type(expr)
 
-    return sp.Add(*[
-        sp.Mul(*[Ecls(a * b, *expr.args[1:]) for a, b in pair])
-        for pair in pairings(terms)
-    ])
+    counts = Counter(terms) # {rv: multiplicity}, insertion ordered
+    fields = list(counts)
+    numerator = prod(factorial(n) for n in counts.values())
+
+    contractions: dict[tuple[int, int], sp.Expr] = {}
+    def contract(i: int, j: int) -> sp.Expr:
+        if (i, j) not in contractions:
+            contractions[(i, j)] = pair_contraction(Ecls, expr.args[1:], fields[i], fields[j])
+        return contractions[(i, j)]
+
+    result = []
+    for pattern in multiset_pairings(list(counts.values())):
+        denominator = 1
+        factors = []
+        for (i, j), m in pattern:
+            denominator *= (2**m * factorial(m)) if i == j else factorial(m)
+            factors.append(contract(i, j)**m)
+        result.append(sp.Integer(numerator // denominator) * sp.Mul(*factors))
+
+    return sp.Add(*result)
+
+def pair_contraction(Ecls: type[ExpVal], params: tuple, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+    """
+    Two-point contraction ⟨a b⟩.
+
+    Uses the propagator rule of the expectation (e.g. `GaussianExpVal(K, propagator=...)`),
+    then the one shared by the base of a and b (`GaussianIndexedBase(..., propagator=...)`),
+    and otherwise leaves Ecls(a*b, *params) unevaluated.
+    """
+    get_rule = getattr(Ecls, 'propagator_rule', None)
+    rule = get_rule(*params) if get_rule is not None else None
+
+    if rule is None and isinstance(a, sp.Indexed) and isinstance(b, sp.Indexed) and a.base == b.base:
+        rule = getattr(a.base, 'propagator', None)
+
+    if rule is None:
+        return Ecls(a * b, *params)
+    return rule(a, b)
+
+def multiset_pairings(counts: list[int]) -> Iterator[list[tuple[tuple[int, int], int]]]:
+    """
+    Enumerate the distinct perfect matchings of a multiset.
+
+    Parameters
+    ----------
+    counts : list[int]
+        Multiplicity of each distinct element, e.g. [4] for z⁴ or [2, 2] for z₁² z₂².
+
+    Yields
+    ------
+    list[tuple[tuple[int, int], int]]
+        A contraction pattern [((i, j), m_ij), ...] with i <= j, meaning element i is
+        paired with element j exactly m_ij times. Each pattern is yielded once; it stands
+        for ∏ nᵢ! / (∏ 2^{m_ii} m_ii! ∏_{i<j} m_ij!) positional pairings.
+
+    Example
+    -------
+    >>> list(multiset_pairings([2, 2]))
+    [[((0, 0), 1), ((1, 1), 1)], [((0, 1), 2)]]
+    """
+    counts = list(counts)
+    n = len(counts)
+    pattern: list[tuple[tuple[int, int], int]] = []
+
+    def distribute(i: int, j: int, left: int):
+        # pair the remaining `left` copies of element i with elements j, j+1, ...
+        if left == 0:
+            yield from pair_from(i + 1)
+            return
+        if left > sum(counts[j:]):
+            return
+        for m in range(min(left, counts[j]), -1, -1):
+            counts[j] -= m
+            if m:
+                pattern.append(((i, j), m))
+            yield from distribute(i, j + 1, left - m)
+            if m:
+                pattern.pop()
+            counts[j] += m
+
+    def pair_from(i: int):
+        while i < n and counts[i] == 0:
+            i += 1
+        if i == n:
+            yield list(pattern)
+            return
+        r = counts[i]
+        counts[i] = 0
+        for m in range(r // 2, -1, -1): # number of self-contractions of element i
+            if m:
+                pattern.append(((i, i), m))
+            yield from distribute(i, i + 1, r - 2 * m)
+            if m:
+                pattern.pop()
+        counts[i] = r
+
+    if sum(counts) % 2 != 0:
+        return
+    yield from pair_from(0)
 
 def flatten_rvs(args: Iterable) -> list:
 
@@ -67,11 +162,16 @@ def flatten_rvs(args: Iterable) -> list:
             flat.append(term)
     return flat
 
+@profiled
 def wick_contraction(expr: sp.Expr) -> sp.Expr:
     """
     Recursively apply Wick contraction to all ExpVal(...) nodes in the expression.
     """
+    if isinstance(expr, TensorPoly):
+        return expr.replace_factors(wick_contraction)
+    if isinstance(expr, TruncatedSeries):
+        return expr.map(wick_contraction)
     return expr.replace(
         lambda e: isinstance(e, ExpVal),
         lambda e: wick(e)
-    )
\ No newline at end of file
+    )
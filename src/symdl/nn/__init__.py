@@ -1,3 +1,4 @@
 from .layer import Layer
+from .network import Network
 from .indexed import NNIndexedBase, NNIndexed, NeuronIdx, SampleIdx
 from .utils import sample_indices, neuron_indices
\ No newline at end of file
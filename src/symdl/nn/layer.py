@@ -1,9 +1,8 @@
 import sympy as sp
 from .indexed import NNIndexedBase, NeuronIdx
+from ..tensor.dummy import fresh_index, symbol_names
 
 class Layer:
-    _counter = 0  
-
     def __init__(self, 
                  W: sp.IndexedBase | NNIndexedBase, 
                  b: sp.IndexedBase | NNIndexedBase,
@@ -20,10 +19,16 @@ class Layer:
         self._C_w = C_w
         self._C_b = C_b
 
-    def _get_dummy_index(self, prefix='k'):
-        """Generate a unique dummy index each call."""
-        Layer._counter += 1
-        return NeuronIdx(f'{prefix}_{Layer._counter}')
+    def _get_dummy_index(self, *exprs, prefix='k'):
+        """
+        First k_n not used by `exprs` or the layer's own symbols.
+
+        The same entry always gets the same dummy, e.g. z[i, alpha] sums over k_1 and
+        z[k_1, alpha] over k_2; Sums reusing a dummy are renamed when they are multiplied
+        or raised to a power, e.g. z[i, alpha]**2 (see `pull_sums_out_front`).
+        """
+        taken = symbol_names(self.W, self.b, self.x_in, sp.sympify(self.n_in), *exprs)
+        return fresh_index(prefix, taken, NeuronIdx)
 
     @property
     def preactivation(self):
@@ -43,7 +48,7 @@ class _PreactivationProxy:
     
     def __getitem__(self, idx_pair):
         i, alpha = idx_pair
-        k = self.outer._get_dummy_index()
+        k = self.outer._get_dummy_index(i, alpha)
         return (self.outer.b[i]
                 + sp.Sum(
                     self.outer.W[i, k] * self.outer.x_in[k, alpha],
@@ -58,7 +63,7 @@ class _MetricProxy:
 
     def __getitem__(self, idx_pair):
         alpha, beta = idx_pair
-        k = self.outer._get_dummy_index()
+        k = self.outer._get_dummy_index(alpha, beta)
         return (
             self.outer._C_b
             + (self.outer._C_w / self.outer.n_in)
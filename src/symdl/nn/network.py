@@ -0,0 +1,161 @@
+import sympy as sp
+
+from .indexed import NNIndexedBase, NeuronIdx, SampleIdx
+from .layer import Layer
+from ..gaussian import GaussianIndexedBase, wick_contraction
+from ..random import ExpVal, RandomIndexedBase
+from ..tensor import canonicalize_dummy_indices, collect_canonical_terms
+from ..tensor.dummy import compact_dummies, rename_clashing_dummies, symbol_names
+from ..utils import normalize_sums, pull_sums_out_front, LRUCache
+
+# placeholders of the generic transition z^(ℓ) = b + W σ^(ℓ-1), shared by every layer
+_C_b, _C_W = sp.symbols("C_b C_W", positive=True)
+_n = sp.Symbol("n", integer=True, positive=True)
+_sigma = RandomIndexedBase("sigma")
+_b = GaussianIndexedBase("b", propagator=lambda a, c: _C_b * sp.KroneckerDelta(a.indices[0], c.indices[0]))
+_W = GaussianIndexedBase("W", propagator=lambda a, c: (
+    _C_W / _n * sp.KroneckerDelta(a.indices[0], c.indices[0]) * sp.KroneckerDelta(a.indices[1], c.indices[1])
+))
+_i = [NeuronIdx(f"_i{k}") for k in range(1, 5)]
+_alpha = [SampleIdx(f"_alpha{k}") for k in range(1, 5)]
+
+def _integrate_parameters(expr: sp.Expr) -> sp.Expr:
+    # E[W.. b.. σ..] = <W..> <b..> E[σ..]: the parameters are Gaussian and independent
+    # of each other and of the previous layer
+    def split(e: ExpVal) -> sp.Expr:
+        params, rest = {}, []
+        for f in sp.Mul.make_args(e.args[0]):
+            base = getattr(f.as_base_exp()[0], "base", None)
+            if base in (_W, _b):
+                params.setdefault(base, []).append(f)
+            else:
+                rest.append(f)
+        if any(sum(f.as_base_exp()[1] for f in fs) % 2 for fs in params.values()):
+            return sp.S.Zero # zero-mean parameters: odd moments vanish
+        contracted = [wick_contraction(ExpVal(sp.Mul(*fs))) for fs in params.values()]
+        return sp.Mul(*contracted) * ExpVal(sp.Mul(*rest))
+
+    return expr.replace(lambda e: isinstance(e, ExpVal), split)
+
+def _moment(layer: Layer, slots: list[int]) -> sp.Expr:
+    z = sp.Mul(*[layer.preactivation[_i[k], _alpha[k]] for k in slots])
+    return _integrate_parameters(ExpVal(pull_sums_out_front(sp.expand(z))))
+
+def _simplify(expr: sp.Expr) -> sp.Expr:
+    expr = compact_dummies(normalize_sums(sp.expand(expr)))
+    return collect_canonical_terms(canonicalize_dummy_indices(sp.expand(expr)))
+
+def _derive(name: str) -> sp.Expr:
+    layer = Layer(_W, _b, _sigma, _n)
+    if name == "kernel":
+        return _simplify(_moment(layer, [0, 1]))
+    if name == "four_point": # connected
+        return _simplify(
+            _moment(layer, [0, 1, 2, 3])
+            - _moment(layer, [0, 1]) * _moment(layer, [2, 3])
+            - _moment(layer, [0, 2]) * _moment(layer, [1, 3])
+            - _moment(layer, [0, 3]) * _moment(layer, [1, 2])
+        )
+    raise ValueError(f"Unknown recursion: {name}")
+
+_templates = LRUCache(maxsize=None) # name: recursion in the placeholders
+
+class Network:
+    """
+    Deep MLP z^(ℓ)_{i;α} = b^(ℓ)_i + Σ_j W^(ℓ)_{ij} σ^(ℓ-1)_{j;α}, with z^(1) fed by the input x.
+
+    The biases and weights of layer ℓ are Gaussian, ⟨b b⟩ = C_b^(ℓ) δ and
+    ⟨W W⟩ = C_W^(ℓ)/n_{ℓ-1} δ δ, independent of the previous layers. The layer-to-layer
+    recursions for the two-point and connected four-point correlators are derived once,
+    for a generic layer with placeholder constants, widths and activations. Layer ℓ is then
+    a substitution of its own symbols, cached per layer.
+
+    Parameters
+    ----------
+    x : sp.IndexedBase
+        Network input x[k, α].
+    n0 : sp.Symbol | int
+        Input dimension.
+
+    Example
+    -------
+    >>> net = Network(sp.IndexedBase("x"), sp.Symbol("n0"))
+    >>> net.kernel(2, (i1, alpha1), (i2, alpha2))
+    C_W^(2)*KroneckerDelta(i1, i2)*Sum(𝔼[sigma^(1)[k_1, alpha1]*sigma^(1)[k_1, alpha2]], (k_1, 1, n_1))/n_1 + C_b^(2)*KroneckerDelta(i1, i2)
+    """
+    def __init__(self, x: sp.IndexedBase, n0: sp.Symbol | int):
+        self.x = x
+        self.n0 = n0
+        self._layers: dict[int, Layer] = {}
+        self._results: dict[tuple[str, int], sp.Expr] = {} # (recursion, ℓ): result
+
+    def width(self, l: int) -> sp.Symbol | int:
+        """n_ℓ, the number of neurons of layer ℓ (n0 for the input)."""
+        return self.n0 if l == 0 else sp.Symbol(f"n_{l}", integer=True, positive=True)
+
+    def activation(self, l: int) -> sp.IndexedBase:
+        """σ^(ℓ)[j, α] = σ(z^(ℓ)[j, α]), the input x for ℓ = 0."""
+        return self.x if l == 0 else NNIndexedBase(f"sigma^({l})", is_random=True)
+
+    def layer(self, l: int) -> Layer:
+        """Layer ℓ ≥ 1 with its parameters W^(ℓ), b^(ℓ) initialized with C_W^(ℓ), C_b^(ℓ)."""
+        if l < 1:
+            raise ValueError(f"Layers are numbered from 1, got {l}")
+        if l not in self._layers:
+            layer = Layer(
+                NNIndexedBase(f"W^({l})", is_gaussian=True),
+                NNIndexedBase(f"b^({l})", is_gaussian=True),
+                self.activation(l - 1),
+                self.width(l - 1),
+            )
+            layer.gaussian_init(*sp.symbols(f"C_W^({l}) C_b^({l})", positive=True))
+            self._layers[l] = layer
+        return self._layers[l]
+
+    def _instantiate(self, name: str, l: int) -> sp.Expr:
+        key = (name, l)
+        if key not in self._results:
+            layer = self.layer(l)
+            expr = _templates.get_or_compute(name, lambda: _derive(name)).xreplace({
+                _C_b: layer._C_b, _C_W: layer._C_w, _n: sp.sympify(layer.n_in),
+            }).replace(
+                lambda e: isinstance(e, sp.Indexed) and e.base == _sigma,
+                lambda e: layer.x_in[e.indices],
+            )
+            if l == 1: # deterministic input: the expectations of x have collapsed
+                expr = collect_canonical_terms(canonicalize_dummy_indices(compact_dummies(expr)))
+            self._results[key] = expr
+        return self._results[key]
+
+    def _at(self, expr: sp.Expr, pairs: tuple[tuple[sp.Symbol, sp.Symbol], ...]) -> sp.Expr:
+        rename = {}
+        for k, (i, alpha) in enumerate(pairs):
+            rename[_i[k]], rename[_alpha[k]] = i, alpha
+        taken = symbol_names(*rename.values())
+
+        def relabel(s: sp.Sum) -> sp.Sum: # keep the template's dummies apart from the given indices
+            (function,), limits = rename_clashing_dummies([s.function], list(s.limits), set(taken))
+            return sp.Sum(function, *limits)
+
+        return expr.replace(lambda e: isinstance(e, sp.Sum), relabel).xreplace(rename)
+
+    def kernel(self, l: int, *pairs: tuple[sp.Symbol, sp.Symbol]) -> sp.Expr:
+        """
+        E[z^(ℓ)_{i1;α1} z^(ℓ)_{i2;α2}] in terms of the activations of layer ℓ-1.
+
+        Parameters
+        ----------
+        l : int
+            Layer, from 1.
+        pairs : (i, α)
+            Two (neuron, sample) index pairs.
+        """
+        if len(pairs) != 2:
+            raise ValueError(f"kernel takes 2 (neuron, sample) pairs, got {len(pairs)}")
+        return self._at(self._instantiate("kernel", l), pairs)
+
+    def four_point(self, l: int, *pairs: tuple[sp.Symbol, sp.Symbol]) -> sp.Expr:
+        """Connected E[z^(ℓ) z^(ℓ) z^(ℓ) z^(ℓ)] in terms of the activations of layer ℓ-1, see `kernel`."""
+        if len(pairs) != 4:
+            raise ValueError(f"four_point takes 4 (neuron, sample) pairs, got {len(pairs)}")
+        return self._at(self._instantiate("four_point", l), pairs)
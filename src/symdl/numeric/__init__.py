@@ -0,0 +1,11 @@
+from .einsum import compile_einsum, EinsumFunction
+from .kernel import gauss_hermite, gaussian_activation_kernel, kernel_recursion
+from .montecarlo import (
+    Estimate,
+    field_moment,
+    iter_monte_carlo,
+    layer_sampler,
+    monte_carlo,
+    quartic_sampler,
+    validation_report,
+)
\ No newline at end of file
@@ -0,0 +1,166 @@
+from typing import Sequence
+from string import ascii_letters
+
+import sympy as sp
+
+from ..tensor.poly import TensorPoly, expand_terms
+
+try:
+    import numpy as np
+except ImportError: # optional, `pip install dlt-calc[numeric]`
+    np = None
+
+class _Term:
+    """One coeff * Π tensors summed over limits, as an einsum call."""
+    __slots__ = ("scalar", "scalar_args", "operands", "subscripts", "counts", "_paths")
+
+    def __init__(self, scalar: sp.Expr, operands: list[tuple], subscripts: str, counts: list[sp.Expr]):
+        self.scalar_args = sorted(scalar.free_symbols | set().union(*[c.free_symbols for c in counts]), key=sp.default_sort_key)
+        self.scalar = sp.lambdify(self.scalar_args, sp.Mul(scalar, *counts), "numpy")
+        self.operands = operands # ("tensor", (base name, axis sizes)) | ("delta", size) | ("ones", size)
+        self.subscripts = subscripts
+        self.counts = counts
+        self._paths: dict[tuple, list] = {} # operand shapes: einsum_path
+
+    def __call__(self, arrays: dict, values: dict):
+        coeff = self.scalar(*[values[s.name] for s in self.scalar_args])
+        if not self.operands:
+            return coeff
+        ops = []
+        for kind, arg in self.operands:
+            if kind == "tensor":
+                name, sizes = arg
+                array = arrays[name]
+                expected = tuple(_size(size, values) for size in sizes)
+                if array.shape != expected: # an index range must cover its whole axis
+                    raise ValueError(f"Array {name} has shape {array.shape}, its index ranges need {expected}")
+                ops.append(array)
+            elif kind == "delta":
+                ops.append(np.eye(_size(arg, values)))
+            else:
+                ops.append(np.ones(_size(arg, values)))
+        shapes = tuple(op.shape for op in ops)
+        if shapes not in self._paths:
+            self._paths[shapes] = np.einsum_path(self.subscripts, *ops, optimize="optimal")[0]
+        return coeff * np.einsum(self.subscripts, *ops, optimize=self._paths[shapes])
+
+def _size(expr: sp.Expr, values: dict) -> int:
+    return int(expr.xreplace({s: values[s.name] for s in expr.free_symbols}))
+
+class EinsumFunction:
+    """
+    Numerical evaluation of a compiled tensor expression, see `compile_einsum`.
+
+    Call with a NumPy array for each IndexedBase (by name) and a number for every other
+    symbol, including the index ranges (e.g. n, N_D). Returns an array over the free
+    indices, in the order given at compile time, or a scalar.
+    """
+    __slots__ = ("terms", "free", "bases")
+
+    def __init__(self, terms: list[_Term], free: list[tuple[sp.Symbol, sp.Expr]], bases: set[str]):
+        self.terms = terms
+        self.free = free
+        self.bases = bases
+
+    def __call__(self, arrays: dict, **values):
+        arrays = {getattr(k, "name", k): np.asarray(v) for k, v in arrays.items()}
+        missing = self.bases - arrays.keys()
+        if missing:
+            raise KeyError(f"No array given for {sorted(missing)}")
+        shape = tuple(_size(size, values) for _, size in self.free)
+        result = np.zeros(shape)
+        for term in self.terms:
+            result = result + term(arrays, values)
+        return result if shape else result.item()
+
+def _tensor_terms(expr) -> list[tuple]:
+    if isinstance(expr, TensorPoly):
+        return [
+            (coeff, [base**exp for base, exp in mono.factors], list(mono.limits))
+            for mono, coeff in expr
+        ]
+    return expand_terms(sp.sympify(expr))
+
+def compile_einsum(expr, free: Sequence[tuple[sp.Symbol, sp.Expr]] = ()) -> EinsumFunction:
+    """
+    Compile a sum of Sum(Π tensors) terms into one `numpy.einsum` call per term.
+
+    Index ranges must be (i, 1, n), covering whole array axes: sums starting elsewhere
+    are rejected, and arrays whose shape differs from their index ranges raise on call.
+    Every term is split into a scalar prefactor (symbols and numbers, evaluated with
+    `lambdify`) and its Indexed / KroneckerDelta factors, which become the einsum operands;
+    summed indices that no factor uses become their range size. Contraction paths are
+    precomputed with `einsum_path` on the first call for given shapes. Unlike
+    `.subs(...).doit()`, nothing is expanded over index values, so sizes in the thousands
+    are fine.
+
+    Parameters
+    ----------
+    expr : sp.Expr | TensorPoly
+        Products of Indexed tensors, KroneckerDelta and scalars, summed over
+        limits (i, 1, n); other factors such as unevaluated ExpVal are rejected.
+    free : Sequence[tuple[Symbol, Expr]]
+        Free indices with their range sizes, in the output order, e.g. [(alpha1, N_D)].
+
+    Returns
+    -------
+    EinsumFunction
+
+    Example
+    -------
+    >>> f = compile_einsum(Ezz_eps, free=[(alpha1, N_D), (alpha2, N_D)])
+    >>> f({"g": g_arr, "v": v_arr}, N_D=1000, n=50, epsilon=0.1)
+    """
+    if np is None:
+        raise ImportError("compile_einsum requires numpy, install it with `pip install dlt-calc[numeric]`")
+
+    free = [(idx, sp.sympify(size)) for idx, size in free]
+    free_idx = [idx for idx, _ in free]
+
+    terms, bases = [], set()
+    for coeff, factors, limits in _tensor_terms(expr):
+        for lim in limits:
+            if lim[1] != 1: # axis k of an array is index value k + 1
+                raise ValueError(f"Cannot compile Sum over {lim}: ranges must start at 1 to cover whole array axes")
+        summed = {lim[0]: lim[2] for lim in limits}
+        size_of = {**dict(free), **summed}
+        letters = {idx: ascii_letters[n] for n, idx in enumerate([*free_idx, *summed])}
+        if len(letters) > len(ascii_letters):
+            raise ValueError(f"Too many indices for einsum: {len(letters)}")
+
+        scalar, operands, inputs = coeff, [], []
+        for f in factors:
+            base, exp = f.as_base_exp()
+            if isinstance(base, sp.KroneckerDelta):
+                a, b = base.args
+                _check_indices(base, base.args, size_of)
+                operands.append(("delta", size_of[a]))
+                inputs.append(letters[a] + letters[b])
+            elif isinstance(base, sp.Indexed):
+                if not (exp.is_Integer and exp > 0):
+                    raise ValueError(f"Cannot compile {f}: only positive integer powers of tensors")
+                _check_indices(base, base.indices, size_of)
+                name = base.base.name
+                bases.add(name)
+                operands.extend([("tensor", (name, tuple(size_of[i] for i in base.indices)))] * int(exp))
+                inputs.extend([''.join(letters[i] for i in base.indices)] * int(exp))
+            elif not f.has(sp.Indexed, sp.KroneckerDelta) and f.free_symbols.isdisjoint(size_of):
+                scalar *= f
+            else:
+                raise ValueError(f"Cannot compile factor {f}: not a tensor, KroneckerDelta or scalar")
+
+        used = set(''.join(inputs))
+        counts = [size for idx, size in summed.items() if letters[idx] not in used]
+        for idx, size in free: # broadcast free indices the term does not depend on
+            if letters[idx] not in used:
+                operands.append(("ones", size))
+                inputs.append(letters[idx])
+        output = ''.join(letters[idx] for idx in free_idx)
+        terms.append(_Term(scalar, operands, ','.join(inputs) + '->' + output, counts))
+
+    return EinsumFunction(terms, free, bases)
+
+def _check_indices(factor: sp.Expr, indices: tuple, size_of: dict):
+    for idx in indices:
+        if idx not in size_of:
+            raise ValueError(f"Index {idx} of {factor} is neither summed nor declared free")
@@ -0,0 +1,132 @@
+from typing import Callable, Sequence
+
+import sympy as sp
+
+from ..utils.cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError: # optional, `pip install dlt-calc[numeric]`
+    np = None
+
+_nodes = LRUCache(maxsize=16) # order: (nodes, weights)
+
+def gauss_hermite(order: int) -> tuple:
+    """
+    Nodes and weights of `order`-point Gauss–Hermite quadrature for E[f(u)], u ~ N(0, 1).
+
+    Cached per order.
+    """
+    def compute():
+        u, w = np.polynomial.hermite_e.hermegauss(order)
+        return u, w / np.sqrt(2 * np.pi)
+    return _nodes.get_or_compute(order, compute)
+
+def _as_numpy(sigma) -> Callable:
+    # sympy activations (sp.tanh, Lambda(x, ...)) are lambdified, numpy callables kept
+    if isinstance(sigma, (sp.FunctionClass, sp.Lambda)):
+        x = sp.Dummy("x")
+        return sp.lambdify(x, sigma(x), "numpy")
+    return sigma
+
+def gaussian_activation_kernel(
+    K: "np.ndarray",
+    sigma: Callable,
+    order: int = 32,
+    chunk_size: int = 2048,
+) -> "np.ndarray":
+    """
+    ⟨σ(z_α) σ(z_β)⟩_K for all sample pairs, z ~ N(0, K).
+
+    Each pair is a 2-D Gaussian integral, written with the Cholesky factor of its 2×2 block,
+    z_α = √K_αα u, z_β = K_αβ/√K_αα u + √(K_ββ - K_αβ²/K_αα) v, and evaluated on the
+    order × order Gauss–Hermite grid. The pairs α ≤ β are processed `chunk_size` at a time,
+    so memory is O(chunk_size · order²) whatever the number of samples.
+
+    Parameters
+    ----------
+    K : np.ndarray
+        N_D × N_D kernel.
+    sigma : callable
+        Activation, vectorized over numpy arrays (e.g. np.tanh), or a sympy function.
+    order : int
+        Quadrature points per dimension.
+    chunk_size : int
+        Sample pairs per vectorized batch.
+
+    Returns
+    -------
+    np.ndarray
+        N_D × N_D matrix.
+    """
+    if np is None:
+        raise ImportError("gaussian_activation_kernel requires numpy, install it with `pip install dlt-calc[numeric]`")
+    sigma = _as_numpy(sigma)
+    K = np.asarray(K, dtype=float)
+    u, w = gauss_hermite(order)
+    W2 = np.outer(w, w)
+
+    a, b = np.triu_indices(K.shape[0])
+    result = np.empty(K.shape)
+    for start in range(0, len(a), chunk_size):
+        ia, ib = a[start:start + chunk_size], b[start:start + chunk_size]
+        Kaa, Kab, Kbb = K[ia, ia], K[ia, ib], K[ib, ib]
+        s = np.sqrt(Kaa)
+        c = np.divide(Kab, s, out=np.zeros_like(Kab), where=s > 0)
+        r = np.sqrt(np.clip(Kbb - c**2, 0, None))
+        za = s[:, None] * u # (P, order)
+        zb = c[:, None, None] * u[:, None] + r[:, None, None] * u[None, :] # (P, u, v)
+        values = np.einsum("pu,puv,uv->p", sigma(za), sigma(zb), W2)
+        result[ia, ib] = values
+        result[ib, ia] = values
+    return result
+
+def kernel_recursion(
+    x: "np.ndarray",
+    C_b: float | Sequence[float],
+    C_W: float | Sequence[float],
+    sigma: Callable,
+    depth: int,
+    order: int = 32,
+    chunk_size: int = 2048,
+) -> list["np.ndarray"]:
+    """
+    Infinite-width kernels K^(1), ..., K^(depth) of an MLP over a dataset.
+
+    K^(1) = C_b + C_W/n0 x xᵀ and K^(ℓ+1) = C_b + C_W ⟨σ σ⟩_{K^(ℓ)}, with the Gaussian
+    expectations from `gaussian_activation_kernel`; this is `Layer.layer_metric` and
+    `Network.kernel` evaluated numerically.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Inputs, shape (N_D, n0).
+    C_b, C_W : float | Sequence[float]
+        Initialization hyperparameters, shared or one per layer.
+    sigma : callable
+        Activation, vectorized over numpy arrays, or a sympy function.
+    depth : int
+        Number of layers.
+    order, chunk_size : int
+        See `gaussian_activation_kernel`.
+
+    Returns
+    -------
+    list[np.ndarray]
+        The N_D × N_D kernel of each layer.
+
+    Example
+    -------
+    >>> kernel_recursion(x, C_b=0.0, C_W=2.0, sigma=lambda z: np.maximum(z, 0), depth=5)[-1]
+    """
+    if np is None:
+        raise ImportError("kernel_recursion requires numpy, install it with `pip install dlt-calc[numeric]`")
+    x = np.asarray(x, dtype=float)
+    C_b = list(C_b) if isinstance(C_b, Sequence) else [C_b] * depth
+    C_W = list(C_W) if isinstance(C_W, Sequence) else [C_W] * depth
+
+    kernels = [C_b[0] + C_W[0] / x.shape[1] * x @ x.T]
+    for l in range(1, depth):
+        sigma_sigma = gaussian_activation_kernel(kernels[-1], sigma, order, chunk_size)
+        kernels.append(C_b[l] + C_W[l] * sigma_sigma)
+    return kernels
@@ -0,0 +1,199 @@
+from typing import Callable, Iterator, NamedTuple, Sequence
+from math import prod
+
+import sympy as sp
+
+from .kernel import _as_numpy
+
+try:
+    import numpy as np
+except ImportError: # optional, `pip install dlt-calc[numeric]`
+    np = None
+
+Sampler = Callable[["np.random.Generator", int], tuple["np.ndarray", "np.ndarray | None"]] # (samples, weights)
+
+class Estimate(NamedTuple):
+    value: float
+    stderr: float
+    n_samples: int
+
+def field_moment(*pairs: tuple[int, int]) -> Callable[["np.ndarray"], "np.ndarray"]:
+    """
+    z[i1, α1] z[i2, α2] ... per sample, for samples of shape (batch, n, N_D).
+
+    Indices are 0-based array positions.
+    """
+    return lambda z: prod(z[:, i, a] for i, a in pairs)
+
+def layer_sampler(
+    x: "np.ndarray",
+    widths: Sequence[int],
+    C_b: float | Sequence[float],
+    C_W: float | Sequence[float],
+    sigma: Callable | None = None,
+) -> Sampler:
+    """
+    Preactivations z^(L) of randomly initialized MLPs on a fixed dataset.
+
+    Each sample is one network: b^(ℓ) ~ N(0, C_b), W^(ℓ) ~ N(0, C_W/n_{ℓ-1}),
+    z^(1) = b + W x and z^(ℓ+1) = b + W σ(z^(ℓ)), as `Layer` / `Network` define them.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Inputs, shape (N_D, n0).
+    widths : Sequence[int]
+        n_1, ..., n_L; a single `Layer` is widths=[n_1].
+    C_b, C_W : float | Sequence[float]
+        Shared or per-layer initialization hyperparameters.
+    sigma : callable | None
+        Activation between layers, numpy or sympy; needed if there are several layers.
+
+    Returns
+    -------
+    Sampler
+        (rng, batch) → (z of shape (batch, n_L, N_D), None)
+    """
+    if np is None:
+        raise ImportError("layer_sampler requires numpy, install it with `pip install dlt-calc[numeric]`")
+    x = np.asarray(x, dtype=float).T # (n0, N_D)
+    depth = len(widths)
+    C_b = list(C_b) if isinstance(C_b, Sequence) else [C_b] * depth
+    C_W = list(C_W) if isinstance(C_W, Sequence) else [C_W] * depth
+    if depth > 1 and sigma is None:
+        raise ValueError("An activation is needed between layers")
+    sigma = _as_numpy(sigma)
+
+    def sample(rng: "np.random.Generator", batch: int):
+        h = np.broadcast_to(x, (batch, *x.shape))
+        for l, n in enumerate(widths):
+            n_in = h.shape[1]
+            W = rng.standard_normal((batch, n, n_in)) * np.sqrt(C_W[l] / n_in)
+            b = rng.standard_normal((batch, n, 1)) * np.sqrt(C_b[l])
+            z = b + W @ h
+            h = sigma(z) if l + 1 < depth else z
+        return z, None
+    return sample
+
+def quartic_sampler(g: "np.ndarray", v: "np.ndarray", eps: float, n: int) -> Sampler:
+    """
+    Fields z[i, α] of the quartic action of ch04, by importance sampling.
+
+    S[z] = 1/2 Σ_i z_i g⁻¹ z_i - ε/8 Σ v^{(β1β2)(β3β4)} Σ_{j1,j2} z_{j1β1} z_{j1β2} z_{j2β3} z_{j2β4}:
+    samples are drawn from the Gaussian part, N(0, g) for each neuron i, and weighted by
+    exp(ε/8 Σ v M M) with M_{β1β2} = Σ_j z_{jβ1} z_{jβ2}. The weights are only well-behaved
+    for small ε, which is the regime of the perturbative results being checked.
+
+    Returns
+    -------
+    Sampler
+        (rng, batch) → (z of shape (batch, n, N_D), weights of shape (batch,))
+    """
+    if np is None:
+        raise ImportError("quartic_sampler requires numpy, install it with `pip install dlt-calc[numeric]`")
+    L = np.linalg.cholesky(np.asarray(g, dtype=float))
+    v = np.asarray(v, dtype=float)
+
+    def sample(rng: "np.random.Generator", batch: int):
+        z = rng.standard_normal((batch, n, L.shape[0])) @ L.T
+        M = np.einsum("bja,bjc->bac", z, z)
+        log_w = eps / 8 * np.einsum("pqrs,bpq,brs->b", v, M, M, optimize=True)
+        return z, np.exp(log_w)
+    return sample
+
+def iter_monte_carlo(
+    sampler: Sampler,
+    moments: dict[str, Callable],
+    n_samples: int,
+    *,
+    derived: dict[str, Callable[[dict], float]] | None = None,
+    batch_size: int = 10_000,
+    n_bins: int = 32,
+    seed: int = 0,
+) -> Iterator[dict[str, Estimate]]:
+    """
+    Stream Monte Carlo estimates of moments and functions of them, one update per batch.
+
+    Samples are drawn `batch_size` at a time from `np.random.default_rng(seed)`, so runs are
+    reproducible and memory does not grow with `n_samples`: only weighted sums per bin are
+    kept. Standard errors use batch means over `n_bins` consecutive bins, which also
+    covers `derived` quantities such as connected correlators.
+
+    Parameters
+    ----------
+    sampler : Sampler
+        (rng, batch) → (samples, weights or None), e.g. `layer_sampler`, `quartic_sampler`.
+    moments : dict[str, callable]
+        name → per-sample value, e.g. `field_moment((0, 0), (1, 1))`.
+    n_samples : int
+        Total number of samples.
+    derived : dict[str, callable] | None
+        name → function of the dict of moment means.
+    batch_size, n_bins, seed : int
+
+    Yields
+    ------
+    dict[str, Estimate]
+        Running estimates of all moments and derived quantities.
+    """
+    if np is None:
+        raise ImportError("iter_monte_carlo requires numpy, install it with `pip install dlt-calc[numeric]`")
+    derived = derived or {}
+    names = list(moments)
+    n_batches = -(-n_samples // batch_size)
+    n_bins = min(n_bins, n_batches)
+    sum_w = np.zeros(n_bins)
+    sum_wf = np.zeros((n_bins, len(names)))
+
+    rng = np.random.default_rng(seed)
+    drawn = 0
+    for k in range(n_batches):
+        batch = min(batch_size, n_samples - drawn)
+        samples, weights = sampler(rng, batch)
+        if weights is None:
+            weights = np.ones(batch)
+        values = np.stack([np.asarray(moments[name](samples), dtype=float) for name in names], axis=1)
+        bin_ = k * n_bins // n_batches
+        sum_w[bin_] += weights.sum()
+        sum_wf[bin_] += weights @ values
+        drawn += batch
+        yield _estimates(names, derived, sum_w[:bin_ + 1], sum_wf[:bin_ + 1], drawn)
+
+def _estimates(names: list[str], derived: dict, sum_w, sum_wf, drawn: int) -> dict[str, Estimate]:
+    def quantities(w, wf) -> list[float]:
+        means = dict(zip(names, wf / w))
+        return [means[name] for name in names] + [f(means) for f in derived.values()]
+
+    total = quantities(sum_w.sum(), sum_wf.sum(axis=0))
+    filled = sum_w > 0
+    per_bin = np.array([quantities(w, wf) for w, wf in zip(sum_w[filled], sum_wf[filled])])
+    k = len(per_bin)
+    stderr = per_bin.std(axis=0, ddof=1) / np.sqrt(k) if k > 1 else np.full(len(total), np.nan)
+    return {
+        name: Estimate(float(value), float(err), drawn)
+        for name, value, err in zip([*names, *derived], total, stderr)
+    }
+
+def monte_carlo(sampler: Sampler, moments: dict[str, Callable], n_samples: int, **kwargs) -> dict[str, Estimate]:
+    """Final estimates of `iter_monte_carlo`."""
+    for estimates in iter_monte_carlo(sampler, moments, n_samples, **kwargs):
+        pass
+    return estimates
+
+def validation_report(estimates: dict[str, Estimate], expected: dict[str, float | sp.Expr]) -> str:
+    """
+    Table of Monte Carlo estimates ± standard error against the symbolic values.
+
+    `expected` values may be numbers or SymPy expressions that evaluate to numbers (e.g. a
+    result with `.subs(...).doit()` applied, or a `compile_einsum` output). The last column
+    is (estimate - expected) / stderr.
+    """
+    lines = [f"{'quantity':<16}{'estimate':>14}{'stderr':>12}{'expected':>14}{'z':>8}"]
+    for name, est in estimates.items():
+        if name in expected:
+            target = float(sp.N(expected[name]))
+            z = (est.value - target) / est.stderr if est.stderr > 0 else float("nan")
+            lines.append(f"{name:<16}{est.value:>14.6g}{est.stderr:>12.3g}{target:>14.6g}{z:>8.2f}")
+        else:
+            lines.append(f"{name:<16}{est.value:>14.6g}{est.stderr:>12.3g}")
+    return "\n".join(lines)
@@ -0,0 +1 @@
+from .series import TruncatedSeries
\ No newline at end of file
@@ -0,0 +1,171 @@
+from typing import Callable
+
+import sympy as sp
+
+from ..random import ExpVal
+from ..utils.sum import pull_sums_out_front
+
+class TruncatedSeries:
+    """
+    Power series c_0 + c_1 ε + ... + c_{n-1} ε^{n-1} in a small parameter ε.
+
+    Orders ε^n and above are dropped in every operation, so products, quotients,
+    exponentials and expectations only ever build the coefficients that are kept.
+    `GaussianExpVal` and `wick_contraction` act on it coefficient-wise.
+
+    Parameters
+    ----------
+    coeffs : list
+        Coefficients c_0, c_1, ...; missing ones are zero, extra ones are dropped.
+    eps : sp.Symbol
+        The expansion parameter.
+    n : int
+        Number of orders kept, like `sp.series(expr, eps, 0, n)`.
+
+    Example
+    -------
+    >>> S = TruncatedSeries.from_expr(quartic_action, eps, 2)
+    >>> Ezz = EK(z[mu1] * z[mu2] * S.exp()) / EK(S.exp())
+    >>> wick_contraction(Ezz).as_expr()
+    """
+    __slots__ = ("coeffs", "eps", "n")
+
+    def __init__(self, coeffs: list, eps: sp.Symbol, n: int):
+        coeffs = [sp.sympify(c) for c in list(coeffs)[:n]]
+        self.coeffs = coeffs + [sp.S.Zero] * (n - len(coeffs))
+        self.eps = eps
+        self.n = n
+
+    @classmethod
+    def from_expr(cls, expr: sp.Basic, eps: sp.Symbol, n: int) -> "TruncatedSeries":
+        """
+        Expand `expr` in eps, truncating at every step.
+
+        Add, Mul, integer Pow, exp, Sum and expectations are expanded structurally;
+        anything else containing eps goes through `sp.series`.
+        """
+        expr = sp.sympify(expr)
+        if not expr.has(eps):
+            return cls([expr], eps, n)
+        if expr == eps:
+            return cls([0, 1], eps, n)
+
+        if isinstance(expr, sp.Add):
+            return sum((cls.from_expr(arg, eps, n) for arg in expr.args), cls([], eps, n))
+
+        if isinstance(expr, sp.Mul):
+            result = cls([1], eps, n)
+            for arg in expr.args:
+                result = result * cls.from_expr(arg, eps, n)
+            return result
+
+        if isinstance(expr, sp.Pow) and expr.exp.is_Integer:
+            return cls.from_expr(expr.base, eps, n) ** int(expr.exp)
+
+        if isinstance(expr, sp.exp):
+            return cls.from_expr(expr.args[0], eps, n).exp()
+
+        if isinstance(expr, sp.Sum):
+            return cls.from_expr(expr.function, eps, n).map(lambda c: sp.Sum(c, *expr.limits))
+
+        if isinstance(expr, ExpVal):
+            return cls.from_expr(expr.args[0], eps, n).expectation(type(expr), *expr.args[1:])
+
+        expanded = sp.series(expr, eps, 0, n).removeO()
+        return cls([expanded.coeff(eps, k) for k in range(n)], eps, n)
+
+    def as_expr(self) -> sp.Expr:
+        return sp.Add(*[c * self.eps**k for k, c in enumerate(self.coeffs)])
+
+    def coeff(self, k: int) -> sp.Expr:
+        """Coefficient of eps**k."""
+        return self.coeffs[k] if k < self.n else sp.S.Zero
+
+    def map(self, func: Callable[[sp.Expr], sp.Expr]) -> "TruncatedSeries":
+        """Apply a function linear in eps (e.g. wick_contraction) to every coefficient."""
+        return TruncatedSeries([func(c) for c in self.coeffs], self.eps, self.n)
+
+    def expectation(self, Ecls: type[ExpVal], *params) -> "TruncatedSeries":
+        """
+        E[Σ c_k ε^k] = Σ E[c_k] ε^k.
+
+        Sums are pulled out of every coefficient first, so that E is linear over them
+        and `wick_contraction` sees products of fields, e.g. E[z z Sum(V z z z z)].
+        """
+        return self.map(lambda c: Ecls(pull_sums_out_front(c), *params))
+
+    def _coerce(self, other) -> "TruncatedSeries":
+        if isinstance(other, TruncatedSeries):
+            if other.eps != self.eps:
+                raise ValueError(f"Cannot combine series in {self.eps} and {other.eps}")
+            return other
+        return TruncatedSeries.from_expr(other, self.eps, self.n)
+
+    def __add__(self, other) -> "TruncatedSeries":
+        other = self._coerce(other)
+        n = min(self.n, other.n)
+        return TruncatedSeries([a + b for a, b in zip(self.coeffs, other.coeffs)], self.eps, n)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "TruncatedSeries":
+        return self.map(lambda c: -c)
+
+    def __sub__(self, other) -> "TruncatedSeries":
+        return self + (-self._coerce(other))
+
+    def __rsub__(self, other) -> "TruncatedSeries":
+        return self._coerce(other) - self
+
+    def __mul__(self, other) -> "TruncatedSeries":
+        if not isinstance(other, TruncatedSeries) and not sp.sympify(other).has(self.eps):
+            return self.map(lambda c: c * other)
+        other = self._coerce(other)
+        n = min(self.n, other.n)
+        a, b = self.coeffs, other.coeffs
+        return TruncatedSeries([
+            sp.Add(*[a[i] * b[k - i] for i in range(k + 1)]) for k in range(n)
+        ], self.eps, n)
+
+    __rmul__ = __mul__
+
+    def reciprocal(self) -> "TruncatedSeries":
+        """1 / self, requires a nonzero constant term."""
+        a = self.coeffs
+        if a[0] == 0:
+            raise ZeroDivisionError("Series without constant term has no truncated reciprocal")
+        r = [1 / a[0]]
+        for k in range(1, self.n): # Σ_{j=0}^{k} a_j r_{k-j} = 0
+            r.append(-sp.Add(*[a[j] * r[k - j] for j in range(1, k + 1)]) / a[0])
+        return TruncatedSeries(r, self.eps, self.n)
+
+    def __truediv__(self, other) -> "TruncatedSeries":
+        if not isinstance(other, TruncatedSeries) and not sp.sympify(other).has(self.eps):
+            return self.map(lambda c: c / other)
+        return self * self._coerce(other).reciprocal()
+
+    def __rtruediv__(self, other) -> "TruncatedSeries":
+        return self._coerce(other) * self.reciprocal()
+
+    def __pow__(self, k: int) -> "TruncatedSeries":
+        if k < 0:
+            return self.reciprocal() ** -k
+        result = TruncatedSeries([1], self.eps, self.n)
+        base = self
+        while k: # square and multiply
+            if k & 1:
+                result = result * base
+            base = base * base
+            k >>= 1
+        return result
+
+    def exp(self) -> "TruncatedSeries":
+        """exp(self), from E' = A' E: k e_k = Σ_{j=1}^{k} j a_j e_{k-j}."""
+        a = self.coeffs
+        e = [sp.exp(a[0])]
+        for k in range(1, self.n):
+            e.append(sp.Add(*[j * a[j] * e[k - j] for j in range(1, k + 1)]) / k)
+        return TruncatedSeries(e, self.eps, self.n)
+
+    def __repr__(self) -> str:
+        return f"TruncatedSeries({self.as_expr()} + O({self.eps}**{self.n}))"
\ No newline at end of file
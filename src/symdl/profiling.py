@@ -0,0 +1,198 @@
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, NamedTuple
+
+import sympy as sp
+
+# public transforms of `symdl`, each decorated with `profiled` where it is defined
+TRANSFORMS = (
+    "canonicalize_dummy_indices",
+    "collect_canonical_terms",
+    "connected_correlator",
+    "diagram_contraction",
+    "perturbative_expectation",
+    "wick_contraction",
+    "normalize_sums",
+    "pull_coef_out_sum",
+    "pull_sums_out_front",
+    "remove_irrelevant_sums",
+    "sum_kronecker_contract",
+    "wild_subs",
+)
+
+class TreeStats(NamedTuple):
+    nodes: int
+    sums: int
+    expvals: int
+
+class StageStats:
+    """
+    Totals of the calls to one transform: wall time (inclusive of the transforms it
+    calls), tree sizes of the first argument and of the result, and their Sum / ExpVal
+    node counts. `max_*` are the largest single tree seen.
+    """
+    __slots__ = ("calls", "time", "nodes_in", "nodes_out", "max_nodes_in", "max_nodes_out",
+                 "sums_in", "sums_out", "expvals_in", "expvals_out")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def add(self, elapsed: float, before: TreeStats, after: TreeStats):
+        self.calls += 1
+        self.time += elapsed
+        self.nodes_in += before.nodes
+        self.nodes_out += after.nodes
+        self.max_nodes_in = max(self.max_nodes_in, before.nodes)
+        self.max_nodes_out = max(self.max_nodes_out, after.nodes)
+        self.sums_in += before.sums
+        self.sums_out += after.sums
+        self.expvals_in += before.expvals
+        self.expvals_out += after.expvals
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else float("nan")
+
+class ProfileReport:
+    """
+    What `profile` recorded: `stages` per transform name and `caches`, the hits and misses
+    of every symdl cache during the profiled block, by "module.name".
+    """
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self.caches: dict[str, CacheStats] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": {name: s.as_dict() for name, s in self.stages.items()},
+            "caches": {name: {**c._asdict(), "hit_rate": c.hit_rate} for name, c in self.caches.items()},
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'transform':<28}{'calls':>7}{'time':>10}{'nodes in':>11}{'nodes out':>11}"
+                 f"{'max out':>9}{'Sum out':>9}{'E out':>7}"]
+        for name, s in sorted(self.stages.items(), key=lambda item: -item[1].time):
+            lines.append(f"{name:<28}{s.calls:>7}{s.time:>10.3f}{s.nodes_in:>11}{s.nodes_out:>11}"
+                         f"{s.max_nodes_out:>9}{s.sums_out:>9}{s.expvals_out:>7}")
+        if self.caches:
+            lines.append("")
+            lines.append(f"{'cache':<44}{'hits':>8}{'misses':>8}{'rate':>7}")
+            for name, c in self.caches.items():
+                lines.append(f"{name:<44}{c.hits:>8}{c.misses:>8}{c.hit_rate:>7.2f}")
+        return "\n".join(lines)
+
+    __repr__ = __str__
+
+def tree_stats(expr) -> TreeStats:
+    """Number of nodes, Sums and ExpVals in the tree of `expr` (or of its `as_expr()`)."""
+    from .random import ExpVal
+
+    if not isinstance(expr, sp.Basic):
+        if not hasattr(expr, "as_expr"): # e.g. a tuple of indices
+            return TreeStats(0, 0, 0)
+        expr = expr.as_expr() # TensorPoly, TruncatedSeries
+    nodes = sums = expvals = 0
+    for node in sp.preorder_traversal(expr):
+        nodes += 1
+        if isinstance(node, sp.Sum):
+            sums += 1
+        elif isinstance(node, ExpVal):
+            expvals += 1
+    return TreeStats(nodes, sums, expvals)
+
+def _symdl_modules() -> list:
+    return [m for name, m in list(sys.modules.items()) if m is not None and (name == "symdl" or name.startswith("symdl."))]
+
+def _cache_counts() -> dict[str, tuple[int, int]]:
+    from .utils.cache import LRUCache
+
+    counts = {}
+    for module in _symdl_modules():
+        for attr, value in vars(module).items():
+            if isinstance(value, LRUCache):
+                counts[f"{module.__name__}.{attr}"] = (value.hits, value.misses)
+            elif hasattr(value, "cache_parameters") and value.__module__ == module.__name__:
+                info = value.cache_info() # functools.lru_cache
+                counts[f"{module.__name__}.{attr}"] = (info.hits, info.misses)
+    return counts
+
+_report: ProfileReport | None = None # set by `profile` for the duration of its block
+_names: frozenset[str] = frozenset()
+_active: set[str] = set()
+
+def profiled(func: Callable) -> Callable:
+    """Record the calls to `func` made inside a `profile` block, under `func.__name__`."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _report is None or name in _active or name not in _names: # recursive calls count in the outer one
+            return func(*args, **kwargs)
+        before = tree_stats(args[0]) if args else TreeStats(0, 0, 0)
+        _active.add(name)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _active.discard(name)
+        _report.stages.setdefault(name, StageStats()).add(elapsed, before, tree_stats(result))
+        return result
+
+    return wrapper
+
+@contextmanager
+def profile(transforms: tuple[str, ...] = TRANSFORMS):
+    """
+    Record every call to the public symdl transforms made inside the block.
+
+    The transforms are decorated with `profiled` where they are defined, so calls through
+    any name, e.g. after `from symdl.gaussian import wick_contraction`, and calls between
+    modules are recorded. Outside a `profile` block each call costs one check of a module
+    flag. Counting tree nodes walks every input and result, so profiled runs are slower
+    than plain ones.
+
+    Parameters
+    ----------
+    transforms : tuple of str
+        Names of the transforms to record, default `TRANSFORMS`.
+
+    Example
+    -------
+    >>> from symdl.gaussian import wick_contraction
+    >>> with profile() as report:
+    ...     Ez4 = wick_contraction(EK(z[mu1] * z[mu2] * z[mu3] * z[mu4]))
+    >>> report.stages["wick_contraction"].calls
+    1
+    >>> print(report)
+    """
+    global _report, _names
+    unknown = set(transforms) - set(TRANSFORMS)
+    if unknown:
+        raise ValueError(f"Not profiled transforms: {sorted(unknown)}")
+    if _report is not None:
+        raise RuntimeError("profile() blocks cannot be nested")
+    report = ProfileReport()
+    caches = _cache_counts()
+    _names = frozenset(transforms)
+    _report = report
+    try:
+        yield report
+    finally:
+        _report = None
+        _active.clear()
+        for name, (hits, misses) in _cache_counts().items():
+            hits0, misses0 = caches.get(name, (0, 0))
+            if hits - hits0 or misses - misses0:
+                report.caches[name] = CacheStats(hits - hits0, misses - misses0)
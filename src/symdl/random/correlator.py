@@ -1,64 +1,118 @@
-from typing import Generator
-from functools import cache, wraps
+from typing import Iterator, Sequence
+from itertools import combinations
 
 import sympy as sp
 
+from ..utils.cache import LRUCache
+from ..profiling import profiled
 from .expectation import ExpVal
 
-def all_nontrivial_partitions(seq: tuple[sp.Symbol, ...]) -> list[list[list[sp.Symbol]]]:
+def set_partitions(seq: Sequence, even_blocks: bool = False) -> Iterator[list[list]]:
     """
+    Lazily generate the set partitions of `seq`.
+
+    Parameters
+    ----------
+    seq : Sequence
+        Elements to partition.
+    even_blocks : bool
+        If True, only partitions whose blocks all have even size are generated.
+
+    Yields
+    ------
+    list[list]
+        A partition, as a list of blocks. The block holding seq[0] comes first.
+    """
+    if not seq:
+        yield []
+        return
+    if even_blocks and len(seq) % 2 == 1:
+        return
+
+    first, rest = seq[0], list(seq[1:])
+    for k in range(len(rest) + 1):
+        if even_blocks and k % 2 == 0: # block {first} + k others must be even
+            continue
+        for chosen in combinations(range(len(rest)), k):
+            block = [first] + [rest[i] for i in chosen]
+            chosen_set = set(chosen)
+            remaining = [x for i, x in enumerate(rest) if i not in chosen_set]
+            for partition in set_partitions(remaining, even_blocks):
+                yield [block] + partition
+
+def all_nontrivial_partitions(seq: tuple[sp.Symbol, ...], even_blocks: bool = False) -> Iterator[list[list[sp.Symbol]]]:
+    """
+    Lazily generate all partitions of `seq` into more than one block.
+
     Example
     --------
-    Input: 
+    Input:
         (a, b, c)
 
     Output (order not guaranteed):
 
-        [
-            [['a'], ['b', 'c']],
-            [['a', 'b'], ['c']],
-            [['b'], ['a', 'c']],
-            [['a'], ['b'], ['c']]
-        ]
+        [['a'], ['b', 'c']],
+        [['a', 'b'], ['c']],
+        [['b'], ['a', 'c']],
+        [['a'], ['b'], ['c']]
     """
-    if not seq:
-        return []
+    for partition in set_partitions(seq, even_blocks):
+        if len(partition) > 1:
+            yield partition
 
-    partitions: list[list[list[sp.Symbol]]] = [[[seq[0]]]]
+_templates = LRUCache(maxsize=128) # (z, index shapes, even_parity): (placeholders, result)
 
-    for symbol in seq[1:]:
-        new_partitions = []
-        for part in partitions:
-            # Insert symbol into each subset
-            for i in range(len(part)):
-                new_part = [subset.copy() for subset in part]
-                new_part[i].append(symbol)
-                new_partitions.append(new_part)
-            # Add symbol as its own subset
-            new_partitions.append(part + [[symbol]])
-        partitions = new_partitions
+def _index_shape(idx):
+    # Symbol-like indices are interchangeable within their class and assumptions,
+    # anything else (integers, expressions) is kept literally
+    if isinstance(idx, tuple):
+        return tuple(_index_shape(i) for i in idx)
+    if isinstance(idx, sp.Symbol):
+        return (type(idx), frozenset(idx.assumptions0.items()))
+    return ("literal", idx)
 
-    return [p for p in partitions if len(p) > 1]
+def _placeholders(indices: tuple, shape: tuple, counter: list[int]) -> tuple:
+    result = []
+    for idx, s in zip(indices, shape):
+        if isinstance(idx, tuple):
+            result.append(_placeholders(idx, s, counter))
+        elif isinstance(idx, sp.Symbol):
+            result.append(type(idx)(f"_{counter[0]}", **idx.assumptions0))
+            counter[0] += 1
+        else:
+            result.append(idx)
+    return tuple(result)
 
-def __cached_with_doc(fn):
-    return cache(wraps(fn)(fn))
+def _flat_pairs(placeholders: tuple, indices: tuple) -> list[tuple]:
+    pairs = []
+    for p, idx in zip(placeholders, indices):
+        if isinstance(idx, tuple):
+            pairs.extend(_flat_pairs(p, idx))
+        elif p != idx:
+            pairs.append((p, idx))
+    return pairs
 
-
-@__cached_with_doc
+@profiled
 def connected_correlator(
     z: sp.IndexedBase,
     indices: tuple[sp.Symbol, ...],
     even_parity: bool = True
-) -> sp.Expr: 
+) -> sp.Expr:
     """
-    Recursively compute the connected correlator E[z[μ1]⋯z[μM]]_connected.
+    Compute the connected correlator E[z[μ1]⋯z[μM]]_connected.
+
+    The result is cached as a template over placeholder indices, keyed on z, the class
+    and assumptions of each index (or tuple of indices) and `even_parity`, so
+    (mu1, ..., mu4) and ((i1, a1), ..., (i4, a4)) each build the expansion once and later
+    calls only substitute their indices. The cache is LRU bounded; see
+    `connected_correlator.cache_info()` and `connected_correlator.cache_clear()`.
 
     Parameters
     ----------
     z : IndexedBase
         An indexed random variable.
     indices : tuple of sympy.Symbol
-        The indices μ1, μ2, ..., μM.
+        The indices μ1, μ2, ..., μM. An entry may be a tuple, giving z[i, α].
     even_parity : bool
         If True, odd-order cumulants vanish.
 
@@ -67,23 +121,70 @@ def connected_correlator(
     Expr
         A symbolic expression for the connected correlator.
     """
+    indices = tuple(indices)
+    shape = _index_shape(indices)
+
+    def build():
+        placeholders = _placeholders(indices, shape, [0])
+        return placeholders, _connected_correlator(z, placeholders, even_parity)
+
+    placeholders, template = _templates.get_or_compute((z, shape, even_parity), build)
+    return sp.sympify(template).xreplace(dict(_flat_pairs(placeholders, indices)))
+
+connected_correlator.cache_info = _templates.cache_info
+connected_correlator.cache_clear = _templates.cache_clear
+
+def _connected_correlator(
+    z: sp.IndexedBase,
+    indices: tuple,
+    even_parity: bool = True
+) -> sp.Expr:
+    """
+    Uncached connected correlator.
+
+    Uses the leave-one-out moment-cumulant recursion on the block containing μ1, so only
+    the 2^(M-1) subsets holding μ1 are visited instead of every set partition. With
+    even_parity, odd blocks and odd moments are skipped.
+    """
     M = len(indices)
 
     if even_parity and M % 2 == 1:
         return 0
-    
-    if M == 1:
-        return 0 if even_parity else ExpVal(z[indices[0]])
-    if M == 2:
-        i, j = indices
-        return ExpVal(z[i]*z[j]) if even_parity else ExpVal(z[i]*z[j]) - ExpVal(z[i]) * ExpVal(z[j])
-    
-    # Start from full moment
-    full: sp.Expr = ExpVal(sp.Mul(*[z[i] for i in indices]))
-    # Subtract products of connected correlators over all nontrivial partitions
-    for partition in all_nontrivial_partitions(indices):
-        term = 1
-        for subset in partition:
-            term *= connected_correlator(z, tuple(subset), even_parity)
-        full -= term
-    return full
\ No newline at end of file
+
+    moments: dict[tuple, sp.Expr] = {(): sp.S.One}
+    cumulants: dict[tuple, sp.Expr] = {}
+
+    def moment(subset: tuple) -> sp.Expr:
+        if subset not in moments:
+            moments[subset] = ExpVal(sp.Mul(*[z[indices[k]] for k in subset]))
+        return moments[subset]
+
+    def cumulant(subset: tuple) -> sp.Expr:
+        # moment-cumulant recursion on the block holding subset[0]:
+        # κ(S) = E[S] - Σ_{T ⊊ S∖{s₀}} κ({s₀} ∪ T) E[S ∖ ({s₀} ∪ T)]
+        if subset in cumulants:
+            return cumulants[subset]
+
+        n = len(subset)
+        if n == 1:
+            i = indices[subset[0]]
+            result = 0 if even_parity else ExpVal(z[i])
+        elif n == 2:
+            i, j = (indices[k] for k in subset)
+            result = ExpVal(z[i]*z[j]) if even_parity else ExpVal(z[i]*z[j]) - ExpVal(z[i]) * ExpVal(z[j])
+        else:
+            first, rest = subset[0], subset[1:]
+            terms = [moment(subset)]
+            for k in range(n - 1): # |T| = k < |rest|
+                if even_parity and k % 2 == 0: # odd block or odd remaining moment vanish
+                    continue
+                for chosen in combinations(range(n - 1), k):
+                    block = (first,) + tuple(rest[c] for c in chosen)
+                    remaining = tuple(x for c, x in enumerate(rest) if c not in chosen)
+                    terms.append(sp.Mul(sp.S.NegativeOne, cumulant(block), moment(remaining)))
+            result = sp.Add(*terms)
+
+        cumulants[subset] = result
+        return result
+
+    return cumulant(tuple(range(M)))
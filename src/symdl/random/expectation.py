@@ -1,21 +1,33 @@
 from sympy import Basic, Function, Add, Mul, Sum, Pow, Symbol, IndexedBase, Indexed, Number, Order
 
+from ..utils.cache import LRUCache
+
+# flag of every composite node, by structure, so equal subtrees rebuilt by later ExpVal
+# constructions (Wick terms, series coefficients) are not walked again. Bases with
+# different random facts are unequal (see TensorIndexedBase), so they never share a flag.
+_random_flags = LRUCache(maxsize=2**12)
+
 def is_random_expr(expr: Basic) -> bool:
     """
     Recursively determine if an expression involves randomness.
+
+    The flag of every composite node is kept in a bounded LRU keyed by the node, so
+    building ExpVal over expressions sharing subtrees visits each subtree once.
     """
     if isinstance(expr, ExpVal):
         return False  # 𝔼[X] is deterministic, even if X is random
     
     if getattr(expr, 'is_random', False):
         return True
-    if isinstance(expr, Sum):
-        return is_random_expr(expr.function)
+    if not isinstance(expr, (Sum, Add, Mul, Pow, Function)):
+        return False
 
-    if isinstance(expr, (Add, Mul, Pow, Function)):
-        return any(is_random_expr(arg) for arg in expr.args)
+    return _random_flags.get_or_compute(expr, lambda: _is_random_node(expr))
 
-    return False
+def _is_random_node(expr: Basic) -> bool:
+    if isinstance(expr, Sum):
+        return is_random_expr(expr.function)
+    return any(is_random_expr(arg) for arg in expr.args)
 
 def extract_random_and_deterministic(expr: Mul):
     """Split an expression into random and deterministic parts."""
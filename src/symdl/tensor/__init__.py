@@ -1,5 +1,8 @@
 from .indexed import TensorIndexedBase, TensorIndexed, TensorIdx
 from .symmetry import SymmetryMixin, SymmetryIndexedBase
 from .canonical import canonicalize_dummy_indices
+from .collect import collect_canonical_terms
+from .poly import TensorPoly
+from .dummy import fresh_index
 
 TensorIndexed.canonicalize = SymmetryMixin.canonicalize
\ No newline at end of file
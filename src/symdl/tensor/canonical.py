@@ -2,8 +2,11 @@ from typing import Iterator
 from itertools import permutations, product
 from collections import defaultdict
 
-from sympy import Expr, Symbol, Sum
+from sympy import Add, Dummy, Expr, Mul, Symbol, Sum, default_sort_key
+from ..profiling import profiled
 from .indexed import TensorIndexed
+from .graph import canonical_labeling, tensor_factors
+from .poly import TensorPoly
 
 def canonicalize_expr(expr: Expr) -> Expr:
     """Canonicalize all TensorIndexed terms in a Expr"""
@@ -126,12 +129,140 @@ def get_dummy_index_options(expr: Sum) -> list[Sum]:
     valid_orders = valid_permutations_by_group(symbols, group_ids)
     return [permute_limit_order(expr, new_order) for new_order in valid_orders]
 
+def _fresh_assignments(factor, perms, assign: dict, available: dict, pool_of: dict) -> Iterator[dict]:
+    # for each slot order, give the unassigned dummies the smallest free names of their
+    # pool in order of first appearance: the lexicographically smallest index tuple
+    indices = tensor_factors(factor)[0].indices
+    seen = set()
+    for perm in perms:
+        new = dict(assign)
+        taken = {gid: iter(names) for gid, names in available.items()}
+        fresh = []
+        for k in perm:
+            idx = indices[k]
+            if idx in pool_of and idx not in new:
+                new[idx] = next(taken[pool_of[idx]])
+                fresh.append(idx)
+        if tuple(fresh) not in seen: # slot orders only differing on named indices agree
+            seen.add(tuple(fresh))
+            yield new
+
+def lex_min_relabeling(expr: Sum) -> dict[Symbol, Symbol] | None:
+    """
+    Dummy relabeling of Sum(...) minimizing the sort_key of the canonicalized summand.
+
+    The summand is a product whose sort_key compares its factors in sorted order, so the
+    smallest factor reachable by any relabeling must come first: every factor is tried with
+    its dummies given the smallest free names (for each slot order allowed by its
+    symmetry), the minimal factor is fixed and the search continues with the names taken.
+    Ties are branched on, and branches whose remaining tensor networks agree up to renaming
+    of the unassigned dummies (`canonical_labeling`) are merged. This gives the same result
+    as trying all permutations, usually in polynomial time.
+
+    Returns
+    -------
+    dict[Symbol, Symbol] | None
+        old dummy → new dummy, or None if the summand is not a product of tensors
+        (Indexed, KroneckerDelta, their powers) and factors free of the summed indices.
+    """
+    limits = list(expr.limits)
+    symbols = [lim[0] for lim in limits]
+    group_ids = extract_group_indices(limits)
+    pool_of = dict(zip(symbols, group_ids))
+    domains = {sym: tuple(lim[1:]) for sym, lim in zip(symbols, limits)}
+
+    function = canonicalize_expr(expr.function)
+    if isinstance(function, Add):
+        return None
+
+    factors = list(Mul.make_args(function))
+    perms_of: dict[int, list] = {}
+    for n, f in enumerate(factors):
+        if f.free_symbols.isdisjoint(pool_of):
+            continue
+        network = tensor_factors(f)
+        if network is None:
+            return None
+        rank = len(network[0].indices)
+        symmetry = network[0].symmetry
+        perms_of[n] = list(permutations(range(rank))) if symmetry == "full" else list(symmetry)
+
+    names = defaultdict(list)
+    for sym, gid in zip(symbols, group_ids):
+        names[gid].append(sym)
+    names = {gid: sorted(pool, key=default_sort_key) for gid, pool in names.items()}
+
+    def available(assign: dict) -> dict:
+        used = set(assign.values())
+        return {gid: [s for s in pool if s not in used] for gid, pool in names.items()}
+
+    placeholders = {sym: Dummy(sym.name) for sym in symbols} # keep new and old names apart
+
+    def signature(assign: dict, remaining: tuple) -> tuple:
+        unassigned = {placeholders[s]: domains[s] for s in symbols if s not in assign}
+        rename = {s: assign.get(s, placeholders[s]) for s in symbols}
+        network = []
+        for n in remaining:
+            if n in perms_of:
+                network.extend(tensor_factors(factors[n].xreplace(rename)))
+        encoding, _ = canonical_labeling(network, unassigned)
+        free = tuple(n for n in remaining if n not in perms_of)
+        return encoding, free, tuple(sorted(assign.values(), key=default_sort_key))
+
+    dummies_of = {n: [s for s in symbols if s in factors[n].free_symbols] for n in range(len(factors))}
+    keys: dict[tuple, tuple] = {} # (factor, its relabeling): sort_key
+
+    states = [({}, tuple(range(len(factors))))] # (partial relabeling, remaining factors)
+    while states[0][1]:
+        best_key, best = None, {}
+        for assign, remaining in states:
+            free = available(assign)
+            for n in remaining:
+                if n in perms_of:
+                    options = _fresh_assignments(factors[n], perms_of[n], assign, free, pool_of)
+                else:
+                    options = [assign]
+                rest = tuple(m for m in remaining if m != n)
+                for new in options:
+                    named = (n, tuple((s, new[s]) for s in dummies_of[n]))
+                    if named not in keys:
+                        keys[named] = canonicalize_expr(factors[n].xreplace(new)).sort_key()
+                    key = keys[named]
+                    if best_key is not None and key > best_key:
+                        continue
+                    if best_key is None or key < best_key:
+                        best_key, best = key, {}
+                    best.setdefault(signature(new, rest), (new, rest))
+        states = list(best.values())
+
+    assign = states[0][0]
+    free = available(assign)
+    for sym in symbols: # dummies absent from the summand keep the leftover names
+        if sym not in assign:
+            assign[sym] = free[pool_of[sym]].pop(0)
+    return assign
+
+def _brute_force_canonical(expr: Sum) -> Sum:
+    return min(
+        (canonicalize_expr(opt) for opt in get_dummy_index_options(expr)),
+        key=lambda opt: opt.sort_key()
+    )
+
+def _canonical_sum(expr: Sum) -> Sum:
+    relabel = lex_min_relabeling(expr)
+    if relabel is None:
+        return _brute_force_canonical(expr)
+    new_order = [relabel[lim[0]] for lim in expr.limits]
+    return canonicalize_expr(permute_limit_order(expr, new_order))
+
+@profiled
 def canonicalize_dummy_indices(expr: Expr) -> Expr:
     """
     Recursively canonicalize all Sum(...) nodes in an expression by:
-    - Enumerating all dummy index permutations that preserve domain grouping
-    - Canonicalizing each variant (tensor-wise)
-    - Choosing the minimal one by SymPy's sort_key()
+    - Finding the dummy index relabeling, preserving domain grouping, that minimizes
+      SymPy's sort_key() of the tensor-wise canonicalized Sum (see `lex_min_relabeling`)
+    - Falling back to enumerating all such relabelings when the summand is not a
+      product of tensors
 
     Parameters
     ----------
@@ -143,10 +274,9 @@ def canonicalize_dummy_indices(expr: Expr) -> Expr:
     Expr
         Expression with all Sum(...) nodes canonicalized under dummy index symmetry.
     """
+    if isinstance(expr, TensorPoly):
+        return expr.map_terms(canonicalize_dummy_indices)
     return expr.replace(
         lambda e: isinstance(e, Sum),
-        lambda e: min(
-            (canonicalize_expr(opt) for opt in get_dummy_index_options(e)),
-            key=lambda opt: opt.sort_key()
-        )
+        _canonical_sum
     )
@@ -0,0 +1,49 @@
+from sympy import Add, Basic, Expr, Mul, S, Sum
+
+from ..profiling import profiled
+from .poly import TensorPoly
+
+def _split_numeric(term: Expr) -> tuple[Expr, Expr]:
+    # numeric coefficient of a term, including the ones left inside its Sum factors
+    coeff, rest = term.as_coeff_Mul()
+    factors = []
+    for f in Mul.make_args(rest):
+        if isinstance(f, Sum):
+            c, body = f.function.as_coeff_Mul()
+            coeff *= c
+            f = Sum(body, *f.limits)
+        factors.append(f)
+    return coeff, Mul(*factors)
+
+@profiled
+def collect_canonical_terms(expr: Basic) -> Basic:
+    """
+    Merge terms that are equal up to their numeric coefficient.
+
+    Each term of an Add is keyed by its non-numeric part, with numeric factors moved out
+    of its Sum(...) factors, and the coefficients of equal keys are added in a dict. Terms
+    are only recognized as equal if they are syntactically identical, so call
+    `canonicalize_dummy_indices` first. Linear in the number of terms, unlike `simplify()`.
+
+    Example
+    -------
+    >>> collect_canonical_terms(Sum(V[i]/8, (i, 1, N)) + 3*Sum(V[i], (i, 1, N))/8)
+    Sum(V[i], (i, 1, N))/2
+    """
+    if isinstance(expr, TensorPoly):
+        return expr # like terms are merged on construction
+
+    if isinstance(expr, Add):
+        collected: dict[Expr, Expr] = {}
+        for term in expr.args:
+            coeff, key = _split_numeric(collect_canonical_terms(term))
+            collected[key] = collected.get(key, S.Zero) + coeff
+        return Add(*[coeff * key for key, coeff in collected.items() if coeff != 0])
+
+    if isinstance(expr, Sum):
+        return Sum(collect_canonical_terms(expr.function), *expr.limits)
+
+    if isinstance(expr, Mul):
+        return Mul(*[collect_canonical_terms(arg) for arg in expr.args])
+
+    return expr
\ No newline at end of file
@@ -0,0 +1,100 @@
+import re
+
+from sympy import Basic, Expr, Sum, Symbol
+
+from .indexed import TensorIdx
+
+_NUMBERED = re.compile(r"^(.*)_(\d+)$")
+
+def symbol_names(*exprs: Basic) -> set[str]:
+    """Names of all symbols in `exprs`, bound ones included."""
+    return {s.name for e in exprs if isinstance(e, Basic) for s in e.atoms(Symbol)}
+
+def fresh_index(prefix: str, taken: set[str], cls: type[Symbol] = TensorIdx, **assumptions) -> Symbol:
+    """
+    First of prefix_1, prefix_2, ... whose name is not in `taken`.
+
+    The name depends only on `taken`, so the same inputs always get the same dummy.
+
+    Example
+    -------
+    >>> fresh_index("k", {"k_1", "i"}, NeuronIdx)
+    k_2
+    """
+    n = 1
+    while f"{prefix}_{n}" in taken:
+        n += 1
+    return cls(f"{prefix}_{n}", **assumptions)
+
+def rename_clashing_dummies(factors: list[Expr], limits: list[tuple], taken: set[str]) -> tuple[list[Expr], list[tuple]]:
+    """
+    Rename the summed indices of Sum(Mul(*factors), *limits) whose names are in `taken`.
+
+    A clashing k_1 becomes the first free k_n, keeping its class and assumptions, and other
+    dummies keep their names. `taken` is updated with the names of the (renamed) limits.
+    """
+    rename = {}
+    avoid = None
+    for lim in limits:
+        dummy = lim[0]
+        if dummy.name in taken:
+            if avoid is None:
+                avoid = taken | symbol_names(*factors, *[b for lim in limits for b in lim])
+            match = _NUMBERED.match(dummy.name)
+            new = fresh_index(match.group(1) if match else dummy.name, avoid, type(dummy), **dummy.assumptions0)
+            rename[dummy] = new
+            avoid.add(new.name)
+        taken.add(rename.get(dummy, dummy).name)
+    if not rename:
+        return factors, limits
+    return (
+        [f.xreplace(rename) for f in factors],
+        [(rename.get(lim[0], lim[0]), *lim[1:]) for lim in limits],
+    )
+
+def merge_sums(terms: list[tuple[list[Expr], list[tuple]]]) -> tuple[list[Expr], list[tuple]]:
+    """
+    Multiply Sum(Mul(*factors), *limits) terms into one, as factors and limits.
+
+    Summed indices that clash with a dummy of an earlier term or with a free symbol of any
+    term are renamed (see `rename_clashing_dummies`), so products of Sums that reuse the
+    same dummy names, e.g. two `Layer.preactivation` entries, stay correct.
+    """
+    if not any(limits for _, limits in terms):
+        return [f for factors, _ in terms for f in factors], []
+
+    taken = set()
+    for factors, limits in terms:
+        dummies = {lim[0] for lim in limits}
+        taken |= {s.name for f in factors for s in f.free_symbols if isinstance(s, Symbol) and s not in dummies}
+
+    merged_factors, merged_limits = [], []
+    for factors, limits in terms:
+        factors, limits = rename_clashing_dummies(factors, list(limits), taken)
+        merged_factors.extend(factors)
+        merged_limits.extend(limits)
+    return merged_factors, merged_limits
+
+def compact_dummies(expr: Basic) -> Basic:
+    """
+    Rename the summed indices of every Sum to the first free k_1, k_2, ... of their prefix.
+
+    Terms that only differ by which dummy names they use, e.g. Sum over (k_1, k_3) and over
+    (k_1, k_2), get the same names, so that `canonicalize_dummy_indices` can make them equal.
+    """
+    def compact(s: Sum) -> Sum:
+        taken = {x.name for x in s.free_symbols if isinstance(x, Symbol)}
+        taken |= symbol_names(s.function) - {lim[0].name for lim in s.limits}
+        rename = {}
+        for lim in sorted(s.limits, key=lambda lim: lim[0].name):
+            dummy = lim[0]
+            match = _NUMBERED.match(dummy.name)
+            new = fresh_index(match.group(1) if match else dummy.name, taken, type(dummy), **dummy.assumptions0)
+            taken.add(new.name)
+            if new != dummy:
+                rename[dummy] = new
+        if not rename:
+            return s
+        return Sum(s.function.xreplace(rename), *[(rename.get(lim[0], lim[0]), *lim[1:]) for lim in s.limits])
+
+    return expr.replace(lambda e: isinstance(e, Sum), compact)
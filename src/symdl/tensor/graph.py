@@ -0,0 +1,200 @@
+from typing import Hashable, Literal, NamedTuple
+
+from sympy import Basic, Indexed, KroneckerDelta, Pow, Symbol
+
+from .symmetry import Permutation, symmetry_group
+
+class TensorFactor(NamedTuple):
+    """
+    A factor of a tensor network.
+
+    Attributes
+    ----------
+    head : str
+        Name of the tensor, factors are compared by head first (e.g. 'K', 'V').
+    indices : tuple
+        Index symbols in slot order.
+    symmetry : tuple[Permutation, ...] | Literal["full"]
+        Slot permutations leaving the factor invariant, or "full" for total symmetry.
+    """
+    head: str
+    indices: tuple
+    symmetry: tuple[Permutation, ...] | Literal["full"]
+
+def index_key(idx: Basic) -> tuple[str, str]:
+    """Sort key of an index, ordered like Symbol.sort_key (class name, then name)."""
+    return (type(idx).__name__, str(idx))
+
+def tensor_factors(expr: Basic) -> list[TensorFactor] | None:
+    """
+    Convert a single factor of a product into tensor network factors.
+
+    Supports Indexed (with the `symmetries` of its base), KroneckerDelta and
+    positive integer powers of those. Returns None for anything else.
+    """
+    if isinstance(expr, Pow):
+        base, exp = expr.args
+        if not (exp.is_Integer and exp > 0):
+            return None
+        factors = tensor_factors(base)
+        return None if factors is None else factors * int(exp)
+
+    if isinstance(expr, Indexed):
+        indices = tuple(expr.indices)
+        symmetries = getattr(expr.base, "symmetries", None)
+        symmetry = "full" if symmetries == "full" else symmetry_group(symmetries, len(indices))
+        return [TensorFactor(str(expr.base), indices, symmetry)]
+
+    if isinstance(expr, KroneckerDelta):
+        return [TensorFactor("KroneckerDelta", tuple(expr.args), "full")]
+
+    return None
+
+def _rank(signatures: list) -> list[int]:
+    order = {sig: k for k, sig in enumerate(sorted(set(signatures)))}
+    return [order[sig] for sig in signatures]
+
+def canonical_labeling(
+    factors: list[TensorFactor],
+    dummies: dict[Symbol, Hashable],
+) -> tuple[tuple, dict[Symbol, Symbol]]:
+    """
+    Canonical relabeling of the dummy indices of a product of tensors.
+
+    Uses individualization-refinement on the graph whose vertices are the factors and
+    the dummy indices, with an edge for every slot, colored by the slot orbit under the
+    factor's symmetry. Refinement usually separates all dummies in polynomial time; ties
+    left by genuine symmetries are branched on and pruned with the automorphisms found.
+
+    Parameters
+    ----------
+    factors : list[TensorFactor]
+        The tensors of the product.
+    dummies : dict[Symbol, Hashable]
+        Summed indices and their domains; only indices of equal domain are exchanged.
+
+    Returns
+    -------
+    tuple[tuple, dict[Symbol, Symbol]]
+        - encoding: hashable form, equal for two products iff they agree up to dummy relabeling
+          and tensor symmetries
+        - relabeling: permutation of the dummies realizing the canonical form
+    """
+    dummy_list = sorted(dummies, key=index_key)
+    pools: dict[str, list[Symbol]] = {}
+    for d in dummy_list:
+        pools.setdefault(str(dummies[d]), []).append(d)
+
+    def orbits(f: TensorFactor) -> list[int]:
+        if f.symmetry == "full":
+            return [0] * len(f.indices)
+        return [min(p[s] for p in f.symmetry) for s in range(len(f.indices))]
+
+    slot_orbits = []
+    occurrences: dict[Symbol, list[tuple[int, int]]] = {d: [] for d in dummy_list}
+    for n, f in enumerate(factors):
+        orb = orbits(f)
+        slot_orbits.append(orb)
+        for s, idx in enumerate(f.indices):
+            if idx in occurrences:
+                occurrences[idx].append((n, orb[s]))
+
+    def encode(relabel: dict) -> tuple:
+        encoded = []
+        for f in factors:
+            keys = [index_key(relabel.get(idx, idx)) for idx in f.indices]
+            if f.symmetry == "full":
+                slots = tuple(sorted(keys))
+            else:
+                slots = min(tuple(keys[k] for k in p) for p in f.symmetry)
+            encoded.append((f.head, slots))
+        return tuple(sorted(encoded))
+
+    if not dummy_list:
+        return encode({}), {}
+
+    # factors carrying free indices come first, so their dummies get the smallest names
+    factor_colors = _rank([
+        (f.head, len(f.indices), tuple(sorted(
+            (slot_orbits[n][s], index_key(idx))
+            for s, idx in enumerate(f.indices) if idx not in dummies
+        )) + ((float("inf"), ("", "")),))
+        for n, f in enumerate(factors)
+    ])
+    dummy_colors = _rank([str(dummies[d]) for d in dummy_list])
+
+    def refine(dcol: list[int], fcol: list[int]) -> tuple[list[int], list[int]]:
+        position = {d: k for k, d in enumerate(dummy_list)}
+        while True:
+            new_f = _rank([
+                (fcol[n], tuple(sorted(
+                    (slot_orbits[n][s], dcol[position[idx]])
+                    for s, idx in enumerate(f.indices) if idx in position
+                )))
+                for n, f in enumerate(factors)
+            ])
+            new_d = _rank([
+                (dcol[k], tuple(sorted((new_f[n], orb) for n, orb in occurrences[d])))
+                for k, d in enumerate(dummy_list)
+            ])
+            if len(set(new_f)) == len(set(fcol)) and len(set(new_d)) == len(set(dcol)):
+                return new_d, new_f
+            dcol, fcol = new_d, new_f
+
+    best: dict = {} # encoding, relabel
+    automorphisms: list[dict[Symbol, Symbol]] = []
+
+    def leaf(dcol: list[int]):
+        order = [d for _, d in sorted(zip(dcol, dummy_list), key=lambda t: t[0])]
+        taken = {dom: iter(pool) for dom, pool in pools.items()}
+        relabel = {d: next(taken[str(dummies[d])]) for d in order}
+        encoding = encode(relabel)
+        if not best or encoding < best["encoding"]:
+            best.update(encoding=encoding, relabel=relabel)
+        elif encoding == best["encoding"]:
+            inverse = {new: old for old, new in relabel.items()}
+            automorphisms.append({d: inverse[best["relabel"][d]] for d in dummy_list})
+
+    def search(dcol: list[int], fcol: list[int], prefix: list[Symbol]):
+        dcol, fcol = refine(dcol, fcol)
+        cells: dict[int, list[int]] = {}
+        for k, c in enumerate(dcol):
+            cells.setdefault(c, []).append(k)
+        targets = [cell for _, cell in sorted(cells.items()) if len(cell) > 1]
+        if not targets:
+            leaf(dcol)
+            return
+
+        cell = targets[0]
+        explored: list[Symbol] = []
+        for k in cell:
+            v = dummy_list[k]
+            if explored and _same_orbit(v, explored, prefix, automorphisms):
+                continue
+            explored.append(v)
+            individualized = [
+                2 * c + (1 if (c == dcol[k] and m != k) else 0)
+                for m, c in enumerate(dcol)
+            ]
+            search(individualized, fcol, prefix + [v])
+
+    search(dummy_colors, factor_colors, [])
+    return best["encoding"], best["relabel"]
+
+def _same_orbit(v, explored: list, prefix: list, automorphisms: list[dict]) -> bool:
+    """Whether v is mapped onto an explored vertex by automorphisms fixing the prefix."""
+    parent: dict = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            x = parent[x]
+        return x
+
+    for gamma in automorphisms:
+        if all(gamma[p] == p for p in prefix):
+            for x, y in gamma.items():
+                rx, ry = find(x), find(y)
+                if rx != ry:
+                    parent[rx] = ry
+    root = find(v)
+    return any(find(u) == root for u in explored)
@@ -1,9 +1,13 @@
-from sympy import IndexedBase, Indexed, Symbol
+from sympy import IndexedBase, Indexed, Symbol, sympify
 from typing import Self, Literal
+from weakref import WeakValueDictionary
 
 from ..assumption import AssumptionMixin
 
 class TensorIndexedBase(IndexedBase, AssumptionMixin):
+    # attributes set at construction that are not part of `args`, hence not of == and hash
+    _metadata_attrs = ("symmetries", "idx_is_superscript", "idx_types", "is_random", "is_gaussian")
+
     def __new__(
         cls, 
         label,
@@ -59,22 +63,100 @@ class TensorIndexedBase(IndexedBase, AssumptionMixin):
 
         return obj
 
+    def _hashable_content(self):
+        # random and non-random tensors of the same name are different objects, e.g. for
+        # the randomness flags that is_random_expr caches by structure
+        return (*super()._hashable_content(), getattr(self, "is_random", False), getattr(self, "is_gaussian", False))
+
+    # Basic rebuilds a node as func(*args), which would drop the metadata: keep it through
+    # doit, subs and xreplace (sp.series calls doit, and posify renames the label and back)
+    def doit(self, **hints):
+        return self
+
+    def _eval_subs(self, old, new):
+        args = tuple(arg._subs(old, new) for arg in self.args)
+        if args == self.args:
+            return self
+        return _rebuild_indexed_base(type(self), args, self.metadata())
+
+    def _xreplace(self, rule):
+        obj, changed = super()._xreplace(rule)
+        if changed and self not in rule:
+            obj._set_metadata(self.metadata())
+        return obj, changed
+
+    def metadata(self) -> dict:
+        """The construction options that `args` does not record, by attribute name."""
+        return {name: getattr(self, name, None) for name in self._metadata_attrs}
+
+    def _set_metadata(self, metadata: dict):
+        for name, value in metadata.items():
+            setattr(self, name, value)
+
+    def __reduce_ex__(self, protocol):
+        # sympy pickles IndexedBase from its args alone, which would drop the metadata
+        return _rebuild_indexed_base, (type(self), self.args, self.metadata())
+
     def __getitem__(self, indices):
         if not isinstance(indices, tuple):
             indices = (indices,)
         return TensorIndexed(self, *indices)
 
+def _rebuild_indexed_base(cls: type, args: tuple, metadata: dict) -> TensorIndexedBase:
+    obj = IndexedBase.__new__(cls, *args)
+    obj._set_metadata(metadata)
+    return obj
+
 class TensorIndexed(Indexed, AssumptionMixin):
+    """
+    Indexed tensor whose metadata (symmetries, LaTeX layout, index types, random facts)
+    is read from its base rather than copied.
+
+    Instances are interned per (class, base object, indices), so rebuilding the same
+    component, e.g. in xreplace or canonicalize, returns the existing, already validated
+    object. The table holds instances weakly; an instance keeps its base alive, so the
+    base's id stays valid for as long as its entry exists.
+    """
+    _interned: WeakValueDictionary = WeakValueDictionary()
+
     def __new__(cls, base, *indices):
-        obj = super().__new__(cls, base, *indices)
-        obj.symmetries = getattr(base, "symmetries", None)
-        obj.idx_is_superscript = getattr(base, "idx_is_superscript", False)
-        obj.idx_types = getattr(base, "idx_types", None)
-        obj.apply_assumptions(base)
+        indices = tuple(sympify(i) for i in indices) # z[1] and z[1.0] are different components
+        key = (cls, id(base), indices) if isinstance(base, IndexedBase) else None
+        if key is not None:
+            try:
+                obj = cls._interned.get(key)
+            except TypeError: # unhashable indices
+                key = obj = None
+            if obj is not None:
+                return obj
 
+        obj = super().__new__(cls, base, *indices)
         obj._validate_index_types()
 
+        if key is not None:
+            cls._interned[key] = obj
         return obj
+
+    @property
+    def symmetries(self):
+        return getattr(self.base, "symmetries", None)
+
+    @property
+    def idx_is_superscript(self) -> list[int] | bool:
+        return getattr(self.base, "idx_is_superscript", False)
+
+    @property
+    def idx_types(self):
+        return getattr(self.base, "idx_types", None)
+
+    # the base closed its facts under AssumptionMixin._implications when it was built
+    @property
+    def is_gaussian(self) -> bool:
+        return getattr(self.base, "is_gaussian", False)
+
+    @property
+    def is_random(self) -> bool:
+        return getattr(self.base, "is_random", False)
     
     def canonicalize(self) -> Self: # implemented in .symmetry.py
         raise NotImplementedError("You must inject or override canonicalize()")
@@ -0,0 +1,223 @@
+from typing import Callable, Iterator
+from itertools import product
+
+from sympy import Add, Basic, Expr, Integer, Mul, Number, Pow, S, Sum, default_sort_key
+
+from .dummy import merge_sums, rename_clashing_dummies
+
+Term = tuple[Expr, list[Expr], list[tuple]] # (numeric coefficient, factors, limits)
+
+def expand_terms(expr: Basic) -> list[Term]:
+    """
+    Distribute an expression into terms coeff * f1 * f2 * ... summed over limits.
+
+    Sums are flattened into their terms, like `pull_sums_out_front`, renaming summation
+    indices that clash (see `merge_sums`). Powers of Adds and Sums are expanded, other factors
+    (Indexed, ExpVal, symbols, ...) are kept whole, after pulling Sums inside their
+    arguments to the front so that e.g. a linear ExpVal can move them out.
+    """
+    if isinstance(expr, Number):
+        return [(expr, [], [])] if expr != 0 else []
+
+    if isinstance(expr, Add):
+        return [t for arg in expr.args for t in expand_terms(arg)]
+
+    if isinstance(expr, Mul):
+        terms: list[Term] = [(S.One, [], [])]
+        for arg in expr.args:
+            terms = [_multiply(t1, t2) for t1, t2 in product(terms, expand_terms(arg))]
+        return terms
+
+    if isinstance(expr, Sum):
+        limits = list(expr.limits)
+        outer = {lim[0].name for lim in limits}
+        terms = []
+        for c, f, l in expand_terms(expr.function):
+            f, l = rename_clashing_dummies(f, l, set(outer)) # a nested Sum may reuse an outer dummy
+            terms.append((c, f, l + limits))
+        return terms
+
+    if isinstance(expr, Pow) and isinstance(expr.base, (Add, Sum)) and expr.exp.is_Integer and expr.exp > 0:
+        return expand_terms(Mul(*[expr.base] * int(expr.exp), evaluate=False)) # a Sum's copies get renamed dummies
+
+    if expr.args and any(arg.has(Sum) for arg in expr.args):
+        rebuilt = expr.func(*[_pull_sums(arg) for arg in expr.args])
+        if rebuilt != expr:
+            return expand_terms(rebuilt)
+
+    return [(S.One, [expr], [])]
+
+def _multiply(t1: Term, t2: Term) -> Term:
+    (c1, f1, l1), (c2, f2, l2) = t1, t2
+    if not (l1 or l2):
+        return c1 * c2, f1 + f2, []
+    factors, limits = merge_sums([(f1, l1), (f2, l2)])
+    return c1 * c2, factors, limits
+
+def _pull_sums(expr: Basic) -> Basic:
+    if not isinstance(expr, Expr) or not expr.has(Sum):
+        return expr
+    return Add(*[
+        c * (Sum(Mul(*factors), *limits) if limits else Mul(*factors))
+        for c, factors, limits in expand_terms(expr)
+    ])
+
+class Monomial:
+    """
+    A product of factors summed over dummy limits, without its numeric coefficient.
+
+    Attributes
+    ----------
+    factors : tuple[tuple[Expr, int], ...]
+        (base, exponent) pairs sorted by sort_key, equal factors merged.
+    limits : tuple[tuple, ...]
+        Sum limits (i, a, b) sorted by index name.
+    """
+    __slots__ = ("factors", "limits", "_hash")
+
+    def __init__(self, factors: list[Expr], limits: list[tuple]):
+        powers: dict[Expr, int] = {}
+        for f in factors:
+            base, exp = f.args if isinstance(f, Pow) and f.exp.is_Integer else (f, Integer(1))
+            powers[base] = powers.get(base, 0) + int(exp)
+        self.factors = tuple(sorted(powers.items(), key=lambda t: default_sort_key(t[0])))
+        self.limits = tuple(sorted((tuple(lim) for lim in limits), key=lambda lim: lim[0].name))
+        self._hash = hash((self.factors, self.limits))
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Monomial) and self._hash == other._hash
+            and self.factors == other.factors and self.limits == other.limits
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"Monomial({self.as_expr()})"
+
+    def __getstate__(self):
+        return self.factors, self.limits
+
+    def __setstate__(self, state):
+        self.factors, self.limits = state
+        self._hash = hash(state) # string hashes differ between processes
+
+    def as_expr(self) -> Expr:
+        """Constant factors in front of a single Sum, as `pull_coef_out_sum` leaves them."""
+        dummies = {lim[0] for lim in self.limits}
+        outer, inner = [], []
+        for base, exp in self.factors:
+            (outer if base.free_symbols.isdisjoint(dummies) else inner).append(base**exp)
+        if not self.limits:
+            return Mul(*outer, *inner)
+        return Mul(*outer) * Sum(Mul(*inner), *self.limits)
+
+class TensorPoly:
+    """
+    Sparse sum of tensor monomials: {Monomial: numeric coefficient}.
+
+    Keeps perturbative expansions out of SymPy's Add/Mul/Sum trees between pipeline
+    stages. `wick_contraction`, `wild_subs`, `canonicalize_dummy_indices`,
+    `collect_canonical_terms`, `pull_sums_out_front`, `pull_coef_out_sum`,
+    `sum_kronecker_contract` and `remove_irrelevant_sums` accept a TensorPoly and return
+    one; convert with `TensorPoly.from_expr` and `as_expr` at the boundaries.
+
+    Example
+    -------
+    >>> P = TensorPoly.from_expr(Z0 * EK(sp.exp(action)).series(eps, 0, 2).removeO())
+    >>> P = canonicalize_dummy_indices(wild_subs(wick_contraction(P), gaussian_rule))
+    >>> P.as_expr()
+    """
+    __slots__ = ("terms",)
+
+    def __init__(self, terms: dict[Monomial, Expr] | None = None):
+        self.terms: dict[Monomial, Expr] = {} if terms is None else terms
+
+    @classmethod
+    def from_terms(cls, terms: list[Term]) -> "TensorPoly":
+        poly = cls()
+        for coeff, factors, limits in terms:
+            poly._add(Monomial(factors, limits), coeff)
+        return poly
+
+    @classmethod
+    def from_expr(cls, expr: Basic) -> "TensorPoly":
+        return cls.from_terms(expand_terms(expr))
+
+    def as_expr(self) -> Expr:
+        return Add(*[coeff * mono.as_expr() for mono, coeff in self.terms.items()])
+
+    def _add(self, mono: Monomial, coeff: Expr):
+        total = self.terms.get(mono, S.Zero) + coeff
+        if total == 0:
+            self.terms.pop(mono, None)
+        else:
+            self.terms[mono] = total
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self) -> Iterator[tuple[Monomial, Expr]]:
+        return iter(self.terms.items())
+
+    def __repr__(self) -> str:
+        return f"TensorPoly({self.as_expr()})"
+
+    def __add__(self, other) -> "TensorPoly":
+        if not isinstance(other, TensorPoly):
+            other = TensorPoly.from_expr(other)
+        result = TensorPoly(dict(self.terms))
+        for mono, coeff in other:
+            result._add(mono, coeff)
+        return result
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "TensorPoly":
+        return TensorPoly({mono: -coeff for mono, coeff in self})
+
+    def __sub__(self, other) -> "TensorPoly":
+        return self + (-other)
+
+    def __mul__(self, other) -> "TensorPoly":
+        if not isinstance(other, (int, Number)):
+            return NotImplemented
+        if other == 0:
+            return TensorPoly()
+        return TensorPoly({mono: coeff * other for mono, coeff in self})
+
+    __rmul__ = __mul__
+
+    def replace_factors(self, func: Callable[[Expr], Expr]) -> "TensorPoly":
+        """
+        Apply `func` to every factor and redistribute.
+
+        `func` is called once per distinct factor over all terms, so e.g. an ExpVal shared by
+        many terms is Wick-contracted once. Patterns spanning several factors of a term
+        are not seen; use `map_terms` for those.
+        """
+        images: dict[Expr, list[Term]] = {}
+        result = TensorPoly()
+        for mono, coeff in self:
+            # the images use the monomial's dummies as if free: multiply them first, then
+            # rename their own dummies away from the monomial's, whose limits stay as they are
+            bound = {lim[0].name for lim in mono.limits}
+            expanded: list[Term] = [(coeff, [], [])]
+            for base, exp in mono.factors:
+                factor = base**exp
+                if factor not in images:
+                    images[factor] = expand_terms(func(factor))
+                expanded = [_multiply(t1, t2) for t1, t2 in product(expanded, images[factor])]
+            for c, factors, limits in expanded:
+                factors, limits = rename_clashing_dummies(factors, limits, set(bound))
+                result._add(Monomial(factors, [*limits, *mono.limits]), c)
+        return result
+
+    def map_terms(self, func: Callable[[Expr], Expr]) -> "TensorPoly":
+        """Apply `func` to every monomial as a SymPy expression and merge the results."""
+        result = TensorPoly()
+        for mono, coeff in self:
+            for c, factors, limits in expand_terms(func(mono.as_expr())):
+                result._add(Monomial(factors, limits), coeff * c)
+        return result
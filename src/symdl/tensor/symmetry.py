@@ -1,68 +1,126 @@
-from itertools import permutations, product
+from functools import lru_cache
 from typing import Literal
 
+from sympy import default_sort_key
+
 from .indexed import TensorIndexed, TensorIndexedBase
 
-from itertools import permutations, product
+Permutation = tuple[int, ...] # new_indices[k] = indices[perm[k]]
+
+def symmetry_generators(symmetries, rank: int) -> list[Permutation]:
+    """
+    Slot permutations generating the symmetry group of a rank-`rank` tensor.
+
+    Parameters
+    ----------
+    symmetries : list[tuple[int, int] | tuple[list[int], list[int]]] | Literal["full"] | None
+        Same format as `TensorIndexedBase(symmetries=...)`.
+    rank : int
+        Number of indices.
+
+    Returns
+    -------
+    list[Permutation]
+    """
+    if symmetries is None:
+        return []
+
+    identity = list(range(rank))
+    if symmetries == "full":
+        generators = []
+        for i in range(rank - 1): # adjacent transpositions generate S_n
+            perm = list(identity)
+            perm[i], perm[i + 1] = perm[i + 1], perm[i]
+            generators.append(tuple(perm))
+        return generators
+
+    generators = []
+    for group in symmetries:
+        perm = list(identity)
+        if isinstance(group[0], int):
+            # Index symmetry: (0, 1)
+            i, j = group
+            perm[i], perm[j] = j, i
+        elif isinstance(group[0], (list, tuple)):
+            # Pairwise symmetry: ([0, 1], [2, 3])
+            g1, g2 = group
+            assert len(g1) == len(g2), "Pairwise symmetry groups must have same length: ([i,j], [k,l])"
+            for a, b in zip(g1, g2):
+                perm[a], perm[b] = b, a
+        else:
+            raise TypeError("Unsupported symmetry format")
+        generators.append(tuple(perm))
+    return generators
+
+def _freeze(symmetries):
+    if symmetries is None or symmetries == "full":
+        return symmetries
+    return tuple(
+        tuple(tuple(g) if isinstance(g, list) else g for g in group)
+        for group in symmetries
+    )
 
+@lru_cache(maxsize=None)
+def _closure(frozen_symmetries, rank: int) -> tuple[Permutation, ...]:
+    generators = symmetry_generators(frozen_symmetries, rank)
+    identity = tuple(range(rank))
+    group = {identity}
+    frontier = [identity]
+    while frontier:
+        new = []
+        for g in frontier:
+            for s in generators:
+                h = tuple(g[k] for k in s) # apply s after g
+                if h not in group:
+                    group.add(h)
+                    new.append(h)
+        frontier = new
+    return tuple(sorted(group))
+
+def symmetry_group(symmetries, rank: int) -> tuple[Permutation, ...]:
+    """
+    All slot permutations generated by `symmetries`, including compositions (cached).
+
+    Example
+    -------
+    >>> symmetry_group([(0, 1), (2, 3)], 4)
+    ((0, 1, 2, 3), (0, 1, 3, 2), (1, 0, 2, 3), (1, 0, 3, 2))
+    """
+    return _closure(_freeze(symmetries), rank)
+
+
+def base_symmetry_group(base, rank: int) -> tuple[Permutation, ...]:
+    """Symmetry group of `base` at the given rank, cached on the base."""
+    groups = base.__dict__.setdefault("_symmetry_groups", {})
+    if rank not in groups:
+        groups[rank] = symmetry_group(getattr(base, "symmetries", None), rank)
+    return groups[rank]
 
 class SymmetryMixin:
     def canonicalize(self: TensorIndexed):
-        indices = list(self.indices)
+        """
+        Representative of self under its index symmetries with the smallest sort_key.
+
+        Fully symmetric tensors sort their indices; otherwise the smallest image over the
+        (cached) symmetry group is taken. At most one new object is constructed.
+        """
+        indices = tuple(self.indices)
         symmetries = getattr(self, 'symmetries', None)
 
         if symmetries is None:
             return self
 
+        keys = [default_sort_key(idx) for idx in indices]
         if symmetries == "full":
-            candidates = [
-                type(self)(self.base, *perm)
-                for perm in permutations(indices)
-            ]
-            return min(candidates, key=lambda x: x.sort_key())
-
-        if isinstance(symmetries, list):
-            swap_rules: list[dict] = []
-            for group in symmetries:
-                # group can be either:
-                #   (0, 1)                → index symmetry, i.e., i ↔ j
-                #   ([0, 1], [2, 3])      → pairwise symmetry, i.e., (i,j) ↔ (k,l)
-
-                if isinstance(group[0], int):
-                    # Index symmetry: (0, 1)
-                    i, j = group
-                    a, b = indices[i], indices[j]
-                    swap_rules.append({a: b, b: a})
-
-                elif isinstance(group[0], list):
-                    # Pairwise symmetry: ([0, 1], [2, 3])
-                    g1, g2 = group
-                    assert len(g1) == len(g2), "Pairwise symmetry groups must have same length: ([i,j], [k,l])"
-                    a = [indices[i] for i in g1]
-                    b = [indices[i] for i in g2]
-                    rule = dict(zip(a, b)) | dict(zip(b, a))  # bidirectional mapping
-                    swap_rules.append(rule)
-
-                else:
-                    raise TypeError("Unsupported symmetry format")
-
-            def apply_swap_mapping(base_indices, active_swaps: list[bool]):
-                result = list(base_indices)
-                for swap_active, rule in zip(active_swaps, swap_rules):
-                    if swap_active:
-                        result = [rule.get(idx, idx) for idx in result]
-                return result
-
-            best = None
-            for bits in product([False, True], repeat=len(swap_rules)):
-                candidate_indices = apply_swap_mapping(indices, bits)
-                candidate = type(self)(self.base, *candidate_indices)
-                if best is None or candidate.sort_key() < best.sort_key():
-                    best = candidate
-
-            return best
-
-        return self
+            order = sorted(range(len(indices)), key=keys.__getitem__)
+        else:
+            group = base_symmetry_group(self.base, len(indices))
+            order = min(group, key=lambda perm: [keys[k] for k in perm])
+
+        best = tuple(indices[k] for k in order)
+        if best == indices:
+            return self
+        return type(self)(self.base, *best)
 
 class SymmetryIndexedBase(TensorIndexedBase, SymmetryMixin):
     def __new__(
@@ -1,2 +1,5 @@
-from .sum import pull_sums_out_front, pull_coef_out_sum, sum_kronecker_contract, remove_irrelevant_sums
-from .wild import wilds, wild_subs
\ No newline at end of file
+from .sum import pull_sums_out_front, pull_coef_out_sum, sum_kronecker_contract, remove_irrelevant_sums, normalize_sums
+from .wild import wilds, wild_subs
+from .cache import LRUCache
+from .serialize import dumps, loads, dump, load
+from .diskcache import DiskCache, structural_hash
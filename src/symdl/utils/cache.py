@@ -0,0 +1,60 @@
+from typing import Callable, Hashable, NamedTuple
+from collections import OrderedDict
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+class LRUCache:
+    """
+    Least-recently-used mapping with hit/miss statistics, like functools.lru_cache.
+
+    Parameters
+    ----------
+    maxsize : int | None
+        Maximum number of entries; the least recently used entry is evicted first.
+        None means unbounded.
+
+    Example
+    -------
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.get_or_compute("a", lambda: 1)
+    1
+    >>> cache.cache_info()
+    CacheInfo(hits=0, misses=1, maxsize=2, currsize=1)
+    """
+    __slots__ = ("maxsize", "hits", "misses", "_data")
+
+    def __init__(self, maxsize: int | None = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        self.misses += 1
+        value = compute()
+        self._data[key] = value
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def cache_clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from functools import lru_cache, wraps
+from importlib import metadata
+from typing import Callable
+
+import sympy as sp
+
+from .cache import CacheInfo
+from .serialize import dumps, loads
+
+_FORMAT = 2 # bump when the stored layout changes
+_SUFFIXES = (".jsonl", ".pkl")
+
+def _symdl_version() -> str:
+    try:
+        return metadata.version("dlt-calc")
+    except metadata.PackageNotFoundError: # run from a checkout
+        return "dev"
+
+@lru_cache(maxsize=None)
+def _source_hash() -> str:
+    """Digest of the symdl sources, so entries derived by other code are not reused."""
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = []
+    for directory, dirnames, filenames in os.walk(package):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        paths.extend(os.path.join(directory, f) for f in filenames if f.endswith(".py"))
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(os.path.relpath(path, package).replace(os.sep, "/").encode() + b"\0")
+        with open(path, "rb") as f:
+            h.update(f.read() + b"\0")
+    return h.hexdigest()[:12]
+
+class Uncacheable(TypeError):
+    """An argument has no stable structural hash, e.g. a lambda."""
+
+def structural_hash(obj) -> str:
+    """
+    Hex digest identifying `obj` by structure, stable across processes and sessions.
+
+    SymPy's `hash` depends on the process' string hashing and `==` ignores what
+    `TensorIndexedBase` keeps outside `args`, so the digest is built from the tree:
+    class, atoms by `srepr`, and for objects with a `metadata()`, such as tensor bases
+    and Gaussian kernels, that metadata (symmetries, `is_gaussian`, `idx_types`,
+    propagator rule, ...). Containers, numbers and strings hash by value,
+    functions and classes by qualified name, and slotted objects such as `TensorPoly`
+    or `TruncatedSeries` by their public slots.
+
+    Raises
+    ------
+    Uncacheable
+        For lambdas, local functions and objects with no structure to hash.
+    """
+    memo: dict[int, bytes] = {} # id: digest, shared subtrees are hashed once
+    keep = [] # keep memoized objects alive so their ids stay valid
+
+    def digest(x) -> bytes:
+        key = id(x)
+        if key not in memo:
+            memo[key] = hashlib.sha256(token(x)).digest()
+            keep.append(x)
+        return memo[key]
+
+    def token(x) -> bytes:
+        name = f"{type(x).__module__}.{type(x).__qualname__}".encode()
+        if isinstance(x, sp.Basic) and callable(getattr(x, "metadata", None)):
+            return b"B" + name + digest(x.args) + digest(x.metadata())
+        if isinstance(x, sp.Wild): # srepr omits what it may match
+            return b"W" + name + x.name.encode() + digest(x.exclude) + digest(x.properties)
+        if isinstance(x, sp.Basic):
+            if not x.args:
+                return b"A" + name + sp.srepr(x).encode()
+            return b"N" + name + b"".join(digest(a) for a in x.args)
+        if x is None or isinstance(x, (bool, int, float, complex, str, bytes)):
+            return b"V" + name + repr(x).encode()
+        if isinstance(x, (tuple, list)):
+            return b"L" + name + b"".join(digest(a) for a in x)
+        if isinstance(x, (set, frozenset)):
+            return b"S" + name + b"".join(sorted(digest(a) for a in x))
+        if isinstance(x, dict): # order matters, e.g. for wild_subs rules
+            return b"D" + name + b"".join(digest(k) + digest(v) for k, v in x.items())
+        if isinstance(x, type) or callable(x) and hasattr(x, "__qualname__"):
+            qualname = f"{x.__module__}.{x.__qualname__}"
+            if "<" in qualname: # <lambda>, <locals>
+                raise Uncacheable(f"{qualname} has no stable identity")
+            return b"F" + qualname.encode()
+        slots = [s for c in type(x).__mro__ for s in getattr(c, "__slots__", ()) if not s.startswith("_")]
+        if slots:
+            return b"O" + name + b"".join(digest(getattr(x, s, None)) for s in slots)
+        raise Uncacheable(f"Cannot hash {type(x).__name__} structurally")
+
+    return digest(obj).hex()
+
+class DiskCache:
+    """
+    Persistent store of derivation results, keyed by `structural_hash`.
+
+    SymPy results are stored with `serialize.dumps`, which loads faster than pickle,
+    other results (`TensorPoly`, `TruncatedSeries`, ...) are pickled. Entries live in
+    `directory/<version tag>/`, where the tag holds the symdl version, a digest of its
+    sources and the SymPy version, so a code change starts a fresh directory; `prune`
+    deletes the directories of other tags. When the entries exceed `max_bytes`, the
+    least recently used are removed.
+    Tensor bases pickle with their metadata, so loaded results behave like the originals.
+
+    Parameters
+    ----------
+    directory : str | None
+        Where to store entries, default $SYMDL_CACHE_DIR or ~/.cache/symdl.
+    max_bytes : int | None
+        Size limit of the stored entries, None for unbounded.
+
+    Example
+    -------
+    >>> cache = DiskCache()
+    >>> wick = cache.memoize(wick_contraction)
+    >>> Z = wick(Z0 * EK(sp.exp(quartic_action)).series(eps, 0, 2).removeO())  # derived once, loaded after
+    """
+    def __init__(self, directory: str | None = None, max_bytes: int | None = 2**30):
+        root = directory or os.environ.get("SYMDL_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "symdl")
+        self.version = f"symdl-{_symdl_version()}-{_source_hash()}_sympy-{sp.__version__}_format-{_FORMAT}"
+        self.root = root
+        self.directory = os.path.join(root, self.version)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def prune(self) -> list[str]:
+        """Delete the entries stored under other version tags, returns their directories."""
+        removed = []
+        for entry in os.listdir(self.root):
+            path = os.path.join(self.root, entry)
+            if entry != self.version and entry.startswith("symdl-") and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+        return removed
+
+    def key(self, name: str, *args, **kwargs) -> str:
+        """Entry key of `name(*args, **kwargs)`."""
+        return structural_hash((name, args, sorted(kwargs.items())))
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key: str, default=None):
+        for suffix in _SUFFIXES:
+            path = self._path(key, suffix)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            try:
+                value = loads(data.decode())[0] if suffix == ".jsonl" else pickle.loads(data)
+            except Exception: # truncated, foreign or stale entry: recompute it
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                break
+            os.utime(path) # mark as recently used
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+
+    def __contains__(self, key: str) -> bool:
+        return any(os.path.exists(self._path(key, suffix)) for suffix in _SUFFIXES)
+
+    def set(self, key: str, value) -> bool:
+        """
+        Store `value`, False if it cannot be serialized (e.g. it holds a lambda) or if
+        `serialize.loads` would not give back an equal expression.
+        """
+        try:
+            if isinstance(value, sp.Basic):
+                text = dumps(value)
+                if loads(text)[0] != value:
+                    return False
+                data, suffix = text.encode(), ".jsonl"
+            else:
+                data, suffix = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ".pkl"
+        except Exception:
+            return False
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key, suffix)) # atomic, concurrent readers see old or new
+        self._evict()
+        return True
+
+    def _entries(self) -> list[os.DirEntry]:
+        return [e for e in os.scandir(self.directory) if e.name.endswith(_SUFFIXES)]
+
+    def size(self) -> int:
+        """Bytes used by the stored entries."""
+        return sum(e.stat().st_size for e in self._entries())
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for e in entries: # least recently used first
+            if total <= self.max_bytes:
+                break
+            total -= e.stat().st_size
+            os.remove(e.path)
+
+    def memoize(self, func: Callable) -> Callable:
+        """
+        `func` with results stored in this cache. Calls whose arguments have no
+        structural hash, or whose result cannot be stored, are computed every time.
+        """
+        name = f"{func.__module__}.{func.__qualname__}"
+        missing = object()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = self.key(name, *args, **kwargs)
+            except Uncacheable:
+                return func(*args, **kwargs)
+            value = self.get(key, missing)
+            if value is missing:
+                value = func(*args, **kwargs)
+                self.set(key, value)
+            return value
+
+        wrapper.cache = self
+        return wrapper
+
+    def cache_info(self) -> CacheInfo:
+        """Hits and misses of this instance, maxsize in bytes and currsize in entries."""
+        return CacheInfo(self.hits, self.misses, self.max_bytes, len(self._entries()))
+
+    def cache_clear(self):
+        for e in self._entries():
+            os.remove(e.path)
+        self.hits = self.misses = 0
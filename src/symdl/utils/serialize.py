@@ -0,0 +1,201 @@
+import importlib
+import json
+from typing import IO
+
+import sympy as sp
+from sympy.core.function import AppliedUndef, UndefinedFunction
+from sympy.core.singleton import Singleton
+
+_FORMAT = "symdl-expr"
+_VERSION = 1
+_encode = json.JSONEncoder(separators=(",", ":")).encode # json.dumps with options builds an encoder per call
+
+def _qualname(obj) -> str:
+    name = f"{obj.__module__}:{obj.__qualname__}"
+    if "<" in name: # <lambda>, <locals>
+        raise ValueError(f"Cannot serialize {name}, it has no importable name")
+    return name
+
+def _has_metadata(cls: type) -> bool:
+    # tensor bases, Gaussian kernels: options kept outside `args`, see `metadata()`
+    return callable(getattr(cls, "_set_metadata", None))
+
+def _resolve(name: str):
+    module, qualname = name.split(":")
+    obj = importlib.import_module(module)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+class _Writer:
+    def __init__(self):
+        self.types: dict[type, int] = {}
+        self.bases: list = [] # encoded metadata, by base number
+        self.lines: list[str] = []
+        self.ids: dict[int, int] = {} # id(node): line number
+        self.keep = [] # keep visited nodes alive so their ids stay valid
+
+    def type_id(self, cls: type) -> int:
+        if cls not in self.types:
+            self.types[cls] = len(self.types)
+        return self.types[cls]
+
+    def value(self, x):
+        # metadata values: JSON, with tuples, types, functions and expressions tagged
+        if x is None or isinstance(x, (bool, int, float, str)):
+            return x
+        if isinstance(x, list):
+            return [self.value(v) for v in x]
+        if isinstance(x, tuple):
+            return {"tuple": [self.value(v) for v in x]}
+        if isinstance(x, dict):
+            return {"dict": [[self.value(k), self.value(v)] for k, v in x.items()]}
+        if isinstance(x, sp.Basic):
+            return {"expr": self.node(x)}
+        if isinstance(x, UndefinedFunction): # Function("f"), it has no importable name
+            return {"undef": [x.__name__, x._kwargs]}
+        if isinstance(x, type) or callable(x):
+            return {"ref": _qualname(x)}
+        raise TypeError(f"Cannot serialize {type(x).__name__} metadata")
+
+    def node(self, x: sp.Basic) -> int:
+        key = id(x)
+        if key in self.ids:
+            return self.ids[key]
+
+        cls = type(x)
+        if isinstance(x, sp.IndexedBase) or _has_metadata(cls):
+            # metadata first, so that every reference points to an earlier line
+            metadata = self.value(x.metadata()) if _has_metadata(cls) else None
+            args = [self.node(a) for a in x.args]
+            self.bases.append(metadata)
+            row = [self.type_id(cls), len(self.bases) - 1, *args]
+        elif isinstance(x, AppliedUndef): # sigma(x) for sigma = Function("sigma")
+            args = [self.node(a) for a in x.args]
+            row = [self.type_id(AppliedUndef), cls.__name__, cls._kwargs, *args]
+        elif isinstance(x, sp.Wild):
+            exclude = [self.node(e) for e in x.exclude]
+            properties = [self.value(p) for p in x.properties] # lambdas are refused
+            row = [self.type_id(cls), x.name, exclude, properties, x._assumptions_orig]
+        elif isinstance(x, sp.Dummy):
+            row = [self.type_id(cls), x.name, x.dummy_index, x._assumptions_orig]
+        elif isinstance(x, sp.Symbol):
+            row = [self.type_id(cls), x.name, x._assumptions_orig]
+        elif isinstance(cls, Singleton): # S.One, S.Half, pi, ...
+            row = [self.type_id(cls)]
+        elif isinstance(x, sp.Integer):
+            row = [self.type_id(cls), int(x)]
+        elif isinstance(x, sp.Rational):
+            row = [self.type_id(cls), x.p, x.q]
+        elif isinstance(x, sp.Float):
+            row = [self.type_id(cls), list(x._mpf_), x._prec]
+        else: # rebuilt as cls(*args)
+            row = [self.type_id(cls), *[self.node(a) for a in x.args]]
+
+        self.ids[key] = len(self.lines)
+        self.keep.append(x)
+        self.lines.append(_encode(row))
+        return self.ids[key]
+
+def dumps(*exprs: sp.Basic) -> str:
+    """
+    Serialize expressions to JSON lines, keeping what pickle and `srepr` drop.
+
+    The first line is a header with the classes used, the `metadata()` of every tensor
+    base (symmetries, `idx_is_superscript`, `idx_types`, `is_random`, `is_gaussian`,
+    propagator rule) and Gaussian kernel, and the line of each expression. Every other line is one node,
+    `[class, *arguments]`, whose sympy arguments are the lines of earlier nodes, so a
+    subtree shared by several parents, or by several expressions, is written once.
+
+    Parameters
+    ----------
+    exprs : sympy.Basic
+        Expressions built from symbols, undefined functions, numbers and sympy or symdl
+        classes. Lambdas, e.g. a propagator or a Wild property given as a lambda, cannot
+        be serialized.
+
+    Example
+    -------
+    >>> text = dumps(Ez4, conn4)
+    >>> Ez4, conn4 = loads(text)
+    """
+    writer = _Writer()
+    roots = [writer.node(sp.sympify(e)) for e in exprs]
+    header = {
+        "format": _FORMAT,
+        "version": _VERSION,
+        "types": [_qualname(cls) for cls in writer.types],
+        "bases": writer.bases,
+        "roots": roots,
+    }
+    return "\n".join([_encode(header), *writer.lines]) + "\n"
+
+def _read_value(x, nodes: list):
+    if isinstance(x, list):
+        return [_read_value(v, nodes) for v in x]
+    if isinstance(x, dict):
+        (tag, v), = x.items()
+        if tag == "tuple":
+            return tuple(_read_value(a, nodes) for a in v)
+        if tag == "dict":
+            return {_read_value(k, nodes): _read_value(a, nodes) for k, a in v}
+        if tag == "expr":
+            return nodes[v]
+        if tag == "undef":
+            return sp.Function(v[0], **v[1])
+        return _resolve(v) # ref
+    return x
+
+def _build(cls: type, row: list, nodes: list, bases: list) -> sp.Basic:
+    if issubclass(cls, sp.IndexedBase) or _has_metadata(cls):
+        new = sp.IndexedBase.__new__ if issubclass(cls, sp.IndexedBase) else sp.Basic.__new__
+        obj = new(cls, *[nodes[a] for a in row[2:]])
+        if bases[row[1]] is not None:
+            obj._set_metadata(_read_value(bases[row[1]], nodes))
+        return obj
+    if cls is AppliedUndef:
+        return sp.Function(row[1], **row[2])(*[nodes[a] for a in row[3:]])
+    if issubclass(cls, sp.Wild):
+        properties = [_read_value(p, nodes) for p in row[3]]
+        return cls(row[1], exclude=[nodes[e] for e in row[2]], properties=properties, **row[4])
+    if issubclass(cls, sp.Dummy):
+        return cls(row[1], dummy_index=row[2], **row[3])
+    if issubclass(cls, sp.Symbol):
+        return cls(row[1], **row[2]) # runs __new__, e.g. RandomSymbol's is_random
+    if isinstance(cls, Singleton):
+        return cls()
+    if issubclass(cls, sp.Integer):
+        return cls(row[1])
+    if issubclass(cls, sp.Rational):
+        return sp.Rational(row[1], row[2])
+    if issubclass(cls, sp.Float):
+        return sp.Float._new(tuple(row[1]), row[2])
+
+    args = [nodes[a] for a in row[1:]]
+    if cls is sp.Add or cls is sp.Mul: # already canonical, skip flattening and sorting
+        return cls._from_args(args)
+    if cls is sp.Pow:
+        return sp.Pow(*args, evaluate=False)
+    return cls(*args)
+
+def loads(text: str) -> list[sp.Basic]:
+    """Expressions serialized by `dumps`, in order. Only load trusted input: it imports the classes it names."""
+    lines = text.splitlines()
+    header = json.loads(lines[0])
+    if header.get("format") != _FORMAT or header.get("version") != _VERSION:
+        raise ValueError(f"Not a {_FORMAT} v{_VERSION} stream: {lines[0][:80]}")
+    types = [_resolve(name) for name in header["types"]]
+    bases = header["bases"]
+    nodes: list[sp.Basic] = []
+    for line in lines[1:]:
+        row = json.loads(line)
+        nodes.append(_build(types[row[0]], row, nodes, bases))
+    return [nodes[r] for r in header["roots"]]
+
+def dump(file: IO[str], *exprs: sp.Basic):
+    """Write `dumps(*exprs)` to a text file."""
+    file.write(dumps(*exprs))
+
+def load(file: IO[str]) -> list[sp.Basic]:
+    """Read expressions written by `dump`."""
+    return loads(file.read())
@@ -1,10 +1,20 @@
 import sympy as sp
 
+from ..tensor.dummy import merge_sums, rename_clashing_dummies
+from ..tensor.poly import TensorPoly
+from ..profiling import profiled
+
+@profiled
 def pull_sums_out_front(expr: sp.Basic) -> sp.Basic:
     """
     Recursively pulls all Sum(...) objects out front as a single multi-indexed Sum.
-    Assumes independence between summation indices.
+    Assumes independence between summation indices; dummies reused by several Sums, or
+    clashing with a free index of the product, are renamed (see `merge_sums`). A power
+    Sum(f, (k, ...))**n becomes n copies with their own dummies k_1, ..., k_n.
     """
+    if isinstance(expr, TensorPoly):
+        return expr # monomials are already a single Sum
+
     if isinstance(expr, sp.Sum):
         # Already a Sum — flatten inner expression
         inner = pull_sums_out_front(expr.function)
@@ -13,6 +23,13 @@ def pull_sums_out_front(expr: sp.Basic) -> sp.Basic:
     if expr.is_Atom:
         return expr
 
+    if isinstance(expr, sp.Pow) and expr.exp.is_Integer and expr.exp > 1:
+        base = pull_sums_out_front(expr.base)
+        if isinstance(base, sp.Sum): # Sum**n: n copies, with renamed dummies
+            factors, limits = merge_sums([([base.function], list(base.limits))] * int(expr.exp))
+            return sp.Sum(sp.Mul(*factors), *limits)
+        return sp.Pow(base, expr.exp)
+
     if expr.func in {sp.Mul, sp.Add}:
         
         new_args = [pull_sums_out_front(arg) for arg in expr.args]
@@ -26,25 +43,25 @@ def pull_sums_out_front(expr: sp.Basic) -> sp.Basic:
                 return sp.Mul(*new_args)
             
             # Combine all Sum limits and product of Sum functions
-            combined_limits = []
-            combined_func = 1
-            for s in sum_factors:
-                combined_limits.extend(s.limits)
-                combined_func *= s.function
-
-            final_expr = sp.Mul(*non_sum_factors) * combined_func
-            return sp.Sum(final_expr, *combined_limits)
+            combined_func, combined_limits = merge_sums(
+                [(non_sum_factors, [])] + [([s.function], list(s.limits)) for s in sum_factors]
+            )
+            return sp.Sum(sp.Mul(*combined_func), *combined_limits)
         
         return expr.func(*new_args)
 
     # Catch-all: recurse into function arguments
     return expr.func(*[pull_sums_out_front(arg) for arg in expr.args])
 
+@profiled
 def pull_coef_out_sum(expr: sp.Basic) -> sp.Basic:
     """
     Recursively pulls constant coefficients out of Sum(...) expressions.
     Assumes independence between coefficients and summation indices.
     """
+    if isinstance(expr, TensorPoly):
+        return expr # monomials keep constant factors out of the Sum
+
     if isinstance(expr, sp.Sum):
         inner = pull_coef_out_sum(expr.function)
 
@@ -71,6 +88,51 @@ def pull_coef_out_sum(expr: sp.Basic) -> sp.Basic:
     return expr.func(*[pull_coef_out_sum(arg) for arg in expr.args])
 
 
+def _contract_deltas(body: sp.Expr, limits: list[tuple]) -> tuple[sp.Expr, list[tuple]]:
+    """
+    Contract all KroneckerDelta factors of `body` that touch a summed index.
+
+    Indices linked by deltas are merged with union-find and every class is renamed to one
+    representative with a single xreplace, preferring free indices over summed ones.
+    Returns the new body and the limits left.
+    """
+    summed = {lim[0] for lim in limits}
+    parent: dict = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x]) # path halving
+            x = parent[x]
+        return x
+
+    deltas, rest = [], []
+    for f in sp.Mul.make_args(body):
+        delta = f.base if isinstance(f, sp.Pow) and f.exp.is_positive and f.exp.is_Integer else f
+        if isinstance(delta, sp.KroneckerDelta) and not summed.isdisjoint(delta.args):
+            deltas.append(delta)
+            a, b = find(delta.args[0]), find(delta.args[1])
+            if a != b:
+                parent[a] = b
+        else:
+            rest.append(f)
+    if not deltas:
+        return body, limits
+
+    classes: dict = {}
+    for x in parent.keys() | set(parent.values()):
+        classes.setdefault(find(x), []).append(x)
+
+    rename, kept = {}, []
+    for members in classes.values():
+        free = sorted((m for m in members if m not in summed), key=sp.default_sort_key)
+        rep = free[0] if free else min(members, key=sp.default_sort_key)
+        rename.update({m: rep for m in members if m in summed and m != rep})
+        kept.extend(sp.KroneckerDelta(rep, m) for m in free[1:]) # free indices stay tied
+
+    body = sp.Mul(*rest).xreplace(rename) * sp.Mul(*kept)
+    return body, [lim for lim in limits if lim[0] not in rename]
+
+@profiled
 def sum_kronecker_contract(expr: sp.Basic) -> sp.Basic:
     """
     Simplifies expressions by contracting KroneckerDelta(i, j) within sums.
@@ -79,48 +141,38 @@ def sum_kronecker_contract(expr: sp.Basic) -> sp.Basic:
     - Sum_{i,j}(KroneckerDelta(i,j) * f(i,j,...)) → Sum_i(f(i,i,...))
     - Sum_{j}(KroneckerDelta(i,j) * f(i,j,...)) → f(i,i,...)
     - Sum_{i}(KroneckerDelta(i,j) * f(i,j,...)) → f(j,j,...)
+
+    All deltas of a product are contracted at once (see `_contract_deltas`); a summand
+    that is a sum, or becomes one by a contraction, is contracted term by term, and Sums
+    nested anywhere are visited.
     """
+    if isinstance(expr, TensorPoly):
+        return expr.map_terms(sum_kronecker_contract)
+
+    if expr.is_Atom or not expr.args:
+        return expr
 
     if isinstance(expr, sp.Sum):
         body = sum_kronecker_contract(expr.function)
-        limits = list(expr.limits)
-        sum_vars = {lim[0] for lim in limits}
-
-        for delta in body.atoms(sp.KroneckerDelta):
-            i, j = delta.args
-
-            # Both i, j in sum → reduce to one
-            if i in sum_vars and j in sum_vars:
-                new_body = body.subs(j, i).replace(delta, 1)
-                new_limits = [lim for lim in limits if lim[0] != j]
-                return sum_kronecker_contract(sp.Sum(new_body, *new_limits)) if new_limits else sum_kronecker_contract(new_body)
-
-            # Only i in sum → substitute i = j
-            if i in sum_vars and j not in sum_vars:
-                new_body = body.subs(i, j).replace(delta, 1)
-                new_limits = [lim for lim in limits if lim[0] != i]
-                return sum_kronecker_contract(sp.Sum(new_body, *new_limits)) if new_limits else sum_kronecker_contract(new_body)
-
-            # Only j in sum → substitute j = i
-            if j in sum_vars and i not in sum_vars:
-                new_body = body.subs(j, i).replace(delta, 1)
-                new_limits = [lim for lim in limits if lim[0] != j]
-                return sum_kronecker_contract(sp.Sum(new_body, *new_limits)) if new_limits else sum_kronecker_contract(new_body)
-
-        return sp.Sum(body, *limits)
-
-    elif isinstance(expr, sp.Add):
-        return sp.Add(*[sum_kronecker_contract(arg) for arg in expr.args])
-
-    elif isinstance(expr, sp.Mul):
-        return sp.Mul(*[sum_kronecker_contract(arg) for arg in expr.args])
+        if isinstance(body, sp.Add):
+            return sp.Add(*[sum_kronecker_contract(sp.Sum(term, *expr.limits)) for term in body.args])
+        body, limits = _contract_deltas(body, list(expr.limits))
+        if limits and isinstance(body, sp.Add): # e.g. δ(μ, i) (x[i, j] + δ(j, ν) y[i])
+            return sum_kronecker_contract(sp.Sum(body, *limits))
+        return sp.Sum(body, *limits) if limits else body
 
-    return expr
+    args = [sum_kronecker_contract(arg) for arg in expr.args]
+    if all(new is old for new, old in zip(args, expr.args)):
+        return expr
+    return expr.func(*args)
 
+@profiled
 def remove_irrelevant_sums(expr: sp.Basic) -> sp.Basic:
     """
     Simplifies Sum(expr, (i, a, b)) to (b - a + 1) * expr if i is not used in expr.
     """
+    if isinstance(expr, TensorPoly):
+        return expr.map_terms(remove_irrelevant_sums)
     if isinstance(expr, sp.Sum):
         body = remove_irrelevant_sums(expr.function)
         limits = list(expr.limits)
@@ -141,3 +193,102 @@ def remove_irrelevant_sums(expr: sp.Basic) -> sp.Basic:
         return sp.Mul(*[remove_irrelevant_sums(arg) for arg in expr.args])
 
     return expr
+
+
+@profiled
+def normalize_sums(expr: sp.Basic) -> sp.Basic:
+    """
+    Fused pull_sums_out_front, pull_coef_out_sum, sum_kronecker_contract and
+    remove_irrelevant_sums in one bottom-up pass.
+
+    Every product or integer power holding Sums becomes a single Sum with all its limits,
+    whose summand is then reduced: KroneckerDelta factors on a summed index are
+    contracted, unused summed indices become factors (b - a + 1), and factors free of the
+    summed indices move in front; Sums nested in the summand are merged into it, never
+    moved out, so Sum_i(x[i] Sum_j y[j]) gives Sum(x[i] y[j], (j, ...), (i, ...)) as
+    the four passes do. Shared subtrees are normalized once.
+    Assumes independence between summation indices, like the individual passes.
+
+    Example
+    -------
+    >>> normalize_sums(c * Sum(KroneckerDelta(i, j) * x[i] * y, (i, 1, n), (j, 1, n)))
+    c*y*Sum(x[i], (i, 1, n))
+    """
+    if isinstance(expr, TensorPoly):
+        return expr.map_terms(normalize_sums)
+
+    memo: dict[sp.Basic, sp.Basic] = {}
+
+    def visit(e: sp.Basic) -> sp.Basic:
+        if e.is_Atom or not e.args:
+            return e
+        if e not in memo:
+            memo[e] = normalize(e)
+        return memo[e]
+
+    def normalize(e: sp.Basic) -> sp.Basic:
+        if isinstance(e, sp.Sum):
+            return _reduce_sum(visit(e.function), list(e.limits))
+
+        args = [visit(arg) for arg in e.args]
+
+        if isinstance(e, sp.Mul):
+            factors = [f for arg in args for f in sp.Mul.make_args(arg)] # a reduced Sum may carry coefficients
+            if any(isinstance(f, sp.Sum) for f in factors):
+                return product(factors)
+            return sp.Mul(*args)
+
+        if isinstance(e, sp.Pow) and e.exp.is_Integer and e.exp > 1:
+            factors = list(sp.Mul.make_args(args[0]))
+            if any(isinstance(f, sp.Sum) for f in factors): # Sum**n: n copies, with renamed dummies
+                return product(factors * int(e.exp))
+
+        if all(new is old for new, old in zip(args, e.args)):
+            return e
+        rebuilt = e.func(*args)
+        if rebuilt.func is not e.func and not rebuilt.is_Atom: # e.g. a linear ExpVal moved a Sum out
+            return visit(rebuilt)
+        return rebuilt
+
+    def product(factors: list[sp.Expr]) -> sp.Expr:
+        sums = [f for f in factors if isinstance(f, sp.Sum)]
+        others = [f for f in factors if not isinstance(f, sp.Sum)]
+        factors, limits = merge_sums([(others, [])] + [([s.function], list(s.limits)) for s in sums])
+        return _reduce_sum(sp.Mul(*factors), limits)
+
+    return visit(expr)
+
+def _reduce_sum(body: sp.Expr, limits: list[tuple]) -> sp.Expr:
+    """Sum(body, *limits) for a normalized body, reduced as in `normalize_sums`."""
+    factors = sp.Mul.make_args(body)
+    sums = [f for f in factors if isinstance(f, sp.Sum)]
+    if sums: # nested Sums stay in the summand: merge their limits
+        others = [f for f in factors if not isinstance(f, sp.Sum)]
+        taken = {lim[0].name for lim in limits}
+        taken |= {x.name for f in [*others, *sums] for x in f.free_symbols if isinstance(x, sp.Symbol)}
+        inner, inner_limits = [], []
+        for s in sums:
+            function, s_limits = rename_clashing_dummies([s.function], list(s.limits), taken)
+            inner.extend(function)
+            inner_limits.extend(s_limits)
+        limits = inner_limits + limits
+        body = sp.Mul(*others, *inner)
+
+    body, limits = _contract_deltas(body, limits)
+
+    free = body.free_symbols
+    kept = []
+    count = sp.S.One
+    for lim in limits:
+        if lim[0] in free:
+            kept.append(lim)
+        else:
+            count *= lim[2] - lim[1] + 1
+    if not kept:
+        return count * body
+
+    summed = {lim[0] for lim in kept}
+    outer, inner = [count], []
+    for f in sp.Mul.make_args(body):
+        (outer if f.free_symbols.isdisjoint(summed) else inner).append(f)
+    return sp.Mul(*outer) * sp.Sum(sp.Mul(*inner), *kept)
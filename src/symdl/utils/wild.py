@@ -1,6 +1,10 @@
 import sympy as sp
 from typing import Iterable, Callable, Optional, Tuple
 
+from ..tensor.poly import TensorPoly
+from ..profiling import profiled
+from .cache import LRUCache
+
 def wilds(names: str,
           exclude: Optional[Iterable] = None,
           properties: Optional[Iterable[Callable]] = None) -> Tuple[sp.Wild, ...]:
@@ -23,6 +27,99 @@ def wilds(names: str,
         for name in names.replace(',', ' ').split()
     )
 
+# Mul, Add and Pow patterns also match other nodes, e.g. x*W matches x with W = 1
+_ANY_HEAD = (sp.Wild, sp.Mul, sp.Add, sp.Pow)
+
+class RuleSet:
+    """
+    Compiled {pattern: replacement} rules, equivalent to `expr.replace(pattern, replacement)`
+    for each rule in the order given.
+
+    Each rule rewrites the expression in one bottom-up pass, as `Basic.replace` does (Wild
+    matching, `exact` when several Wilds), so it sees the replacements of the rules before
+    it and not those after it. A pass only calls `match` on nodes of the pattern's type
+    (e.g. GaussianEval, Indexed), which are the only ones such a pattern can match; Mul,
+    Add and Pow patterns and bare Wilds are tried on every node. Shared subtrees are
+    rewritten once per rule.
+
+    Parameters
+    ----------
+    rules : dict
+        {pattern: replacement}, replacement an expression or a callable taking the
+        matched Wilds by name, as in `Basic.replace`.
+
+    Example
+    -------
+    >>> rules = RuleSet({EK(z[A] * z[B]): K[A, B]})
+    >>> rules(expr)
+    """
+    __slots__ = ("rules",)
+
+    def __init__(self, rules: dict):
+        self.rules = []
+        for pattern, value in rules.items():
+            pattern = sp.sympify(pattern)
+            if not callable(value) or isinstance(value, sp.Basic):
+                value = sp.sympify(value) # e.g. a plain 0, as Basic.replace accepts
+            exact = len(pattern.atoms(sp.Wild)) > 1
+            head = None if isinstance(pattern, _ANY_HEAD) else type(pattern)
+            self.rules.append((pattern, value, exact, head))
+
+    @property
+    def spans_factors(self) -> bool:
+        """Whether a pattern may match a product of several factors."""
+        return any(head is None for *_, head in self.rules)
+
+    @staticmethod
+    def _replace(expr: sp.Basic, pattern: sp.Basic, value, exact: bool, head: type | None) -> sp.Basic:
+        memo: dict[sp.Basic, sp.Basic] = {}
+
+        def rewrite(node: sp.Basic) -> sp.Basic:
+            if head is not None and not isinstance(node, head):
+                return node
+            result = node.match(pattern)
+            if result is None or (exact and not all(result.values())):
+                return node
+            if isinstance(value, sp.Basic):
+                new = value.subs(result)
+            else:
+                new = value(**{str(k)[:-1]: v for k, v in result.items()})
+            return node if new is None or new == node else new
+
+        def walk(e: sp.Basic) -> sp.Basic:
+            if e in memo:
+                return memo[e]
+            args = getattr(e, 'args', None)
+            if args is None:
+                return e
+            node = e
+            if args:
+                new_args = tuple(walk(a) for a in args)
+                if new_args != args:
+                    node = e.func(*new_args)
+                    # as Basic.replace: a node that collapsed to a replaced argument is not tried again
+                    if any(node == a and a != new for a, new in zip(args, new_args)):
+                        memo[e] = node
+                        return node
+            memo[e] = rewrite(node)
+            return memo[e]
+
+        return walk(expr)
+
+    def __call__(self, expr: sp.Basic) -> sp.Basic:
+        expr = sp.sympify(expr)
+        for rule in self.rules:
+            expr = self._replace(expr, *rule)
+        return expr
+
+_compiled = LRUCache(maxsize=64) # rule items: RuleSet
+
+def compile_rules(rule_dict: dict) -> RuleSet:
+    """RuleSet for `rule_dict`, cached across calls."""
+    key = tuple(rule_dict.items())
+    return _compiled.get_or_compute(key, lambda: RuleSet(rule_dict))
+
+@profiled
 def wild_subs(expr: sp.Basic, rule_dict: dict):
     """
     Apply a dictionary of pattern-based Wild substitutions, like .subs() but using .replace().
@@ -31,16 +128,22 @@ def wild_subs(expr: sp.Basic, rule_dict: dict):
     ----------
     expr : sympy.Basic
         The symbolic expression to rewrite
-    rule_dict : dict
-        Dictionary of {pattern: replacement}, where pattern can contain Wild symbols
+    rule_dict : dict | RuleSet
+        Dictionary of {pattern: replacement}, where pattern can contain Wild symbols.
+        It is compiled into a cached `RuleSet`.
 
     Returns
     -------
     sympy.Basic
         Expression with all matching patterns replaced
     """
-    for pattern, repl in rule_dict.items():
-        expr = expr.replace(pattern, repl)
-    return expr
+    rules = rule_dict if isinstance(rule_dict, RuleSet) else compile_rules(rule_dict)
+
+    if isinstance(expr, TensorPoly):
+        if rules.spans_factors:
+            return expr.map_terms(rules)
+        return expr.replace_factors(rules)
+
+    return rules(expr)
 
 
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+import sympy as sp
+
+from symdl import SymmetryIndexedBase, canonicalize_dummy_indices
+from symdl.tensor.canonical import _brute_force_canonical, _canonical_sum, lex_min_relabeling
+from symdl.tensor.symmetry import symmetry_generators, symmetry_group
+
+K = SymmetryIndexedBase("K", symmetries="full")
+V = SymmetryIndexedBase("V", symmetries="full", idx_is_superscript=True)
+G = SymmetryIndexedBase("G", symmetries=[(0, 1)])
+R = SymmetryIndexedBase("R", symmetries=[([0, 1], [2, 3])])
+T = sp.IndexedBase("T")
+mu = sp.symbols("mu1:3", integer=True)
+rho = sp.symbols("rho1:5", integer=True)
+beta = sp.symbols("beta1:4", integer=True)
+N, D = sp.symbols("N D", integer=True)
+
+def _sum(summand, *limits):
+    return sp.Sum(summand, *[(i, 1, n) for idx, n in limits for i in idx])
+
+@pytest.mark.parametrize("expr", [
+    _sum(V[rho] * K[mu[0], rho[0]] * K[mu[1], rho[1]] * K[rho[2], rho[3]], (rho, N)),
+    _sum(V[rho] * K[rho[3], mu[0]] * K[rho[2], mu[1]] * K[rho[1], rho[0]], (rho, N)),
+    _sum(T[rho[2], rho[0]] * T[rho[0], rho[1]] * T[rho[1], rho[3]] * G[rho[3], rho[2]], (rho, N)),
+    _sum(R[rho[3], rho[1], rho[0], rho[2]] * T[rho[1], mu[0]] * K[rho[2], rho[3]], (rho, N)),
+    _sum(T[rho[1], beta[2]] * T[rho[0], beta[0]] * G[beta[1], beta[2]] * K[rho[0], rho[1], beta[1], beta[0]], (rho[:2], N), (beta, D)),
+    _sum(T[rho[0], rho[1]]**2 * sp.KroneckerDelta(rho[1], mu[0]) * T[rho[2], rho[2]], (rho[:3], N)),
+])
+def test_lex_min_relabeling_matches_all_permutations(expr):
+    assert lex_min_relabeling(expr) is not None
+    assert _canonical_sum(expr) == _brute_force_canonical(expr)
+
+def test_random_tensor_networks_match_all_permutations():
+    rng = random.Random(0)
+    tensors = [(K, 2), (G, 2), (T, 2), (R, 4), (V, 4), (T, 3)]
+    for _ in range(40):
+        pool = list(rho) + [mu[0]]
+        factors = []
+        for base, rank in rng.sample(tensors, 3):
+            factors.append(base[tuple(rng.choice(pool) for _ in range(rank))])
+        summed = [r for r in rho if any(r in f.free_symbols for f in factors)]
+        if not summed:
+            continue
+        expr = sp.Sum(sp.Mul(*factors), *[(r, 1, N) for r in summed])
+        assert lex_min_relabeling(expr) is not None
+        assert _canonical_sum(expr) == _brute_force_canonical(expr), expr
+
+def test_relabelings_share_one_canonical_form():
+    expr = _sum(V[rho] * K[mu[0], rho[0]] * K[mu[1], rho[1]] * K[rho[2], rho[3]], (rho, N))
+    renamed = [expr.xreplace(dict(zip(rho, p))) for p in [rho[::-1], (rho[2], rho[0], rho[3], rho[1])]]
+    assert len({canonicalize_dummy_indices(e) for e in [expr, *renamed]}) == 1
+
+def _orbit(indices: tuple, symmetries) -> set[tuple]:
+    # every index tuple reachable by repeatedly applying the generating swaps
+    generators = symmetry_generators(symmetries, len(indices))
+    orbit, frontier = {indices}, [indices]
+    while frontier:
+        idx = frontier.pop()
+        for g in generators:
+            new = tuple(idx[k] for k in g)
+            if new not in orbit:
+                orbit.add(new)
+                frontier.append(new)
+    return orbit
+
+@pytest.mark.parametrize("symmetries, rank, order", [
+    ("full", 4, 24),
+    ([(0, 1)], 2, 2),
+    ([(0, 1), (1, 2)], 3, 6), # compositions of the two swaps give all of S_3
+    ([([0, 1], [2, 3])], 4, 2),
+    ([(0, 1), (2, 3), ([0, 1], [2, 3])], 4, 8),
+])
+def test_tensor_canonicalize_is_the_minimal_image(symmetries, rank, order):
+    assert len(symmetry_group(symmetries, rank)) == order
+    A = SymmetryIndexedBase("A", symmetries=symmetries)
+    rng = random.Random(rank)
+    pool = [*rho, *mu, 1, 2]
+    for _ in range(30):
+        indices = tuple(rng.choice(pool) for _ in range(rank))
+        images = [A[idx] for idx in _orbit(indices, symmetries)]
+        best = min(images, key=lambda t: t.sort_key())
+        assert all(t.canonicalize() == best for t in images)
@@ -0,0 +1,45 @@
+import random
+
+import sympy as sp
+
+from symdl import SymmetryIndexedBase, TensorPoly, canonicalize_dummy_indices, collect_canonical_terms
+from symdl.tensor.collect import _split_numeric
+
+K = SymmetryIndexedBase("K", symmetries="full")
+V = SymmetryIndexedBase("V", symmetries="full")
+mu = sp.symbols("mu1:3", integer=True)
+rho = sp.symbols("rho1:5", integer=True)
+N = sp.Symbol("N", integer=True)
+eps = sp.Symbol("epsilon")
+
+def _value(x: sp.Indexed) -> int:
+    # a fixed value per component, equal on the components a full symmetry identifies
+    return random.Random(f"{x.base}{sorted(x.indices)}").randint(-9, 9)
+
+def _evaluate(expr) -> sp.Expr:
+    expr = expr.xreplace({mu[0]: 1, mu[1]: 2}).subs(N, 3).doit()
+    return sp.expand(expr.xreplace({x: _value(x) for x in expr.atoms(sp.Indexed)}))
+
+def _vertex(*order):
+    # K[mu1, a] K[mu2, b] K[c, d] V[a, b, c, d] for a relabeling of rho
+    a, b, c, d = (rho[k] for k in order)
+    return K[mu[0], a] * K[mu[1], b] * K[c, d] * V[a, b, c, d]
+
+def test_collected_terms_are_merged_and_equal():
+    # as pull_sums_out_front leaves them: symbols inside the Sums, numbers in or out
+    limits = [(r, 1, N) for r in rho]
+    expr = (
+        sp.Sum(-eps * _vertex(0, 1, 2, 3) / 24, *limits)
+        + sp.Sum(-eps * _vertex(3, 2, 1, 0) / 8, *limits)
+        - sp.Sum(eps * _vertex(1, 0, 3, 2), *limits) / 3
+        + 2 * sp.Sum(eps * K[rho[0], mu[0]] * K[rho[1], rho[1]], *limits[:2])
+        + sp.Sum(3 * eps * K[rho[1], mu[0]] * K[rho[0], rho[0]], *limits[:2])
+        + K[mu[0], mu[1]] + K[mu[0], mu[1]] / 2
+    )
+    canonical = canonicalize_dummy_indices(expr)
+    collected = collect_canonical_terms(canonical)
+    keys = [_split_numeric(term)[1] for term in sp.Add.make_args(collected)]
+    assert len(keys) == len(set(keys)) == 3
+    assert _evaluate(collected) == _evaluate(expr) == _evaluate(canonical.simplify())
+    poly = TensorPoly.from_expr(canonical) # merges like terms on construction
+    assert len(poly) == 3 and _evaluate(poly.as_expr()) == _evaluate(expr)
@@ -0,0 +1,59 @@
+from math import factorial
+
+import pytest
+import sympy as sp
+from sympy.utilities.iterables import multiset_partitions
+
+from symdl import ExpVal, RandomIndexedBase
+from symdl.random.correlator import _connected_correlator, connected_correlator, set_partitions
+
+z = RandomIndexedBase("z")
+mu = sp.symbols("mu1:7", integer=True)
+
+def _brute_force(indices, even_parity):
+    # moment-cumulant formula over every set partition, odd blocks vanishing with even parity
+    total = 0
+    for partition in multiset_partitions(list(indices)):
+        if even_parity and any(len(block) % 2 for block in partition):
+            continue
+        k = len(partition)
+        total += (-1)**(k - 1) * factorial(k - 1) * sp.Mul(*[
+            ExpVal(sp.Mul(*[z[i] for i in block])) for block in partition
+        ])
+    return total
+
+@pytest.mark.parametrize("n", range(7))
+@pytest.mark.parametrize("even_blocks", [False, True])
+def test_set_partitions_are_all_partitions(n, even_blocks):
+    expected = {
+        frozenset(frozenset(block) for block in p) for p in multiset_partitions(list(range(n)))
+        if not even_blocks or all(len(block) % 2 == 0 for block in p)
+    } if n else {frozenset()}
+    generated = [frozenset(frozenset(block) for block in p) for p in set_partitions(list(range(n)), even_blocks)]
+    assert len(generated) == len(set(generated))
+    assert set(generated) == expected
+
+@pytest.mark.parametrize("n", range(1, 7))
+@pytest.mark.parametrize("even_parity", [False, True])
+def test_recursion_matches_moment_cumulant_formula(n, even_parity):
+    result = _connected_correlator(z, mu[:n], even_parity)
+    assert sp.expand(result - _brute_force(mu[:n], even_parity)) == 0
+
+def test_templates_are_shared_across_index_names():
+    connected_correlator.cache_clear()
+    nu = sp.symbols("nu1:5", integer=True)
+    assert connected_correlator(z, mu[:4]) == _connected_correlator(z, mu[:4])
+    assert connected_correlator(z, nu) == _connected_correlator(z, nu)
+    info = connected_correlator.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+def test_templates_keep_literal_and_paired_indices():
+    connected_correlator.cache_clear()
+    i = sp.symbols("i1:5", integer=True)
+    pairs = tuple(zip(i, mu))
+    assert connected_correlator(z, pairs) == _connected_correlator(z, pairs)
+    for literal in (1, 2): # z[1]**2 is not z[1]*z[2]: literals are part of the key
+        indices = (literal, mu[1], literal, mu[3])
+        assert connected_correlator(z, indices, False) == _connected_correlator(z, indices, False)
+    info = connected_correlator.cache_info()
+    assert info.misses == 3 and info.maxsize is not None
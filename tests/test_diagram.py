@@ -0,0 +1,44 @@
+import pytest
+import sympy as sp
+
+from symdl import (
+    GaussianExpVal,
+    GaussianIndexedBase,
+    SymmetryIndexedBase,
+    canonicalize_dummy_indices,
+    collect_canonical_terms,
+    diagram_contraction,
+    pull_sums_out_front,
+    wick_contraction,
+)
+
+K = SymmetryIndexedBase("K", symmetries="full")
+V = SymmetryIndexedBase("V", symmetries="full", idx_is_superscript=True)
+W = SymmetryIndexedBase("W", symmetries="full")
+U = sp.IndexedBase("U")
+z = GaussianIndexedBase("z")
+EK = GaussianExpVal(K, propagator=K)
+mu = sp.symbols("mu1:4", integer=True)
+rho = sp.symbols("rho1:7", integer=True)
+N = sp.Symbol("N", integer=True)
+
+def _canonical(expr):
+    return collect_canonical_terms(canonicalize_dummy_indices(pull_sums_out_front(sp.expand(expr))))
+
+def _vertices(T, idx, external=()):
+    """Sum over rho of Π T[rho...] ⟨z[external] Π z[rho]⟩."""
+    summed = [r for i in idx for r in i]
+    fields = sp.Mul(*[z[i] for i in (*external, *summed)])
+    return sp.Sum(sp.Mul(*[T[i] for i in idx]) * EK(fields), *[(r, 1, N) for r in summed])
+
+@pytest.mark.parametrize("expr, n_diagrams", [
+    (_vertices(V, [rho[:4]]), 1),
+    (_vertices(V, [rho[:4]], mu[:2]), 2),
+    (_vertices(U, [rho[:4]], mu[:2]), 15), # no symmetry: every pairing is its own diagram
+    (_vertices(U, [rho[:3]], mu[:3]), 15),
+    (_vertices(W, [rho[:3], rho[3:6]], mu[:2]), 5),
+])
+def test_diagrams_match_wick_then_canonicalize(expr, n_diagrams):
+    diagrams = diagram_contraction(expr)
+    assert len(sp.Add.make_args(diagrams)) == n_diagrams
+    assert _canonical(diagrams - wick_contraction(expr)) == 0
@@ -0,0 +1,33 @@
+from sympy import Symbol
+
+from symdl import DiskCache
+from symdl.utils.diskcache import _source_hash
+
+def test_version_tag_holds_source_digest(tmp_path):
+    assert _source_hash() in DiskCache(str(tmp_path)).version
+
+def test_prune_only_removes_other_versions(tmp_path):
+    stale = tmp_path / "symdl-old_sympy-1.0_format-1"
+    stale.mkdir()
+    (tmp_path / "other").mkdir()
+    cache = DiskCache(str(tmp_path))
+    assert stale.exists() # opening the cache keeps other versions
+    assert cache.prune() == [str(stale)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([cache.version, "other"])
+
+def test_unreadable_entry_is_a_miss_and_removed(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = cache.key("f", 1)
+    path = tmp_path / cache.version / f"{key}.jsonl"
+    path.write_text("not an entry\n")
+    assert cache.get(key, "missing") == "missing"
+    assert not path.exists()
+
+def test_set_refuses_values_that_do_not_round_trip(tmp_path, monkeypatch):
+    from symdl.utils import diskcache
+
+    cache = DiskCache(str(tmp_path))
+    x = Symbol("x")
+    monkeypatch.setattr(diskcache, "loads", lambda text: [Symbol("y")])
+    assert not cache.set(cache.key("f", x), x)
+    assert cache.size() == 0
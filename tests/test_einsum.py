@@ -0,0 +1,23 @@
+import pytest
+import sympy as sp
+
+np = pytest.importorskip("numpy")
+
+from symdl.numeric import compile_einsum
+
+K = sp.IndexedBase("K")
+r = sp.Symbol("r", integer=True)
+N = sp.Symbol("N", integer=True)
+
+def test_trace():
+    f = compile_einsum(sp.Sum(K[r, r], (r, 1, N)))
+    assert f({"K": np.diag([1.0, 2.0, 3.0])}, N=3) == 6.0
+
+def test_partial_range_is_rejected():
+    with pytest.raises(ValueError, match="start at 1"):
+        compile_einsum(sp.Sum(K[r, r], (r, 2, N)))
+
+def test_range_shorter_than_axis_is_rejected():
+    f = compile_einsum(sp.Sum(K[r, r], (r, 1, N)))
+    with pytest.raises(ValueError, match="shape"):
+        f({"K": np.eye(4)}, N=3)
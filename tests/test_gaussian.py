@@ -0,0 +1,43 @@
+import pickle
+
+import sympy as sp
+
+from symdl import GaussianExpVal, GaussianIndexedBase, GaussianKernel, RandomIndexedBase, perturbative_expectation, wick_contraction
+
+mu, nu = sp.symbols("mu nu", integer=True)
+
+def test_propagator_rule_stays_with_its_operator():
+    K = sp.IndexedBase("K")
+    z = RandomIndexedBase("z", is_gaussian=True)
+    with_rule, plain = GaussianExpVal(K, propagator=K), GaussianExpVal(K)
+    assert wick_contraction(with_rule(z[mu] * z[nu])) == K[mu, nu]
+    assert wick_contraction(plain(z[mu] * z[nu])) == plain(z[mu] * z[nu])
+    assert with_rule(z[mu] * z[nu]) != plain(z[mu] * z[nu])
+
+def test_propagator_rule_survives_pickling():
+    K = sp.IndexedBase("K")
+    z = RandomIndexedBase("z", is_gaussian=True)
+    E = pickle.loads(pickle.dumps(GaussianExpVal(K, propagator=K)(z[mu]**2 * z[nu]**2)))
+    assert wick_contraction(E) == K[mu, mu] * K[nu, nu] + 2 * K[mu, nu]**2
+
+def test_field_propagator_rule_is_part_of_equality():
+    K, G = sp.IndexedBase("K"), sp.IndexedBase("G")
+    z = GaussianIndexedBase("z", propagator=[sp.KroneckerDelta, G])
+    assert z == GaussianIndexedBase("z", propagator=(sp.KroneckerDelta, G))
+    assert z != GaussianIndexedBase("z", propagator=K)
+    assert z != GaussianIndexedBase("z")
+    assert sorted([z, GaussianIndexedBase("z"), GaussianIndexedBase("z", propagator=K)], key=sp.default_sort_key)
+    assert hash(pickle.loads(pickle.dumps(z))) == hash(z)
+
+def test_perturbative_expectation_takes_a_propagator():
+    K, V = sp.IndexedBase("K"), sp.IndexedBase("V")
+    z = RandomIndexedBase("z", is_gaussian=True)
+    rho = sp.symbols("rho1:5", integer=True)
+    N, eps = sp.Symbol("N", integer=True), sp.Symbol("epsilon")
+    limits = [(r, 1, N) for r in rho]
+    action = eps * sp.Sum(V[rho] * sp.Mul(*[z[r] for r in rho]) / 24, *limits)
+    with_rule = perturbative_expectation(z[mu] * z[nu], action, K, 1, propagator=K)
+    assert with_rule == perturbative_expectation(z[mu] * z[nu], action, GaussianKernel(K, K), 1)
+    assert with_rule.subs(eps, 0) == K[mu, nu]
+    assert len(sp.Add.make_args(with_rule)) == 13 # K[mu, nu] and the 12 connected contractions
+    assert not with_rule.atoms(sp.Function) # no ⟨a b⟩_K left
@@ -0,0 +1,49 @@
+from math import erf as _erf
+
+import pytest
+import sympy as sp
+
+np = pytest.importorskip("numpy")
+
+from symdl.numeric import gauss_hermite, gaussian_activation_kernel, kernel_recursion
+
+erf = np.vectorize(_erf)
+
+def _erf_kernel(K):
+    # closed form of E[erf(z_a) erf(z_b)], z ~ N(0, K) (Williams, 1997)
+    d = 1 + 2 * np.diag(K)
+    return 2 / np.pi * np.arcsin(2 * K / np.sqrt(np.outer(d, d)))
+
+def _random_kernel(n_samples, seed=0):
+    x = np.random.default_rng(seed).normal(size=(n_samples, 3))
+    return x @ x.T / 3
+
+def test_gauss_hermite_moments():
+    u, w = gauss_hermite(8)
+    assert [w @ u**k for k in range(7)] == pytest.approx([1, 0, 1, 0, 3, 0, 15])
+
+def test_identity_activation_returns_the_kernel():
+    K = _random_kernel(5)
+    assert gaussian_activation_kernel(K, lambda z: z, order=4) == pytest.approx(K)
+
+def test_erf_activation_matches_closed_form():
+    K = _random_kernel(6)
+    expected = _erf_kernel(K)
+    assert gaussian_activation_kernel(K, erf, order=48) == pytest.approx(expected, abs=1e-5)
+    # one pair per batch, and a sample of zero variance
+    K[0, :] = K[:, 0] = 0
+    assert gaussian_activation_kernel(K, erf, order=48, chunk_size=1) == pytest.approx(_erf_kernel(K), abs=1e-5)
+
+def test_kernel_recursion_matches_layer_by_layer():
+    x = np.random.default_rng(1).normal(size=(4, 3))
+    C_b, C_W = [0.1, 0.2, 0.3], [1.0, 1.5, 2.0]
+    kernels = kernel_recursion(x, C_b, C_W, np.tanh, depth=3, order=24)
+    K = C_b[0] + C_W[0] * x @ x.T / 3
+    for l in range(3):
+        assert kernels[l] == pytest.approx(K)
+        if l < 2:
+            K = C_b[l + 1] + C_W[l + 1] * gaussian_activation_kernel(K, np.tanh, order=24)
+    erf_kernels = kernel_recursion(x, 0.0, 1.0, erf, depth=2, order=48)
+    assert erf_kernels[1] == pytest.approx(_erf_kernel(erf_kernels[0]), abs=1e-5)
+    # sympy activations are lambdified
+    assert kernel_recursion(x, C_b, C_W, sp.tanh, depth=3, order=24)[-1] == pytest.approx(kernels[-1])
@@ -0,0 +1,12 @@
+import pytest
+
+import symdl.numeric.montecarlo as montecarlo
+
+@pytest.mark.parametrize("make", [
+    lambda: montecarlo.layer_sampler([[1.0]], [2], 0.0, 1.0),
+    lambda: montecarlo.quartic_sampler([[1.0]], [[[[0.0]]]], 0.1, 2),
+])
+def test_samplers_require_numpy(monkeypatch, make):
+    monkeypatch.setattr(montecarlo, "np", None)
+    with pytest.raises(ImportError, match="pip install dlt-calc\\[numeric\\]"):
+        make()
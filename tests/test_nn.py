@@ -0,0 +1,74 @@
+import random
+from itertools import product
+
+import sympy as sp
+
+from symdl import ExpVal, Layer, Network, NNIndexedBase, neuron_indices, sample_indices
+from symdl.utils import pull_sums_out_front, sum_kronecker_contract, wild_subs, wilds
+
+i1 = neuron_indices("i1")
+alpha1 = sample_indices("alpha1")
+x = sp.IndexedBase("x")
+n0 = sp.Symbol("n0", integer=True)
+C_b, C_w = sp.symbols("C_b C_W", positive=True)
+
+def test_first_layer_second_moment():
+    b = NNIndexedBase("b", is_gaussian=True)
+    W = NNIndexedBase("W", is_gaussian=True)
+    z1 = Layer(W, b, x, n0).preactivation
+    A, B, C, D = wilds("A, B, C, D")
+    rules = {
+        ExpVal(W[A, B] * b[C]): 0,
+        ExpVal(b[A] * b[B]): C_b * sp.KroneckerDelta(A, B),
+        ExpVal(W[A, B] * W[C, D]): C_w * sp.KroneckerDelta(A, C) * sp.KroneckerDelta(B, D) / n0,
+    }
+    zz = pull_sums_out_front(sp.expand(z1[i1, alpha1] * z1[i1, alpha1])) # Sum(...)**2
+    Ezz = sum_kronecker_contract(wild_subs(ExpVal(zz), rules)).doit()
+    k = Ezz.atoms(sp.Sum).pop().limits[0][0]
+    assert Ezz == C_b + sp.Sum(C_w * x[k, alpha1]**2 / n0, (k, 1, n0))
+
+i = [neuron_indices(f"i{k}") for k in range(1, 5)]
+alpha = [sample_indices(f"alpha{k}") for k in range(1, 5)]
+pairings = [((0, 1), (2, 3)), ((0, 2), (1, 3)), ((0, 3), (1, 2))]
+
+def _evaluate(expr, values: dict, widths: dict) -> sp.Expr:
+    # concrete indices and widths, then a fixed value per moment: the brute-force sums
+    # and the recursion must agree whatever the activation statistics are
+    expr = expr.xreplace(values).xreplace(widths).doit()
+    expr = expr.xreplace({e: _value(e.args[0]) for e in expr.atoms(ExpVal)})
+    return sp.expand(expr.xreplace({e: _value(e) for e in expr.atoms(sp.Indexed)}))
+
+def _value(e: sp.Expr) -> int:
+    return random.Random(str(e)).randint(-9, 9)
+
+def test_network_recursions_match_direct_sums():
+    net = Network(x, n0)
+    n1, n = net.width(1), 2
+    sigma = net.activation(1)
+    C_W2, C_b2 = net.layer(2)._C_w, net.layer(2)._C_b
+    j, k = sp.symbols("j k", integer=True)
+
+    def G(a, b): # E[z_a z_b | σ] / δ(i_a, i_b) at layer 2, summed directly
+        return C_b2 + C_W2 / n1 * sp.Sum(sigma[j, alpha[a]] * sigma[j, alpha[b]], (j, 1, n1))
+
+    def moment(e): # E over the activations of a product of Sums, term by term
+        terms = sp.Add.make_args(sp.expand(e.xreplace({n1: n}).doit()))
+        return sp.Add(*[ExpVal(t) if t.has(sigma) else t for t in terms])
+
+    kernel = sp.KroneckerDelta(i[0], i[1]) * moment(G(0, 1))
+    four_point = sum(
+        sp.KroneckerDelta(i[a], i[b]) * sp.KroneckerDelta(i[c], i[d])
+        * (moment(G(a, b) * G(c, d).xreplace({j: k})) - moment(G(a, b)) * moment(G(c, d)))
+        for (a, b), (c, d) in pairings
+    )
+    for neurons, samples in product([(1, 1, 1, 1), (1, 1, 2, 2), (1, 2, 1, 2)], [(1, 2, 3, 4), (1, 1, 2, 2), (1, 2, 2, 1)]):
+        values = dict(zip(i + alpha, neurons + samples))
+        assert _evaluate(net.kernel(2, *zip(i[:2], alpha[:2])), values, {n1: n}) == _evaluate(kernel, values, {n1: n})
+        assert _evaluate(net.four_point(2, *zip(i, alpha)), values, {n1: n}) == _evaluate(four_point, values, {n1: n})
+
+    # deterministic input: the first layer is Gaussian
+    C_W1, C_b1 = net.layer(1)._C_w, net.layer(1)._C_b
+    direct = sp.KroneckerDelta(i[0], i[1]) * (C_b1 + C_W1 / n0 * sp.Sum(x[j, alpha[0]] * x[j, alpha[1]], (j, 1, n0)))
+    values = dict(zip(i + alpha, (1, 1, 1, 2)))
+    assert _evaluate(net.kernel(1, *zip(i[:2], alpha[:2])), values, {n0: 3}) == _evaluate(direct, values, {n0: 3})
+    assert net.four_point(1, *zip(i, alpha)) == 0
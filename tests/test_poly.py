@@ -0,0 +1,83 @@
+import sympy as sp
+
+from symdl import (
+    GaussianExpVal,
+    GaussianIndexedBase,
+    NNIndexedBase,
+    RandomSymbol,
+    SymmetryIndexedBase,
+    TensorPoly,
+    canonicalize_dummy_indices,
+    collect_canonical_terms,
+    neuron_indices,
+    pull_sums_out_front,
+    sample_indices,
+    wick_contraction,
+    wild_subs,
+    wilds,
+)
+
+r, s = sp.symbols("r s", integer=True)
+N = sp.Symbol("N", integer=True)
+eps = sp.Symbol("epsilon")
+
+def _equal(a, b) -> bool:
+    """a == b up to dummy names and term order, checked with the SymPy transforms."""
+    return collect_canonical_terms(canonicalize_dummy_indices(pull_sums_out_front(sp.expand(a - b)))) == 0
+
+def _compare_pipelines(expr, rule):
+    """Each stage on TensorPoly against the same stage on the SymPy expression."""
+    poly = TensorPoly.from_expr(expr)
+    expr, poly = wild_subs(wick_contraction(expr), rule), wild_subs(wick_contraction(poly), rule)
+    assert _equal(expr, poly.as_expr())
+    expr = canonicalize_dummy_indices(pull_sums_out_front(sp.expand(expr)))
+    poly = canonicalize_dummy_indices(poly)
+    assert _equal(expr, poly.as_expr())
+    expr, poly = collect_canonical_terms(expr), collect_canonical_terms(poly)
+    assert isinstance(poly, TensorPoly)
+    assert _equal(expr, poly.as_expr())
+    return poly
+
+def test_replace_factors_keeps_the_monomial_dummies_bound():
+    z = GaussianIndexedBase("z")
+    K = SymmetryIndexedBase("K", symmetries="full")
+    V = sp.IndexedBase("V")
+    for EK in (GaussianExpVal(K), GaussianExpVal(K, propagator=K)):
+        expr = sp.Sum(V[r, s] * EK(z[r] * z[s]), (r, 1, N), (s, 1, N))
+        assert wick_contraction(TensorPoly.from_expr(expr)).as_expr() == wick_contraction(expr)
+
+def test_nearly_gaussian_four_point_function():
+    # ch01/03_Nearly_Gaussian_Distributions
+    K = SymmetryIndexedBase("K", symmetries="full")
+    V = SymmetryIndexedBase("V", symmetries="full", idx_is_superscript=True)
+    z = GaussianIndexedBase("z")
+    mu = sp.symbols("mu1:5", integer=True)
+    rho = sp.symbols("rho1:5", integer=True)
+    action = -eps * sp.Sum(V[rho] * z[rho[0]] * z[rho[1]] * z[rho[2]] * z[rho[3]] / 24, *[(x, 1, N) for x in rho])
+    EK = GaussianExpVal(K)
+    A, B = wilds("A, B")
+    Ez4 = pull_sums_out_front(sp.series(EK(sp.Mul(*[z[m] for m in mu]) * sp.exp(action)), eps, 0, 2).removeO())
+    poly = _compare_pipelines(Ez4, {EK(z[A] * z[B]): K[A, B]})
+    assert len(poly) == 13
+
+def test_second_layer_kernel():
+    # ch04/02_Second_Layer
+    i = neuron_indices("i1:3")
+    j = neuron_indices("j1:3")
+    alpha = sample_indices("alpha1:3")
+    beta = sample_indices("beta1:5")
+    g = NNIndexedBase("g", symmetries="full")
+    v = NNIndexedBase("v", symmetries=[(0, 1), (2, 3), ([0, 1], [2, 3])], idx_is_superscript=True)
+    z = NNIndexedBase("z", is_gaussian=True)
+    n, N_D = sp.symbols("n N_D", integer=True)
+    quartic_term = -eps * sp.Sum(
+        v[tuple(beta)] * sp.Sum(z[j[0], beta[0]] * z[j[0], beta[1]] * z[j[1], beta[2]] * z[j[1], beta[3]], (j[0], 1, n), (j[1], 1, n)),
+        *[(b, 1, N_D) for b in beta],
+    ) / 8
+    F = RandomSymbol("F")
+    Eg = GaussianExpVal(g)
+    EF = sp.series(Eg(sp.exp(-quartic_term) * F) / Eg(sp.exp(-quartic_term)), eps, 0, 2).removeO()
+    Ezz = pull_sums_out_front(EF).subs(F, z[i[0], alpha[0]] * z[i[1], alpha[1]])
+    A, B, C, D = wilds("A, B, C, D")
+    poly = _compare_pipelines(Ezz, {Eg(z[A, B] * z[C, D]): sp.KroneckerDelta(A, C) * g[B, D]})
+    assert len(poly) == 3
@@ -0,0 +1,13 @@
+import sympy as sp
+
+from symdl import ExpVal, GaussianIndexedBase, profile
+from symdl.gaussian import wick_contraction
+
+def test_profile_records_names_imported_from_submodules():
+    z = GaussianIndexedBase("z")
+    mu = sp.symbols("mu1:5", integer=True)
+    with profile() as report:
+        wick_contraction(ExpVal(sp.Mul(*[z[m] for m in mu])))
+    assert report.stages["wick_contraction"].calls == 1
+    wick_contraction(ExpVal(z[mu[0]] * z[mu[1]])) # outside the block, not recorded
+    assert report.stages["wick_contraction"].calls == 1
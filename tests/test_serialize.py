@@ -0,0 +1,33 @@
+import pytest
+import sympy as sp
+
+from symdl import GaussianExpVal, GaussianIndexedBase, wick_contraction
+from symdl.utils import dumps, loads
+
+def test_undefined_function_round_trip():
+    x = sp.Symbol("x", real=True)
+    sigma = sp.Function("sigma")
+    relu = sp.Function("relu", nonnegative=True)
+    expr = sigma(x) + relu(x**2) * sp.exp(x)
+    loaded, = loads(dumps(expr))
+    assert loaded == expr
+    assert loaded.has(relu) and relu(x).is_nonnegative
+
+def test_wild_keeps_exclude():
+    x = sp.Symbol("x")
+    w = sp.Wild("w", exclude=[x])
+    loaded, = loads(dumps(w))
+    assert loaded.exclude == (x,)
+    assert x.match(loaded) is None
+
+def test_wild_with_lambda_property_is_refused():
+    with pytest.raises(ValueError):
+        dumps(sp.Wild("w", properties=[lambda k: k.is_positive]))
+
+def test_kernel_keeps_propagator_rule():
+    z, G, K = GaussianIndexedBase("z"), sp.IndexedBase("G"), sp.Symbol("K")
+    i, j, a, b = sp.symbols("i j a b", integer=True)
+    expr = GaussianExpVal(K, (sp.KroneckerDelta, G))(z[i, a] * z[j, b])
+    loaded, = loads(dumps(expr))
+    assert loaded == expr
+    assert wick_contraction(loaded) == sp.KroneckerDelta(i, j) * G[a, b]
@@ -0,0 +1,22 @@
+import sympy as sp
+
+from symdl import ExpVal, GaussianExpVal, GaussianIndexedBase, SymmetryIndexedBase, TruncatedSeries, wick_contraction
+
+def test_documented_two_point_function_is_fully_contracted():
+    K = SymmetryIndexedBase("K", symmetries="full")
+    V = SymmetryIndexedBase("V", symmetries="full")
+    z = GaussianIndexedBase("z")
+    mu1, mu2 = sp.symbols("mu1 mu2", integer=True)
+    rho = sp.symbols("rho1:5", integer=True)
+    N, eps = sp.Symbol("N", integer=True), sp.Symbol("epsilon")
+    quartic_action = -eps * sp.Sum(V[rho] * z[rho[0]] * z[rho[1]] * z[rho[2]] * z[rho[3]] / 24, *[(r, 1, N) for r in rho])
+
+    EK = GaussianExpVal(K)
+    S = TruncatedSeries.from_expr(quartic_action, eps, 2)
+    Ezz = wick_contraction(EK(z[mu1] * z[mu2] * S.exp()) / EK(S.exp())).as_expr()
+
+    # only two-point contractions ⟨z z⟩_K are left
+    for E in Ezz.atoms(ExpVal):
+        assert sum(E.args[0].as_powers_dict().values()) == 2
+    assert Ezz.coeff(eps, 0) == EK(z[mu1] * z[mu2])
+    assert Ezz.coeff(eps, 1) != 0
@@ -0,0 +1,125 @@
+import sympy as sp
+
+from symdl import (
+    ExpVal,
+    GaussianExpVal,
+    GaussianIndexedBase,
+    Layer,
+    NNIndexedBase,
+    RandomSymbol,
+    SymmetryIndexedBase,
+    canonicalize_dummy_indices,
+    collect_canonical_terms,
+    neuron_indices,
+    normalize_sums,
+    pull_coef_out_sum,
+    pull_sums_out_front,
+    remove_irrelevant_sums,
+    sample_indices,
+    sum_kronecker_contract,
+    wick_contraction,
+    wild_subs,
+    wilds,
+)
+
+i, j = sp.symbols("i j", integer=True)
+N = sp.Symbol("N", integer=True)
+eps = sp.Symbol("epsilon")
+
+def _four_passes(expr):
+    return remove_irrelevant_sums(sum_kronecker_contract(pull_coef_out_sum(pull_sums_out_front(expr))))
+
+def _equal(a, b) -> bool:
+    return collect_canonical_terms(canonicalize_dummy_indices(pull_sums_out_front(sp.expand(a - b)))) == 0
+
+def test_nested_sums_stay_in_the_summand():
+    z = GaussianIndexedBase("z")
+    K = SymmetryIndexedBase("K", symmetries="full")
+    EK = GaussianExpVal(K, propagator=K)
+    expr = sp.Sum(z[i] * sp.Sum(z[j], (j, 1, N)), (i, 1, N))
+    assert normalize_sums(expr) == _four_passes(expr)
+    assert wick_contraction(EK(normalize_sums(expr))) == sp.Sum(K[i, j], (j, 1, N), (i, 1, N))
+    shadowed = sp.Sum(z[i] * sp.Sum(z[i] * z[j], (i, 1, N)), (i, 1, N), (j, 1, N))
+    assert _equal(normalize_sums(shadowed), _four_passes(shadowed))
+
+def test_first_layer_moments_match_four_passes():
+    # ch04/01_First_Layer
+    i1, i2 = neuron_indices("i1:3")
+    a1, a2 = sample_indices("alpha1:3")
+    x = sp.IndexedBase("x")
+    n0 = sp.Symbol("n0", integer=True)
+    b = NNIndexedBase("b", is_gaussian=True)
+    W = NNIndexedBase("W", is_gaussian=True)
+    C_b, C_w = sp.symbols("C_b C_W", positive=True)
+    z1 = Layer(W, b, x, n0).preactivation
+    A, B, C, D = wilds("A, B, C, D")
+    rules = {
+        ExpVal(W[A, B] * b[C]): 0,
+        ExpVal(b[A] * b[B]): C_b * sp.KroneckerDelta(A, B),
+        ExpVal(W[A, B] * W[C, D]): C_w * sp.KroneckerDelta(A, C) * sp.KroneckerDelta(B, D) / n0,
+    }
+    for zz in (z1[i1, a1] * z1[i2, a2], z1[i1, a1]**2):
+        zz = sp.expand(zz)
+        Ezz = wild_subs(ExpVal(pull_sums_out_front(zz)), rules)
+        for expr in (zz, Ezz):
+            assert normalize_sums(expr) == _four_passes(expr)
+
+def test_nearly_gaussian_four_point_function_matches_four_passes():
+    # ch01/03_Nearly_Gaussian_Distributions
+    K = SymmetryIndexedBase("K", symmetries="full")
+    V = SymmetryIndexedBase("V", symmetries="full", idx_is_superscript=True)
+    z = GaussianIndexedBase("z")
+    mu = sp.symbols("mu1:5", integer=True)
+    rho = sp.symbols("rho1:5", integer=True)
+    action = -eps * sp.Sum(V[rho] * z[rho[0]] * z[rho[1]] * z[rho[2]] * z[rho[3]] / 24, *[(r, 1, N) for r in rho])
+    EK = GaussianExpVal(K, propagator=K)
+    Ez4 = sp.series(EK(sp.Mul(*[z[m] for m in mu]) * sp.exp(action)), eps, 0, 2).removeO()
+    assert _equal(normalize_sums(Ez4), _four_passes(Ez4))
+    Ez4 = sp.expand(wick_contraction(pull_sums_out_front(Ez4)))
+    assert normalize_sums(Ez4) == _four_passes(Ez4)
+
+def test_second_layer_kernel_matches_four_passes():
+    # ch04/02_Second_Layer
+    i1, i2 = neuron_indices("i1:3")
+    j1, j2 = neuron_indices("j1:3")
+    a1, a2 = sample_indices("alpha1:3")
+    beta = tuple(sample_indices("beta1:5"))
+    g = NNIndexedBase("g", symmetries="full")
+    v = NNIndexedBase("v", symmetries=[(0, 1), (2, 3), ([0, 1], [2, 3])], idx_is_superscript=True)
+    z = NNIndexedBase("z", is_gaussian=True)
+    n, N_D = sp.symbols("n N_D", integer=True)
+    quartic_term = -eps * sp.Sum(
+        v[beta] * sp.Sum(z[j1, beta[0]] * z[j1, beta[1]] * z[j2, beta[2]] * z[j2, beta[3]], (j1, 1, n), (j2, 1, n)),
+        *[(b, 1, N_D) for b in beta],
+    ) / 8
+    F = RandomSymbol("F")
+    Eg = GaussianExpVal(g, propagator=(sp.KroneckerDelta, g))
+    EF = sp.series(Eg(sp.exp(-quartic_term) * F) / Eg(sp.exp(-quartic_term)), eps, 0, 2).removeO()
+    Ezz = EF.subs(F, z[i1, a1] * z[i2, a2])
+    assert _equal(normalize_sums(Ezz), _four_passes(Ezz))
+    Ezz = sp.expand(wick_contraction(pull_sums_out_front(Ezz)))
+    assert _equal(normalize_sums(Ezz), _four_passes(Ezz))
+
+def test_kronecker_contraction_matches_brute_force():
+    x, y = sp.IndexedBase("x"), sp.IndexedBase("y")
+    k, l, m = sp.symbols("k l m", integer=True)
+    mu, nu = sp.symbols("mu nu", integer=True)
+    d = sp.KroneckerDelta
+    lim = lambda *idx: [(a, 1, N) for a in idx]
+    cases = [
+        sp.Sum(d(i, j) * d(j, k) * x[i, k] * y[j], *lim(i, j, k)), # chain of summed indices
+        sp.Sum(d(i, mu) * d(i, j) * d(j, nu) * x[i, j], *lim(i, j)), # two free indices stay tied
+        sp.Sum(d(i, j)**2 * d(k, l) * x[i, k] * y[j] * y[l], *lim(i, j, k, l)),
+        sp.Sum(d(mu, i) * (x[i, j] + d(j, nu) * y[i]), *lim(i, j)), # summand is a sum
+        sp.Sum(d(i, j) * x[i, j] * sp.Sum(d(k, i) * d(k, l) * y[l], *lim(k, l)), *lim(i, j)),
+        sp.Sum(d(i, mu) * d(j, mu) * d(m, nu) * x[i, m] * y[j], *lim(i, j, m)),
+    ]
+    values = {x[a, b]: sp.Rational(3 * a + b, 7) for a in range(1, 4) for b in range(1, 4)}
+    values.update({y[a]: sp.Rational(a**2 + 1, 5) for a in range(1, 4)})
+    for expr in cases:
+        contracted = sum_kronecker_contract(expr)
+        for free in [{mu: 1, nu: 1}, {mu: 2, nu: 3}]:
+            exact = expr.xreplace(free).subs(N, 3).doit().xreplace(values)
+            assert contracted.xreplace(free).subs(N, 3).doit().xreplace(values) == exact, expr
+        summed = {i, j, k, l, m}
+        assert all(summed.isdisjoint(delta.args) for delta in contracted.atoms(sp.KroneckerDelta))
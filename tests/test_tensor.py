@@ -0,0 +1,28 @@
+from sympy import Float, Integer, Symbol, exp
+
+from symdl import ExpVal, GaussianIndexedBase, NNIndexedBase
+
+def test_interned_components_distinguish_index_types():
+    z = GaussianIndexedBase("z")
+    assert z[1] is z[1]
+    assert z[1] is not z[1.0]
+    assert z[1].indices == (Integer(1),)
+    assert z[1.0].indices == (Float(1.0),)
+
+def test_gaussian_implies_random():
+    assert NNIndexedBase("z", is_gaussian=True)[1].is_random
+    assert not NNIndexedBase("w")[1].is_random
+
+def test_random_facts_are_part_of_equality():
+    z, w = NNIndexedBase("z", is_gaussian=True), NNIndexedBase("z")
+    assert z != w
+    assert ExpVal(z[1] * w[1]) == w[1] * ExpVal(z[1])
+
+def test_rebuilt_bases_keep_their_metadata():
+    z, y = NNIndexedBase("z", is_gaussian=True), Symbol("y")
+    assert z.subs(Symbol("z"), y).is_gaussian
+    assert z.xreplace({Symbol("z"): y}).is_gaussian
+    eps = Symbol("epsilon")
+    # series rebuilds the bases through posify's subs
+    coeff = exp(eps * z[1]**2).series(eps, 0, 2).removeO().coeff(eps)
+    assert coeff == z[1]**2 and coeff.base.base.is_gaussian
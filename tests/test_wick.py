@@ -0,0 +1,48 @@
+from math import factorial, prod
+
+import pytest
+import sympy as sp
+
+from symdl import GaussianExpVal, GaussianIndexedBase, wick_contraction
+from symdl.gaussian.wick import multiset_pairings
+
+K = sp.IndexedBase("K")
+z = GaussianIndexedBase("z")
+EK = GaussianExpVal(K)
+mu, nu, rho = sp.symbols("mu nu rho", integer=True)
+
+def _pairings(rvs: list):
+    # every perfect matching of the positions, as the Wick expansion before grouping
+    if not rvs:
+        yield []
+        return
+    first, rest = rvs[0], rvs[1:]
+    for k in range(len(rest)):
+        for tail in _pairings(rest[:k] + rest[k + 1:]):
+            yield [(first, rest[k])] + tail
+
+def _brute_force(rvs: list) -> sp.Expr:
+    return sp.Add(*[sp.Mul(*[EK(a * b) for a, b in p]) for p in _pairings(rvs)])
+
+@pytest.mark.parametrize("rvs", [
+    [z[mu]] * 4,
+    [z[mu]] * 6,
+    [z[mu]] * 2 + [z[nu]] * 2,
+    [z[mu]] * 3 + [z[nu]] + [z[rho]] * 2,
+    [z[mu]] * 2 + [z[nu]] * 2 + [z[rho]] * 4,
+    [z[i] for i in range(6)],
+])
+def test_grouped_pairings_match_all_matchings(rvs):
+    assert wick_contraction(EK(sp.Mul(*rvs))) == _brute_force(rvs)
+
+@pytest.mark.parametrize("counts", [[4], [2, 2], [3, 1, 2], [1] * 6, [2, 3, 1, 4]])
+def test_pattern_multiplicities_add_up_to_all_matchings(counts):
+    patterns = [tuple(p) for p in multiset_pairings(counts)]
+    assert len(set(patterns)) == len(patterns)
+    total = 0
+    for pattern in patterns:
+        total += prod(factorial(n) for n in counts) // prod(
+            2**m * factorial(m) if i == j else factorial(m) for (i, j), m in pattern
+        )
+    n = sum(counts)
+    assert total == factorial(n) // (2**(n // 2) * factorial(n // 2)) # (n - 1)!!
@@ -0,0 +1,39 @@
+import sympy as sp
+
+from symdl import GaussianExpVal, GaussianIndexedBase, TensorPoly, wick_contraction
+from symdl.utils import wild_subs, wilds
+
+x, y = sp.symbols("x y")
+f, g, h = sp.symbols("f g h", cls=sp.Function)
+A, B, W = wilds("A, B, W")
+
+def _sequential(expr, rules):
+    for pattern, value in rules.items():
+        expr = expr.replace(pattern, value)
+    return expr
+
+def _check(expr, rules):
+    assert wild_subs(expr, rules) == _sequential(expr, rules)
+
+def test_product_patterns_match_other_nodes():
+    _check(f(x) + g(x, y), {x * W: h(W)}) # x matches x*W with W = 1
+    _check(f(x) + x**2, {x + W: y * W})
+    _check(f(x) * g(y)**3, {W**3: h(W)})
+
+def test_rules_see_earlier_replacements_only():
+    _check(f(x), {f(g(A)): h(A), x: g(y)}) # f(g(y)), not h(y)
+    _check(f(x), {f(A): g(A, x), x: y}) # g(y, y)
+    _check(f(x) + g(x), {x: x + 1, f(A): h(A)})
+
+def test_callable_replacements():
+    _check(f(x, 0) + f(x, y), {f(A, B): lambda A, B: g(B, A)}) # exact: B = 0 does not match
+
+def test_gaussian_rule_on_wick_contraction():
+    K = sp.IndexedBase("K")
+    z = GaussianIndexedBase("z")
+    EK = GaussianExpVal(K)
+    mu = sp.symbols("mu1:7", integer=True)
+    Ez6 = wick_contraction(EK(sp.Mul(*[z[m] for m in mu])))
+    rules = {EK(z[A] * z[B]): K[A, B]}
+    _check(Ez6, rules)
+    assert wild_subs(TensorPoly.from_expr(Ez6), rules).as_expr() == sp.expand(_sequential(Ez6, rules))